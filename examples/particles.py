@@ -218,29 +218,32 @@ def run():
     particlerenderer = ParticleRenderer(renderer, images)
     world.add_system(particlerenderer)
 
-    # The almighty event loop. You already know several parts of it.
-    running = True
-    while running:
-        for event in video.get_events():
-            if event.type == sdlevents.SDL_QUIT:
-                running = False
-                break
-
-            if event.type == sdlevents.SDL_MOUSEMOTION:
-                # Take care of the mouse motions here. Every time the
-                # mouse is moved, we will make that information globally
-                # available to our application environment by updating
-                # the world attributes created earlier.
-                world.mousex = event.motion.x
-                world.mousey = event.motion.y
-                # We updated the mouse coordinates once, ditch all the
-                # other ones. Since world.process() might take several
-                # milliseconds, new motion events can occur on the event
-                # queue (10ths to 100ths!), and we do not want to handle
-                # each of them. For this example, it is enough to handle
-                # one per update cycle.
-                sdlevents.flush_event(sdlevents.SDL_MOUSEMOTION)
-                break
+    # The almighty event loop. Instead of fetching all events and
+    # checking their types by ourselves, we let an EventDispatcher pass
+    # them to the callbacks registered for their type.
+    dispatcher = video.EventDispatcher()
+    world.running = True
+
+    def on_quit(dispatcher, event):
+        world.running = False
+
+    def on_motion(dispatcher, event):
+        # Take care of the mouse motions here. Every time the mouse is
+        # moved, we will make that information globally available to our
+        # application environment by updating the world attributes
+        # created earlier. Since world.process() might take several
+        # milliseconds, new motion events can occur on the event queue
+        # (10ths to 100ths!), and we do not want to handle each of
+        # them. The EventDispatcher merges consecutive motion events
+        # into a single one for us, so we only get the most recent
+        # position.
+        world.mousex = event.motion.x
+        world.mousey = event.motion.y
+
+    dispatcher[sdlevents.SDL_QUIT] += on_quit
+    dispatcher[sdlevents.SDL_MOUSEMOTION] += on_motion
+    while world.running:
+        dispatcher.dispatch()
         world.process()
 
     video.quit()
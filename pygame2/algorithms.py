@@ -1,6 +1,13 @@
 """Common algorithms."""
 
-__all__ = ["liangbarsky", "cohensutherland", "clipline"]
+_HASNUMPY = True
+try:
+    import numpy
+except ImportError:
+    _HASNUMPY = False
+
+__all__ = ["liangbarsky", "cohensutherland", "clipline", "cliplines",
+           "sutherlandhodgman"]
 
 
 def cohensutherland(left, top, right, bottom, x1, y1, x2, y2):
@@ -47,7 +54,7 @@ def cohensutherland(left, top, right, bottom, x1, y1, x2, y2):
             x = right
         else:
             y = y1 + (y2 - y1) * (1.0 * (left - x1)) / (x2 - x1)
-            x = right
+            x = left
         if opt == k1:
             x1, y1 = int(x), int(y)
             k1 = _getclip(x1, y1)
@@ -79,8 +86,11 @@ def liangbarsky(left, top, right, bottom, x1, y1, x2, y2):
               (dy, bottom - y1))
 
     for p, q in checks:
-        if p == 0 and q < 0:
-            return None, None, None, None
+        if p == 0:
+            # The line is parallel to the edge
+            if q < 0:
+                return None, None, None, None
+            continue
         dt = q / (p * 1.0)
         if p < 0:
             if dt > dt1:
@@ -90,14 +100,127 @@ def liangbarsky(left, top, right, bottom, x1, y1, x2, y2):
             if dt < dt0:
                 return None, None, None, None
             dt1 = min(dt1, dt)
-    if dt0 > 0:
-        x1 += dt0 * dx
-        y1 += dt0 * dy
     if dt1 < 1:
         x2 = x1 + dt1 * dx
         y2 = y1 + dt1 * dy
+    if dt0 > 0:
+        x1 += dt0 * dx
+        y1 += dt0 * dy
     return x1, y1, x2, y2
 
 
 clipline = lambda l, t, r, b, x1, y1, x2, y2, method=liangbarsky: \
     method(l, t, r, b, x1, y1, x2, y2)
+
+
+def cliplines(left, top, right, bottom, lines):
+    """Clips a set of lines to a rectangular area.
+
+    lines can be a Nx4 numpy array, a sequence of (x1, y1, x2, y2)
+    tuples or a flat sequence of a multiple of 4 values, e.g. (x1, y1,
+    x2, y2, x3, y3, x4, y4, ...). The lines are clipped using the
+    Liang-Barsky algorithm.
+
+    Returns the clipped lines and a mask, which indicates for each line,
+    if it intersects with the clipping area. Lines outside of the area
+    keep their original points. If numpy is available, the clipped lines
+    and mask will be numpy arrays, otherwise they will be lists of (cx1,
+    cy1, cx2, cy2) tuples and bool values.
+    """
+    if _HASNUMPY:
+        return _cliplines_numpy(left, top, right, bottom, lines)
+    if len(lines) > 0 and not hasattr(lines[0], "__len__"):
+        # flat sequence of points
+        if len(lines) % 4 != 0:
+            raise ValueError("lines does not contain a valid set of points")
+        lines = [lines[idx:idx + 4] for idx in range(0, len(lines), 4)]
+    clipped, mask = [], []
+    for x1, y1, x2, y2 in lines:
+        cline = liangbarsky(left, top, right, bottom, x1, y1, x2, y2)
+        if cline[0] is None:
+            clipped.append((x1, y1, x2, y2))
+            mask.append(False)
+        else:
+            clipped.append(cline)
+            mask.append(True)
+    return clipped, mask
+
+
+def _cliplines_numpy(left, top, right, bottom, lines):
+    """numpy implementation of cliplines(), which clips all lines at
+    once."""
+    lines = numpy.asarray(lines, dtype=numpy.float64)
+    if lines.size % 4 != 0:
+        raise ValueError("lines does not contain a valid set of points")
+    lines = lines.reshape(-1, 4)
+    x1, y1, x2, y2 = lines[:, 0], lines[:, 1], lines[:, 2], lines[:, 3]
+    dx, dy = x2 - x1, y2 - y1
+    p = numpy.column_stack((-dx, dx, -dy, dy))
+    q = numpy.column_stack((x1 - left, right - x1, y1 - top, bottom - y1))
+
+    parallel = p == 0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        dt = q / p
+    dt0 = numpy.where(p < 0, dt, 0).max(axis=1)
+    dt1 = numpy.where(p > 0, dt, 1).min(axis=1)
+    mask = ~(parallel & (q < 0)).any(axis=1) & (dt0 <= dt1)
+
+    clipped = lines.copy()
+    dt0 = numpy.maximum(dt0, 0)[mask]
+    dt1 = numpy.minimum(dt1, 1)[mask]
+    dx, dy = dx[mask], dy[mask]
+    x1, y1 = x1[mask], y1[mask]
+    clipped[mask] = numpy.column_stack((x1 + dt0 * dx, y1 + dt0 * dy,
+                                        x1 + dt1 * dx, y1 + dt1 * dy))
+    return clipped, mask
+
+
+def sutherlandhodgman(left, top, right, bottom, points):
+    """Clips a polygon to a rectangular area.
+
+    This implements the Sutherland-Hodgman polygon clipping algorithm.
+    left, top, right and bottom denote the clipping area, into which
+    the polygon defined by points, a sequence of (x, y) tuples, will be
+    clipped.
+
+    Returns the corners of the clipped polygon as list of (x, y) tuples.
+    If the polygon does not intersect with the rectangular clipping
+    area, the list will be empty.
+    """
+    def _clip(polygon, inside, intersect):
+        output = []
+        prev = polygon[-1]
+        for point in polygon:
+            if inside(point):
+                if not inside(prev):
+                    output.append(intersect(prev, point))
+                output.append(point)
+            elif inside(prev):
+                output.append(intersect(prev, point))
+            prev = point
+        return output
+
+    def _xcross(x):
+        def _intersect(pa, pb):
+            dt = (1.0 * (x - pa[0])) / (pb[0] - pa[0])
+            return x, pa[1] + (pb[1] - pa[1]) * dt
+        return _intersect
+
+    def _ycross(y):
+        def _intersect(pa, pb):
+            dt = (1.0 * (y - pa[1])) / (pb[1] - pa[1])
+            return pa[0] + (pb[0] - pa[0]) * dt, y
+        return _intersect
+
+    # The inside check and intersection for each edge of the area.
+    edges = ((lambda p: p[0] >= left, _xcross(left)),
+             (lambda p: p[0] <= right, _xcross(right)),
+             (lambda p: p[1] >= top, _ycross(top)),
+             (lambda p: p[1] <= bottom, _ycross(bottom)))
+
+    output = [tuple(point) for point in points]
+    for inside, intersect in edges:
+        if len(output) == 0:
+            break
+        output = _clip(output, inside, intersect)
+    return output
@@ -1,7 +1,9 @@
 """
 Conversion routines for sequences.
 """
+import sys
 import ctypes
+from pygame2.compat import byteify
 
 __all__ = ["CTypesView", "to_ctypes", "to_list", "to_tuple", "create_array",
            "MemoryView"]
@@ -26,29 +28,182 @@ def to_ctypes(dataseq, dtype, mcount=0):
     type and returns the ctypes array and amount of items as two-value
     tuple.
 
+    CTypesView objects and contiguous objects supporting the buffer
+    protocol, such as bytearray, array.array, mmap.mmap or numpy arrays,
+    are not converted element by element, but reinterpreted as array of
+    the specified type, if their item type matches it. Writable buffers
+    are shared with the returned array, read-only ones are copied at
+    once.
+
     Raises a TypeError, if one or more elements in the passed sequence
     do not match the passed type.
     """
+    if isinstance(dataseq, CTypesView):
+        count = mcount or dataseq.bytesize // ctypes.sizeof(dtype)
+        if count * ctypes.sizeof(dtype) > dataseq.bytesize:
+            raise ValueError("the CTypesView is too small for %d items" %
+                             count)
+        castval = ctypes.POINTER(count * dtype)
+        return ctypes.cast(dataseq.view, castval).contents, count
+    valset = _buffer_to_ctypes(dataseq, dtype, mcount)
+    if valset is not None:
+        return valset, len(valset)
     if mcount > 0:
         count = mcount
     else:
         count = len(dataseq)
-    if isinstance(dataseq, CTypesView):
-        itemsize = ctypes.sizeof(dtype)
-        if itemsize == 1:
-            dataseq = dataseq.to_bytes()
-        elif itemsize == 2:
-            dataseq = dataseq.to_uint16()
-        elif itemsize == 4:
-            dataseq = dataseq.to_uint32()
-        elif itemsize == 8:
-            dataseq = dataseq.to_uint64()
-        else:
-            raise TypeError("unsupported data type for the passed CTypesView")
     valset = (count * dtype)(*dataseq)
     return valset, count
 
 
+# ctypes type codes, which can be filled from a buffer of the same item
+# size and kind.
+_INTCODES = "bBhHiIlLqQ"
+_FLOATCODES = "fd"
+
+
+def _get_buffer(obj):
+    """Gets a C-contiguous memoryview on the object or None, if the
+    object does not support the buffer protocol."""
+    if isinstance(obj, (list, tuple)):
+        return None
+    try:
+        mview = memoryview(obj)
+    except TypeError:
+        return None
+    if not getattr(mview, "c_contiguous", True):
+        return None
+    return mview
+
+
+def _get_nbytes(mview):
+    """Gets the size in bytes of a memoryview."""
+    nbytes = getattr(mview, "nbytes", None)
+    if nbytes is None:
+        # Python 2.7 does not know about memoryview.nbytes
+        nbytes = mview.itemsize
+        for dim in mview.shape or ():
+            nbytes *= dim
+    return nbytes
+
+
+def _get_fieldtype(dtype):
+    """Gets the type of the fields of a ctypes structure, if all fields
+    are of the same simple type and not padded, or None otherwise."""
+    if not issubclass(dtype, ctypes.Structure):
+        return None
+    fields = getattr(dtype, "_fields_", None)
+    if not fields or any(len(field) != 2 for field in fields):
+        # Empty structures and bit fields
+        return None
+    ftype = fields[0][1]
+    if not isinstance(getattr(ftype, "_type_", None), str) or \
+            any(field[1] is not ftype for field in fields) or \
+            ctypes.sizeof(ftype) * len(fields) != ctypes.sizeof(dtype):
+        return None
+    return ftype
+
+
+def _get_format(dtype):
+    """Gets the buffer format of the passed ctypes type or None, if it
+    can't be determined."""
+    try:
+        return memoryview(dtype()).format
+    except TypeError:
+        return None
+
+
+def _matches_type(mview, dtype, obj):
+    """Checks, if the items of the memoryview can be reinterpreted as
+    values of the passed ctypes type."""
+    code = getattr(dtype, "_type_", None)
+    if not isinstance(code, str):
+        # Structures and arrays can only be reinterpreted, if the buffer
+        # consists of them or of values of the structure's field type.
+        if _get_nbytes(mview) % ctypes.sizeof(dtype) != 0:
+            return False
+        if isinstance(obj, ctypes.Array) and obj._type_ is dtype:
+            return True
+        if mview.itemsize == ctypes.sizeof(dtype) and \
+                mview.format == _get_format(dtype):
+            return True
+        ftype = _get_fieldtype(dtype)
+        return ftype is not None and _matches_type(mview, ftype, obj)
+    if mview.itemsize != ctypes.sizeof(dtype):
+        return False
+    fmt = mview.format
+    if fmt[0] in "@=":
+        fmt = fmt[1:]
+    elif fmt[0] in "<>!":
+        if (fmt[0] == "<") != (sys.byteorder == "little"):
+            return False
+        fmt = fmt[1:]
+    if code in _INTCODES:
+        return fmt in _INTCODES
+    if code in _FLOATCODES:
+        return fmt == code
+    return False
+
+
+def _buffer_to_ctypes(dataseq, dtype, mcount=0):
+    """Creates a ctypes array of the specified type from the raw data of
+    a buffer object or returns None, if the object's data can't be used
+    directly."""
+    mview = _get_buffer(dataseq)
+    if mview is None or not _matches_type(mview, dtype, dataseq):
+        return None
+    itemsize = ctypes.sizeof(dtype)
+    count = _get_nbytes(mview) // itemsize
+    if mcount > 0:
+        if mcount > count:
+            return None
+        count = mcount
+    arraytype = dtype * count
+    if not mview.readonly:
+        try:
+            return arraytype.from_buffer(dataseq)
+        except (AttributeError, TypeError):
+            # Non-writable mmap objects and pypy ctypes arrays without a
+            # from_buffer() method.
+            pass
+    return _copy_buffer(arraytype, mview)
+
+
+def _copy_buffer(arraytype, mview):
+    """Creates a new ctypes array of the passed type from the contents of
+    a memoryview."""
+    if getattr(mview, "c_contiguous", True):
+        try:
+            return arraytype.from_buffer_copy(mview)
+        except TypeError:
+            # Python 2.7 can't copy from a memoryview.
+            pass
+    return arraytype.from_buffer_copy(mview.tobytes())
+
+
+def _get_address(obj, bsize):
+    """Gets the memory address of the contents of a read-only object or
+    None, if the address can't be determined."""
+    if isinstance(obj, memoryview):
+        # Only memoryviews on a complete bytes object are supported
+        source = getattr(obj, "obj", None)
+        if not isinstance(source, bytes) or \
+                _get_nbytes(obj) != len(source):
+            return None
+        obj = source
+    if isinstance(obj, bytes):
+        if len(obj) < bsize:
+            return None
+        return ctypes.cast(ctypes.c_char_p(obj), ctypes.c_void_p).value
+    iface = getattr(obj, "__array_interface__", None)
+    if iface is not None and iface.get("strides") is None:
+        # numpy arrays and compatible objects with C-contiguous data.
+        if getattr(obj, "nbytes", 0) < bsize:
+            return None
+        return iface["data"][0]
+    return None
+
+
 def create_array(obj, itemsize):
     """Creates an array.array based copy of the passed object.
 
@@ -70,12 +225,17 @@ class CTypesView(object):
     """A proxy for byte-wise accessible data types to be used in ctypes
     bindings.
     """
+    # Share the data of read-only objects instead of copying it.
+    _sharereadonly = False
+
     def __init__(self, obj, itemsize=1, docopy=False, objsize=None):
         """Creates a new CTypesView for the passed object.
 
         Unless docopy is True, the CTypesView tries to let ctypes
         bindings and other callers access the object's contents
-        directly.
+        directly. This works for writable buffer objects, such as
+        bytearray, array.array, memoryview, mmap.mmap or numpy arrays.
+        Read-only buffers, such as bytes, are copied at once.
 
         For certain types, such as the bytearray, the object must not be
         reassigned after being encapsuled and used in ctypes bindings,
@@ -90,16 +250,24 @@ class CTypesView(object):
     def _create_view(self, itemsize, docopy, objsize):
         """Creates the view on the specified object."""
         self._isshared = not docopy
+        self._readonly = False
         bsize = 0
-        if objsize is None:
-            bsize = len(self._obj) * itemsize
-        else:
+        if objsize is not None:
             bsize = objsize * itemsize
+        else:
+            mview = None
+            if not docopy:
+                mview = _get_buffer(self._obj)
+            if mview is not None:
+                bsize = _get_nbytes(mview)
+            else:
+                bsize = len(self._obj) * itemsize
 
         if docopy:
             self._obj = create_array(self._obj, itemsize)
         try:
             self._view = (ctypes.c_ubyte * bsize).from_buffer(self._obj)
+            return
         except AttributeError:
             # pypy ctypes arrays do not feature a from_buffer() method.
             self._isshared = False
@@ -114,6 +282,23 @@ class CTypesView(object):
                     bsize = len(self._obj) * itemsize
                 self._obj = create_array(self._obj, itemsize)
             self._view = (ctypes.c_ubyte * bsize)(*bytearray(self._obj))
+            return
+        except TypeError:
+            # Read-only or non-contiguous buffer.
+            pass
+        address = None
+        if self._sharereadonly:
+            address = _get_address(self._obj, bsize)
+        if address is not None:
+            self._readonly = True
+            self._view = (ctypes.c_ubyte * bsize).from_address(address)
+            # Keep the object alive as long as the view exists.
+            self._view._pgobj = self._obj
+            return
+        # Last resort, copy the data at once.
+        self._isshared = False
+        self._view = _copy_buffer(ctypes.c_ubyte * bsize,
+                                  memoryview(self._obj))
 
     def __repr__(self):
         dtype = type(self._obj).__name__
@@ -162,29 +347,55 @@ class CTypesView(object):
         """
         return self._isshared
 
+    @property
+    def is_readonly(self):
+        """Indicates, if the CTypesView shares the data of a read-only
+        object, such as bytes. Such a view must not be written to.
+        """
+        return self._readonly
+
     @property
     def object(self):
         """The underlying object."""
         return self._obj
 
 
+class _ReadOnlyCTypesView(CTypesView):
+    """A CTypesView, which shares the data of read-only objects, such as
+    bytes, instead of copying it.
+
+    Writing to such a view changes the immutable object, so it must only
+    be used by callers, which read the data, such as
+    pygame2.openal.al.buffer_data().
+    """
+    _sharereadonly = True
+
+
+def _packed_steps(itemsize, strides):
+    """Gets the distance in bytes between two consecutive items of each
+    dimension for tightly packed items."""
+    steps = [itemsize] * len(strides)
+    for dim in range(len(strides) - 2, -1, -1):
+        steps[dim] = steps[dim + 1] * strides[dim + 1]
+    return tuple(steps)
+
+
 class MemoryView(object):
     """Simple n-dimensional access to buffers.
 
     The MemoryView provides a read-write access to arbitrary data
     objects, which can be indexed.
 
-    NOTE: The MemoryView is a pure Python-based implementation and makes
-    heavy use of recursion for multi-dimensional access. If you aim for
-    speed on accessing a n-dimensional object, you want to consider
-    using a specialised library such as numpy. If you need n-dimensional
-    access support, where such a library is not supported, or if you
-    need to provide access to objects, which do not fulfill the
-    requirements of that particular libray, MemoryView can act as solid
-    fallback solution.
+    NOTE: The MemoryView is a pure Python-based implementation. If you
+    aim for speed on accessing a n-dimensional object, you want to
+    consider using a specialised library such as numpy. If you need
+    n-dimensional access support, where such a library is not
+    supported, or if you need to provide access to objects, which do not
+    fulfill the requirements of that particular libray, MemoryView can
+    act as solid fallback solution.
     """
     def __init__(self, source, itemsize, strides, getfunc=None, setfunc=None,
-                 srcsize=None):
+                 srcsize=None, steps=None):
         """Creates a new MemoryView from a source.
 
         itemsize denotes the size of a single item. strides defines the
@@ -193,17 +404,26 @@ class MemoryView(object):
         specialised read and write access to the underlying
         source. srcsize can be used to provide the correct source size,
         if len(source) does not return the absolute size of the source
-        object in all dimensions.
+        object in all dimensions. steps can be used to provide the
+        distance in bytes between two consecutive items of each
+        dimension, if the items are not packed tightly, e.g. due to
+        padding bytes at the end of each row.
         """
         self._source = source
         self._itemsize = itemsize
-        self._strides = strides
+        self._strides = tuple(strides)
         self._srcsize = srcsize or len(source)
         self._offset = 0
 
         self._getfunc = getfunc or self._getbytes
         self._setfunc = setfunc or self._setbytes
 
+        if steps is None:
+            steps = _packed_steps(itemsize, self._strides)
+        elif len(steps) != len(self._strides):
+            raise ValueError("steps must match the dimensions of strides")
+        self._steps = tuple(steps)
+
         tsum = 1
         for v in strides:
             tsum *= v
@@ -212,6 +432,20 @@ class MemoryView(object):
         #if itemsize > strides[-1]:
         #    raise ValueError("itemsize exceeds the accessible stride length")
 
+    def _subview(self, offset, strides, steps):
+        """Creates a view on a part of the MemoryView without any
+        validation."""
+        view = MemoryView.__new__(MemoryView)
+        view._source = self._source
+        view._itemsize = self._itemsize
+        view._strides = strides
+        view._srcsize = self._srcsize
+        view._offset = offset
+        view._getfunc = self._getfunc
+        view._setfunc = self._setfunc
+        view._steps = steps
+        return view
+
     def _getbytes(self, start, end):
         """Gets the bytes within the range of start:end."""
         return self._source[start:end]
@@ -222,11 +456,42 @@ class MemoryView(object):
         """
         self._source[start:end] = value
 
+    def _locate(self, index):
+        """Gets the offset, strides and steps of the item or view
+        denoted by the index."""
+        if type(index) is not tuple:
+            index = (index, )
+        strides = self._strides
+        steps = self._steps
+        if len(index) > len(strides):
+            raise IndexError("too many indices for '%d' dimensions" %
+                             len(strides))
+        offset = self._offset
+        nstrides = []
+        nsteps = []
+        for dim, value in enumerate(index):
+            length = strides[dim]
+            if type(value) is slice:
+                start, stop, step = value.indices(length)
+                offset += start * steps[dim]
+                nstrides.append(len(range(start, stop, step)))
+                nsteps.append(steps[dim] * step)
+            else:
+                if value < 0:
+                    value += length
+                if value < 0 or value >= length:
+                    raise IndexError("index '%d'is out of bounds for '%d'" %
+                                     (value, length))
+                offset += value * steps[dim]
+        dim = len(index)
+        return (offset, tuple(nstrides) + strides[dim:],
+                tuple(nsteps) + steps[dim:])
+
     def __len__(self):
         """The length of the MemoryView over the current dimension
         (amount of items for the current dimension).
         """
-        return self.strides[0]
+        return self._strides[0]
 
     def __repr__(self):
         retval = "["
@@ -237,52 +502,176 @@ class MemoryView(object):
         retval += "]"
         return retval
 
-    def __getitem__(self, index):
-        """Returns the item at the specified index."""
-        if type(index) is slice:
-            raise IndexError("slicing is not supported")
+    def __iter__(self):
+        """Iterates over the items or views of the first dimension."""
+        offset = self._offset
+        step = self._steps[0]
+        if len(self._strides) == 1:
+            getfunc = self._getfunc
+            itemsize = self._itemsize
+            for index in range(self._strides[0]):
+                yield getfunc(offset, offset + itemsize)
+                offset += step
         else:
-            if index >= len(self):
+            strides = self._strides[1:]
+            steps = self._steps[1:]
+            for index in range(self._strides[0]):
+                yield self._subview(offset, strides, steps)
+                offset += step
+
+    def __getitem__(self, index):
+        """Returns the item or view at the specified index.
+
+        The index can be a single index or slice or a tuple of them, one
+        for each dimension, such as view[y, x] or view[2:4, ::2].
+        """
+        if type(index) is int and len(self._strides) == 1:
+            # fast path for single items
+            length = self._strides[0]
+            if index < 0:
+                index += length
+            if index < 0 or index >= length:
                 raise IndexError("index '%d'is out of bounds for '%d'" %
-                                 (index, len(self)))
-            if self.ndim == 1:
-                offset = self._offset + index * self.itemsize
-                return self._getfunc(offset, offset + self.itemsize)
-            else:
-                advance = self.itemsize
-                for b in self.strides[1:]:
-                    advance *= b
-                offset = self._offset + advance * index
-                view = MemoryView(self._source, self.itemsize,
-                                  self.strides[1:], self._getfunc,
-                                  self._setfunc, self._srcsize)
-                view._offset = offset
-                return view
+                                 (index, length))
+            offset = self._offset + index * self._steps[0]
+            return self._getfunc(offset, offset + self._itemsize)
+        offset, strides, steps = self._locate(index)
+        if len(strides) == 0:
+            return self._getfunc(offset, offset + self._itemsize)
+        return self._subview(offset, strides, steps)
 
     def __setitem__(self, index, value):
-        """Sets the item at index to the specified value."""
-        if type(index) is slice:
-            raise IndexError("slicing is not supported")
-        else:
-            if index >= len(self):
+        """Sets the item or view at index to the specified value.
+
+        If index denotes a view, value must be a sequence matching the
+        length of the view.
+        """
+        if type(index) is int and len(self._strides) == 1:
+            # fast path for single items
+            length = self._strides[0]
+            if index < 0:
+                index += length
+            if index < 0 or index >= length:
                 raise IndexError("index '%d'is out of bounds for '%d'" %
-                                 (index, len(self)))
-            offset = self._offset + index * self.itemsize
-            if self.ndim == 1:
-                self._setfunc(offset, offset + self.itemsize, value)
+                                 (index, length))
+            offset = self._offset + index * self._steps[0]
+            self._setfunc(offset, offset + self._itemsize, value)
+            return
+        offset, strides, steps = self._locate(index)
+        if len(strides) == 0:
+            self._setfunc(offset, offset + self._itemsize, value)
+            return
+        view = self._subview(offset, strides, steps)
+        if len(value) != len(view):
+            raise ValueError("value does not match the view strides")
+        for x in range(len(view)):
+            view[x] = value[x]
+
+    def _is_contiguous(self):
+        """Checks, if the items of the MemoryView are packed tightly."""
+        return self._steps == _packed_steps(self._itemsize, self._strides)
+
+    def _rawbuffer(self):
+        """Gets a byte-wise memoryview on the source or None, if the
+        source does not support the buffer protocol."""
+        source = self._source
+        if isinstance(source, ctypes._Pointer):
+            source = ctypes.cast(source, ctypes.POINTER(ctypes.c_ubyte *
+                                                        self._srcsize))
+            source = source.contents
+        try:
+            return memoryview(source).cast("B")
+        except (TypeError, AttributeError):
+            # Not supported by the source or memoryview.cast() is not
+            # available (Python 2).
+            return None
+
+    def _chunks(self):
+        """Gets the byte ranges of the items as (start, end) tuples in
+        C order, merging the items of the last dimension, if possible."""
+        strides = self._strides
+        steps = self._steps
+        if 0 in strides:
+            return []
+        last = len(strides) - 1
+        merge = steps[last] == self._itemsize
+        chunks = []
+        counters = [0] * len(strides)
+        while True:
+            offset = self._offset
+            for dim in range(last):
+                offset += counters[dim] * steps[dim]
+            if merge:
+                chunks.append((offset, offset + strides[last] * steps[last]))
             else:
-                advance = self.itemsize
-                for b in self.strides[1:]:
-                    advance *= b
-                offset = self._offset + advance * index
-                view = MemoryView(self._source, self.itemsize,
-                                  self.strides[1:], self._getfunc,
-                                  self._setfunc, self._srcsize)
-                view._offset = offset
-                if len(value) != len(view):
-                    raise ValueError("value does not match the view strides")
-                for x in range(len(view)):
-                    view[x] = value[x]
+                for index in range(strides[last]):
+                    start = offset + index * steps[last]
+                    chunks.append((start, start + self._itemsize))
+            dim = last - 1
+            while dim >= 0:
+                counters[dim] += 1
+                if counters[dim] < strides[dim]:
+                    break
+                counters[dim] = 0
+                dim -= 1
+            if dim < 0:
+                return chunks
+
+    def tobytes(self):
+        """Returns the data of the items of the MemoryView as bytes
+        object in C order."""
+        raw = self._rawbuffer()
+        data = bytearray()
+        for start, end in self._chunks():
+            if raw is not None:
+                data.extend(raw[start:end])
+            else:
+                chunk = self._source[start:end]
+                if isinstance(chunk, str) and not isinstance(chunk, bytes):
+                    chunk = byteify(chunk, "utf-8")
+                data.extend(chunk)
+        return bytes(data)
+
+    def cast(self, itemsize, strides):
+        """Creates a new MemoryView on the same data with a different
+        itemsize and different strides.
+
+        The MemoryView must be contiguous and the new itemsize and
+        strides must cover the same amount of bytes as the MemoryView.
+        The new MemoryView uses a byte-wise access to the source.
+        """
+        if not self._is_contiguous():
+            raise ValueError("the MemoryView must be contiguous")
+        nbytes = self._itemsize
+        for v in self._strides:
+            nbytes *= v
+        tsum = itemsize
+        for v in strides:
+            tsum *= v
+        if tsum != nbytes:
+            raise ValueError("itemsize and strides must match the size of "
+                             "the MemoryView")
+        view = self._subview(self._offset, tuple(strides),
+                             _packed_steps(itemsize, strides))
+        view._itemsize = itemsize
+        view._getfunc = view._getbytes
+        view._setfunc = view._setbytes
+        return view
+
+    def __buffer__(self, flags):
+        """Provides the data of the MemoryView via the buffer protocol.
+
+        The data is shared, if the source supports the buffer protocol
+        and the MemoryView is contiguous. Otherwise a copy is provided.
+        """
+        if self._is_contiguous():
+            raw = self._rawbuffer()
+            if raw is not None:
+                nbytes = self._itemsize
+                for v in self._strides:
+                    nbytes *= v
+                return raw[self._offset:self._offset + nbytes]
+        return memoryview(self.tobytes())
 
     @property
     def size(self):
@@ -6,6 +6,8 @@ as more complex features, e.g. channel selections, sound effects and more.
 """
 import os
 import wave
+import ctypes
+import weakref
 from pygame2.compat import experimental
 from pygame2.ebs import System
 import pygame2.openal.alc as alc
@@ -13,8 +15,8 @@ import pygame2.openal.al as al
 import pygame2.ogg.vorbisfile as vorbis
 
 
-__all__ = ["SoundData", "SoundSource", "SoundSink", "load_file", "load_stream",
-           "load_wav_file"
+__all__ = ["SoundData", "SoundStream", "SoundSource", "SoundSink", "load_file",
+           "load_stream", "load_wav_file"
            ]
 
 # channel/samplesize to OpenAL format mapping
@@ -33,6 +35,10 @@ SOURCE_PAUSE =  0x03
 SOURCE_STOP =   0x04
 SOURCE_REWIND = 0x09
 
+# Amount of OpenAL sources and buffers to generate at once for the pools
+# of a SoundSink.
+_POOLSIZE = 16
+
 
 class SoundListener(object):
     """A simple sound listener."""
@@ -65,6 +71,120 @@ class SoundData(object):
         return self._bufid
 
 
+class _WavDecoder(object):
+    """Incremental decoder for WAV encoded audio files."""
+    def __init__(self, source):
+        self._fp = wave.open(source, "rb")
+        channels = self._fp.getnchannels()
+        samplewidth = self._fp.getsampwidth()
+        self.format = _FORMATMAP[(channels, samplewidth * 8)]
+        self.frequency = self._fp.getframerate()
+        self._framesize = channels * samplewidth
+
+    def read(self, size):
+        """Reads up to size bytes of PCM data."""
+        return self._fp.readframes(max(1, size // self._framesize))
+
+    def rewind(self):
+        """Rewinds to the start of the audio data."""
+        self._fp.rewind()
+
+    def close(self):
+        """Closes the audio file."""
+        self._fp.close()
+
+
+class _OggDecoder(object):
+    """Incremental decoder for Ogg-Vorbis encoded audio files."""
+    def __init__(self, fname):
+        self._fp = vorbis.fopen(fname)
+        finfo = vorbis.info(self._fp).contents
+        self.format = _FORMATMAP[(finfo.channels, 16)]
+        self.frequency = finfo.rate
+        # ov_read() decodes at most a single Vorbis packet per call.
+        self._chunk = (ctypes.c_char * 4096)()
+
+    def read(self, size):
+        """Reads up to size bytes of PCM data."""
+        chunks = []
+        left = size
+        while left > 0:
+            ret = vorbis.read(self._fp, min(left, 4096), self._chunk)
+            if ret is None:
+                break
+            chunks.append(self._chunk.raw[:ret[1]])
+            left -= ret[1]
+        return b"".join(chunks)
+
+    def rewind(self):
+        """Rewinds to the start of the audio data."""
+        vorbis.pcm_seek(self._fp, 0)
+
+    def close(self):
+        """Closes the audio file."""
+        if self._fp is not None:
+            vorbis.clear(self._fp)
+            self._fp = None
+
+
+class SoundStream(object):
+    """An audio stream, which is decoded incrementally on playback.
+
+    The SoundStream is played by a SoundSource in chunks of buffersize
+    bytes, keeping only the amount of passed buffers filled with the
+    decoded PCM data at once.
+    """
+    def __init__(self, decoder, buffers=4, buffersize=32768, loop=False):
+        """Creates a new SoundStream from the passed decoder."""
+        if buffers < 2:
+            raise ValueError("buffers must be at least 2")
+        if buffersize <= 0:
+            raise ValueError("buffersize must be greater than 0")
+        self._decoder = decoder
+        self.format = decoder.format
+        self.frequency = decoder.frequency
+        self.buffers = buffers
+        self.buffersize = buffersize
+        self.loop = loop
+        self.finished = False
+
+    def read(self):
+        """Reads the next chunk of PCM data.
+
+        Returns an empty byte string, if the end of the stream has been
+        reached. If loop is set, the stream will start over instead.
+        """
+        if self.finished:
+            return b""
+        data = self._decoder.read(self.buffersize)
+        if not data and self.loop:
+            self._decoder.rewind()
+            data = self._decoder.read(self.buffersize)
+        if not data:
+            self.finished = True
+        return data
+
+    def rewind(self):
+        """Rewinds the stream to its start."""
+        self._decoder.rewind()
+        self.finished = False
+
+    def close(self):
+        """Closes the underlying audio file."""
+        self._decoder.close()
+        self.finished = True
+
+
+class _StreamState(object):
+    """Buffer ring of a SoundStream played by an OpenAL source."""
+    def __init__(self, stream, bufids):
+        self.stream = stream
+        self.bufids = bufids
+        self.free = list(bufids)
+        self.queued = []
+        self.playing = False
+
+
 class SoundSource(object):
     """A sound source.
 
@@ -72,14 +192,16 @@ class SoundSource(object):
     sounds.
     """
     def __init__(self, gain=1.0, pitch=1.0, position=(0, 0, 0),
-                 velocity=(0, 0, 0)):
+                 velocity=(0, 0, 0), priority=0):
         """Creates a new SoundSource."""
         self._ssid = None
         self._buffers = []
+        self.stream = None
         self.gain = gain
         self.pitch = pitch
         self.position = position
         self.velocity = velocity
+        self.priority = priority
         self.request = SOURCE_NONE
 
     @property
@@ -88,7 +210,11 @@ class SoundSource(object):
         return self._ssid
 
     def queue(self, sounddata):
-        """Appends a SoundData to the playback queue for the source."""
+        """Appends a SoundData to the playback queue for the source.
+
+        The SoundData will be queued for playback on the next processing
+        of the source by a SoundSink.
+        """
         self._buffers.append(sounddata)
 
 
@@ -99,8 +225,13 @@ class SoundSink(System):
     audio output device and manages the source settings, their buffer queues
     and the playback of them.
     """
-    def __init__(self, device=None):
-        """Creates a new SoundSink for a specific audio output device."""
+    def __init__(self, device=None, maxsources=None):
+        """Creates a new SoundSink for a specific audio output device.
+
+        maxsources limits the amount of OpenAL sources to be used. If it
+        is None, sources are created, until the device refuses to create
+        more of them.
+        """
         super(SoundSink, self).__init__()
         self.componenttypes = (SoundSource, )
         if isinstance(device, alc.ALCdevice):
@@ -111,70 +242,302 @@ class SoundSink(System):
             self._hasopened = True
         self.context = alc.create_context(self.device)
         self.activate()
+        self.maxsources = maxsources
+        # The amount of sources the device could provide, once it refused
+        # to create more of them.
+        self._capacity = None
         self._sources = {}
+        self._freesources = []
+        self._stopped = set()
+        self._queued = {}
         self._buffers = {}
+        # The buffer ids are kept per SoundSink, since OpenAL buffers
+        # can't be shared between devices. The SoundData objects are
+        # referenced weakly, so that their buffers can be reused, once
+        # they are not used anymore.
+        self._bufids = weakref.WeakKeyDictionary()
+        self._bufrefs = {}
+        self._freebuffers = []
+        # The weakref callbacks must not keep the SoundSink alive.
+        sinkref = weakref.ref(self)
+
+        def _release(ref):
+            sink = sinkref()
+            if sink is not None:
+                sink._release_buffer(ref)
+        self._release = _release
+        self._streams = {}
+        self._properties = {}
+        self._batch = al.Batch()
+
+    def _alloc_sources(self):
+        """Generates a new set of OpenAL sources for the source pool."""
+        count = _POOLSIZE
+        for limit in (self.maxsources, self._capacity):
+            if limit is not None:
+                count = min(count, limit - len(self._sources))
+        ssids = None
+        while count > 0 and not ssids:
+            try:
+                ssids = al.gen_sources(count)
+            except al.OpenALError:
+                count //= 2
+        if not ssids:
+            # The device can't provide any more sources.
+            self._capacity = len(self._sources)
+            return
+        for ssid in ssids:
+            self._sources[ssid] = None
+            self._freesources.append(ssid)
+
+    def _release_source(self, ssid):
+        """Stops the OpenAL source and puts it back into the source pool.
+
+        The SoundData queued on the source, which was not played yet, is
+        queued on the SoundSource again, so that it can be played, once
+        the SoundSource gets a new OpenAL source.
+        """
+        source = self._sources[ssid]
+        queued = self._queued.pop(ssid, None)
+        if ssid in self._streams:
+            self._release_stream(ssid)
+        else:
+            # Stopping the source marks all of its buffers as processed.
+            processed = al.get_source_i(ssid, al.AL_BUFFERS_PROCESSED)
+            al.source_stop(ssid)
+            al.source_i(ssid, al.AL_BUFFER, 0)
+            if queued:
+                source._buffers[:0] = queued[processed:]
+        source._ssid = None
+        self._sources[ssid] = None
+        self._stopped.discard(ssid)
+        self._freesources.append(ssid)
+
+    def _steal_source(self, priority):
+        """Releases the OpenAL source of a stopped SoundSource or of the
+        SoundSource with the lowest priority below the passed one.
+
+        Returns True, if a source could be released, False otherwise.
+
+        Finding the lowest priority SoundSource scans all sources in use,
+        since the priority of a SoundSource can change at any time. This
+        is only done, when the source pool is exhausted, and the amount of
+        sources is bounded by the device or maxsources.
+        """
+        if self._stopped:
+            self._release_source(self._stopped.pop())
+            return True
+        victim = None
+        for ksource in self._sources.values():
+            if ksource.priority < priority and \
+                    (victim is None or ksource.priority < victim.priority):
+                victim = ksource
+        if victim is None:
+            return False
+        self._release_source(victim._ssid)
+        return True
 
     def _create_source(self, source):
-        """Creates a new OpenAL source from the the passed SoundSource."""
-        ssid = None
-        for kssid, ksource in self._sources.items():
-            if ksource is None:
-                # Got a free source
-                ssid = kssid
-                break
-        if ssid is not None:
-            source._ssid = ssid
-            self._sources[ssid] = source
-        else:
-            # No free source
-            ssid = al.gen_sources(1)[0]
-            self._sources[ssid] = source
-            source._ssid = ssid
-        al.source_f(ssid, al.AL_GAIN, source.gain)
-        al.source_f(ssid, al.AL_PITCH, source.pitch)
-        al.source_fv(ssid, al.AL_POSITION, source.position)
-        al.source_fv(ssid, al.AL_VELOCITY, source.velocity)
+        """Assigns an OpenAL source from the source pool to the passed
+        SoundSource.
+
+        If all OpenAL sources are in use, the source of a stopped or lower
+        priority SoundSource will be taken. If there is none, None is
+        returned.
+        """
+        if not self._freesources:
+            self._alloc_sources()
+            if not self._freesources and \
+                    not self._steal_source(source.priority):
+                return None
+        ssid = self._freesources.pop()
+        self._sources[ssid] = source
+        source._ssid = ssid
+        self._properties.pop(ssid, None)
+        self._update_source(source)
         return ssid
 
+    def _alloc_buffers(self, count):
+        """Takes count OpenAL buffers from the buffer pool."""
+        free = self._freebuffers
+        if len(free) < count:
+            free.extend(al.gen_buffers(max(count - len(free), _POOLSIZE)))
+        bufids = free[-count:]
+        del free[-count:]
+        return bufids
+
+    def _update_source(self, source, target=al):
+        """Passes the changed properties of the SoundSource to its OpenAL
+        source.
+
+        target can be a pygame2.openal.al.Batch to collect the changes.
+        """
+        ssid = source._ssid
+        values = (source.gain, source.pitch, tuple(source.position),
+                  tuple(source.velocity))
+        last = self._properties.get(ssid)
+        if values == last:
+            return
+        if last is None:
+            last = (None, None, None, None)
+        if values[0] != last[0]:
+            target.source_f(ssid, al.AL_GAIN, source.gain)
+        if values[1] != last[1]:
+            target.source_f(ssid, al.AL_PITCH, source.pitch)
+        if values[2] != last[2]:
+            target.source_fv(ssid, al.AL_POSITION, source.position)
+        if values[3] != last[3]:
+            target.source_fv(ssid, al.AL_VELOCITY, source.velocity)
+        self._properties[ssid] = values
+
     def _create_buffers(self, source):
-        """Creates a new set of OpenAL buffers from the passed
-        SoundSource."""
+        """Queues the SoundData objects, which were added to the passed
+        SoundSource since its last processing.
+
+        The PCM data of each SoundData is uploaded only once per SoundSink
+        into an OpenAL buffer, which can be shared by multiple sources.
+        Buffers, which were played already, are unqueued before, so that
+        the queue of the source does not grow endlessly. The buffer of a
+        SoundData is put back into the buffer pool, once the SoundData is
+        not referenced anymore.
+        """
+        if not source._buffers:
+            return
+        ssid = source._ssid
+        queued = self._queued.setdefault(ssid, [])
+        # OpenAL unqueues the buffers in the order they were queued.
+        processed = al.get_source_i(ssid, al.AL_BUFFERS_PROCESSED)
+        if processed > 0:
+            bufids = self._bufids
+            al.source_unqueue_buffers(ssid, [bufids[snddata] for snddata
+                                             in queued[:processed]])
+            del queued[:processed]
         queue = []
         for snddata in source._buffers:
-            if snddata._bufid is None:
-                bufid = None
-                for kbufid, kdata in self._buffers.items():
-                    if kdata is None:
-                        # free buffer found
-                        bufid = kbufid
-                        break
-                if bufid is not None:
-                    snddata._bufid = bufid
-                    self._buffers[bufid] = snddata
-                else:
-                    # No free buffer id, create a new one
-                    bufid = al.gen_buffers(1)[0]
-                    self._buffers[bufid] = snddata
-                    snddata._bufid = bufid
-            # Buffer id assigned, now buffer the data.
-            al.buffer_data(snddata._bufid, snddata.format, snddata.data,
-                           snddata.frequency)
-            queue.append(snddata._bufid)
-        al.source_queue_buffers(source._ssid, queue)
+            bufid = self._bufids.get(snddata)
+            if bufid is None:
+                bufid = self._alloc_buffers(1)[0]
+                self._bufids[snddata] = bufid
+                self._bufrefs[weakref.ref(snddata, self._release)] = bufid
+                snddata._bufid = bufid
+                al.buffer_data(bufid, snddata.format, snddata.data,
+                               snddata.frequency)
+            queue.append(bufid)
+        al.source_queue_buffers(ssid, queue)
+        queued.extend(source._buffers)
+        del source._buffers[:]
+
+    def _release_buffer(self, ref):
+        """Puts the OpenAL buffer of a SoundData, which is not used
+        anymore, back into the buffer pool."""
+        bufid = self._bufrefs.pop(ref, None)
+        if bufid is not None:
+            self._freebuffers.append(bufid)
+
+    def _release_stream(self, ssid):
+        """Stops the stream played by the passed source and releases the
+        OpenAL buffers used for it."""
+        state = self._streams.pop(ssid)
+        al.source_stop(ssid)
+        if state.queued:
+            al.source_unqueue_buffers(ssid, state.queued)
+        for bufid in state.bufids:
+            del self._buffers[bufid]
+        self._freebuffers.extend(state.bufids)
+
+    def _stream_buffers(self, source):
+        """Refills the processed OpenAL buffers of a streaming
+        SoundSource with the next chunks of its SoundStream."""
+        ssid = source._ssid
+        stream = source.stream
+        state = self._streams.get(ssid)
+        if state is not None and state.stream is not stream:
+            self._release_stream(ssid)
+            state = None
+        if stream is None:
+            return
+        if state is None:
+            bufids = self._alloc_buffers(stream.buffers)
+            for bufid in bufids:
+                self._buffers[bufid] = stream
+            state = self._streams[ssid] = _StreamState(stream, bufids)
+
+        # OpenAL unqueues the buffers in the order they were queued.
+        processed = al.get_source_i(ssid, al.AL_BUFFERS_PROCESSED)
+        if processed > 0:
+            done = state.queued[:processed]
+            del state.queued[:processed]
+            al.source_unqueue_buffers(ssid, done)
+            state.free.extend(done)
+
+        # Stopped and paused streams are not decoded any further. An idle
+        # ring is filled, so that playback can start at once.
+        queue = []
+        while state.free and (state.playing or not state.queued):
+            data = stream.read()
+            if not data:
+                break
+            bufid = state.free.pop()
+            al.buffer_data(bufid, stream.format, data, stream.frequency)
+            queue.append(bufid)
+        if queue:
+            al.source_queue_buffers(ssid, queue)
+            state.queued.extend(queue)
+        if not state.queued:
+            state.playing = False
+        elif state.playing and \
+                al.get_source_i(ssid, al.AL_SOURCE_STATE) == al.AL_STOPPED:
+            # The source ran out of data before it was refilled.
+            al.source_play(ssid)
+
+    def _rewind_stream(self, source):
+        """Rewinds the SoundStream of a streaming SoundSource.
+
+        Like a rewound static source, the source is put into its initial
+        state and has to be played again.
+        """
+        ssid = source._ssid
+        state = self._streams[ssid]
+        al.source_stop(ssid)
+        if state.queued:
+            al.source_unqueue_buffers(ssid, state.queued)
+        al.source_rewind(ssid)
+        state.queued = []
+        state.free = list(state.bufids)
+        state.playing = False
+        state.stream.rewind()
+        self._stream_buffers(source)
 
     def __del__(self):
         """Deletes the SoundSink and also destroys the associated
         context and closes the bound audio output device."""
         if self.context:
             for ssid, source in self._sources.items():
+                if source is None:
+                    continue
                 querystate = al.get_source_i(ssid, al.AL_SOURCE_STATE)
                 if querystate != al.AL_STOPPED:
                     al.source_stop(ssid)
-                al.delete_sources([ssid])
                 source._ssid = None
+            if self._sources:
+                al.delete_sources(list(self._sources.keys()))
             self._sources = {}
-            al.delete_buffers(self._buffers.keys())
+            self._freesources = []
+            self._stopped = set()
+            self._queued = {}
+            self._streams = {}
+            self._properties = {}
+            for snddata, bufid in list(self._bufids.items()):
+                if snddata._bufid == bufid:
+                    snddata._bufid = None
+            bufids = list(self._buffers.keys()) + \
+                list(self._bufrefs.values()) + self._freebuffers
             self._buffers = {}
+            self._bufids = weakref.WeakKeyDictionary()
+            self._bufrefs = {}
+            if bufids:
+                al.delete_buffers(bufids)
+            self._freebuffers = []
             alc.destroy_context(self.context)
             if self._hasopened:
                 alc.close_device(self.device)
@@ -195,9 +558,10 @@ class SoundSink(System):
         Note: this implicitly activates the SoundSink.
         """
         self.activate()
-        al.listener_fv(al.AL_POSITION, listener.position)
-        al.listener_fv(al.AL_VELOCITY, listener.velocity)
-        al.listener_fv(al.AL_ORIENTATION, listener.orientation)
+        with self._batch as batch:
+            batch.listener_fv(al.AL_POSITION, listener.position)
+            batch.listener_fv(al.AL_VELOCITY, listener.velocity)
+            batch.listener_fv(al.AL_ORIENTATION, listener.orientation)
 
     def process_source(self, source):
         """Processes a SoundSource.
@@ -209,35 +573,57 @@ class SoundSink(System):
         ssid = source._ssid
         if ssid is None:
             ssid = self._create_source(source)
+            if ssid is None:
+                # No OpenAL source available, try again later.
+                return
+        else:
+            self._update_source(source)
 
-        # TODO: this should be only set on changes.
-        # al.source_f(ssid, al.AL_GAIN, source.gain)
-        # al.source_f(ssid, al.AL_PITCH, source.pitch)
-        # al.source_fv(ssid, al.AL_POSITION, source.position)
-        # al.source_fv(ssid, al.AL_VELOCITY, source.velocity)
-
-        self._create_buffers(source)
+        if source.stream is not None or ssid in self._streams:
+            self._stream_buffers(source)
+        else:
+            self._create_buffers(source)
+        state = self._streams.get(ssid)
         querystate = al.get_source_i(ssid, al.AL_SOURCE_STATE)
+        stopped = querystate == al.AL_STOPPED
         if source.request == SOURCE_NONE:
             # if no change is to be made, nothing will be done.
             pass
         elif source.request == SOURCE_REWIND:
-            al.source_rewind(ssid)
+            if state is not None:
+                self._rewind_stream(source)
+            else:
+                al.source_rewind(ssid)
+            stopped = False
             source.request = SOURCE_NONE
         elif source.request == SOURCE_PLAY:
             if querystate != al.AL_PLAYING:
                 al.source_play(ssid)
+            if state is not None:
+                state.playing = True
+            stopped = False
             source.request = SOURCE_NONE
         elif source.request == SOURCE_STOP:
-            if querystate != al.AL_STOPPED:
+            if state is not None:
+                # A stopped stream starts over like a static source.
+                self._rewind_stream(source)
+            elif querystate != al.AL_STOPPED:
                 al.source_stop(ssid)
+            stopped = True
             source.request = SOURCE_NONE
         elif source.request == SOURCE_PAUSE:
             if querystate != al.AL_PAUSED:
                 al.source_pause(ssid)
+            if state is not None:
+                state.playing = False
             source.request = SOURCE_NONE
         else:
             raise ValueError("invalid request state on source")
+        # Stopped sources are the first ones to be taken for other sources.
+        if stopped and state is None:
+            self._stopped.add(ssid)
+        else:
+            self._stopped.discard(ssid)
 
     def process(self, world, components):
         """Processes SoundSource components, playing their attached
@@ -247,6 +633,15 @@ class SoundSink(System):
         """
         process_source = self.process_source
         self.activate()
+        if iter(components) is components:
+            # The components are iterated twice.
+            components = list(components)
+        # Pass the property changes of all sources at once, before their
+        # playback is processed.
+        with self._batch as batch:
+            for source in components:
+                if source._ssid is not None:
+                    self._update_source(source, batch)
         for source in components:
             process_source(source)
 
@@ -295,6 +690,20 @@ def load_file(fname):
     return funcptr(fname)
 
 
-def load_stream(source):
-    """Loads an audio stream into a SoundData object."""
-    raise NotImplementedError("not implemented yet")
+def load_stream(source, buffers=4, buffersize=32768, loop=False):
+    """Opens an audio file for streaming and returns a SoundStream for it.
+
+    source can be the name of a WAV or Ogg-Vorbis encoded audio file or
+    a file object providing WAV encoded audio data.
+    """
+    if hasattr(source, "read"):
+        decoder = _WavDecoder(source)
+    else:
+        ext = os.path.splitext(source)[1].lower()
+        if ext == ".wav":
+            decoder = _WavDecoder(source)
+        elif ext == ".ogg":
+            decoder = _OggDecoder(source)
+        else:
+            raise ValueError("unsupported audio file type")
+    return SoundStream(decoder, buffers, buffersize, loop)
@@ -9,11 +9,23 @@ are separately stored. For each individual component type a processing
 system will take care of all necessary updates for the World
 environment.
 """
+import math
 import uuid
 import inspect
+import timeit
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 from pygame2.compat import *
 
-__all__ = ["Entity", "World", "System", "Applicator"]
+__all__ = ["Entity", "World", "System", "Applicator", "QueryView",
+           "ThreadedScheduler", "SystemProfiler", "DICTSTORAGE", "ARCHETYPESTORAGE",
+           "UUIDIDS", "INTEGERIDS"]
+
+DICTSTORAGE = 0
+ARCHETYPESTORAGE = 1
+
+UUIDIDS = 0
+INTEGERIDS = 1
 
 
 class Entity(object):
@@ -29,11 +41,13 @@ class Entity(object):
     the application world as long as it does not carry any data that can
     be processed by a system within the application world.
     """
+    __slots__ = ("_id", "_world")
+
     def __new__(cls, world, *args, **kwargs):
         if not isinstance(world, World):
             raise TypeError("world must be a World")
         entity = object.__new__(cls)
-        entity._id = uuid.uuid4()
+        entity._id = world._new_entity_id()
         entity._world = world
         world.entities.add(entity)
         return entity
@@ -60,20 +74,9 @@ class Entity(object):
         if name in ("_id", "_world"):
             object.__setattr__(self, name, value)
         else:
-            # If the value is a compound component (e.g. a Button
-            # inheriting from a Sprite), it needs to be added to all
-            # supported component type instances.
-            mro = inspect.getmro(value.__class__)
-            if type in mro:
-                stop = mro.index(type)
-            else:
-                stop = mro.index(object)
-            mro = mro[0:stop]
-            wctypes = self._world.componenttypes
-            for clstype in mro:
-                if clstype not in wctypes:
-                    self._world.add_componenttype(clstype)
-                self._world.components[clstype][self] = value
+            world = self._world
+            world._set_components(self, world._get_ctypes(value.__class__),
+                                  value)
 
     def __delattr__(self, name):
         """Deletes the component data related to the Entity."""
@@ -84,7 +87,7 @@ class Entity(object):
         except KeyError:
             raise AttributeError("object '%s' has no attribute '%s'" % \
                 (self.__class__.__name__, name))
-        del self._world.components[ctype][self]
+        self._world._remove_component(self, ctype)
 
     def delete(self):
         """Removes the Entity from the world it belongs to."""
@@ -101,6 +104,262 @@ class Entity(object):
         return self._world
 
 
+class _IntegerIDs(object):
+    """Allocates generation-tagged integer ids for entities.
+
+    The lower 32 bits of an id denote a slot, the upper bits the
+    generation of the slot. Slots of deleted entities are reused, while
+    their generation is increased, so that ids of deleted entities do
+    not clash with ids of living ones.
+    """
+    def __init__(self):
+        self._generations = []
+        self._free = []
+
+    def allocate(self):
+        """Gets a new id."""
+        if self._free:
+            index = self._free.pop()
+        else:
+            index = len(self._generations)
+            self._generations.append(0)
+        return (self._generations[index] << 32) | index
+
+    def release(self, eid):
+        """Marks the id as unused, so that its slot can be reused."""
+        index = eid & 0xFFFFFFFF
+        self._generations[index] += 1
+        self._free.append(index)
+
+
+class _Archetype(object):
+    """A packed storage for all entities sharing the same set of component
+    types.
+
+    Each component type is kept in its own column list, which allows
+    systems to walk over the components of the archetype linearly.
+    """
+    def __init__(self, signature):
+        self.signature = signature
+        self.entities = []
+        self.index = {}
+        self.columns = dict((ctype, []) for ctype in signature)
+
+    def append(self, entity, values):
+        """Adds the entity and its component values to the archetype."""
+        self.index[entity] = len(self.entities)
+        self.entities.append(entity)
+        for ctype, column in self.columns.items():
+            column.append(values[ctype])
+
+    def remove(self, entity):
+        """Removes the entity from the archetype and returns its component
+        values.
+
+        The last row of the archetype is moved into the freed slot, so
+        that the columns stay packed.
+        """
+        row = self.index.pop(entity)
+        entities = self.entities
+        last = entities.pop()
+        values = {}
+        if last is entity:
+            for ctype, column in self.columns.items():
+                values[ctype] = column.pop()
+        else:
+            entities[row] = last
+            self.index[last] = row
+            for ctype, column in self.columns.items():
+                values[ctype] = column[row]
+                column[row] = column.pop()
+        return values
+
+
+class _ArchetypeStorage(object):
+    """Keeps the entities of a World grouped by their component signature."""
+    def __init__(self):
+        self.archetypes = {}
+        self.locations = {}
+        self._matches = {}
+
+    def _get_archetype(self, signature):
+        """Gets or creates the archetype for the passed signature."""
+        archetype = self.archetypes.get(signature, None)
+        if archetype is None:
+            archetype = _Archetype(signature)
+            self.archetypes[signature] = archetype
+            for key, matches in self._matches.items():
+                if signature.issuperset(key):
+                    matches.append(archetype)
+        return archetype
+
+    def set_components(self, entity, ctypes, value):
+        """Stores value for the component types on the entity, moving the
+        entity into another archetype, if its signature changes.
+        """
+        archetype = self.locations.get(entity, None)
+        if archetype is not None:
+            signature = archetype.signature
+            if signature.issuperset(ctypes):
+                row = archetype.index[entity]
+                columns = archetype.columns
+                for ctype in ctypes:
+                    columns[ctype][row] = value
+                return
+            values = archetype.remove(entity)
+            signature = signature.union(ctypes)
+        else:
+            values = {}
+            signature = frozenset(ctypes)
+        for ctype in ctypes:
+            values[ctype] = value
+        archetype = self._get_archetype(signature)
+        archetype.append(entity, values)
+        self.locations[entity] = archetype
+
+    def remove_component(self, entity, ctype):
+        """Removes the component type from the entity."""
+        archetype = self.locations[entity]
+        values = archetype.remove(entity)
+        del values[ctype]
+        if not values:
+            del self.locations[entity]
+            return
+        archetype = self._get_archetype(archetype.signature - set((ctype,)))
+        archetype.append(entity, values)
+        self.locations[entity] = archetype
+
+    def delete(self, entity):
+        """Removes the entity and all its components."""
+        archetype = self.locations.pop(entity, None)
+        if archetype is not None:
+            archetype.remove(entity)
+
+    def matching(self, comptypes):
+        """Gets the archetypes that contain all of the component types."""
+        key = frozenset(comptypes)
+        matches = self._matches.get(key, None)
+        if matches is None:
+            matches = [a for s, a in self.archetypes.items()
+                       if s.issuperset(key)]
+            self._matches[key] = matches
+        return matches
+
+    def combined_components(self, comptypes):
+        """An iterator over the combined sets of component items.
+
+        The items are collected at once, since adding or removing
+        components while iterating moves entities between the
+        archetypes.
+        """
+        items = []
+        for archetype in self.matching(comptypes):
+            if not archetype.entities:
+                continue
+            columns = archetype.columns
+            items.extend(zip(*[columns[ctype] for ctype in comptypes]))
+        return iter(items)
+
+
+class QueryView(object):
+    """A view on the combined component sets of a World.
+
+    The QueryView keeps the component tuples of all entities, which
+    carry all of its component types. It is updated by the World, every
+    time an entity gains or loses a component or is deleted, so that
+    iterating over it does not require any lookups.
+
+    Iterating over a QueryView yields the component tuples as they were
+    at the start of the iteration.
+
+    QueryView objects are not created directly, but via World.query().
+    """
+    def __init__(self, world, componenttypes):
+        """Creates a new QueryView for the passed component types."""
+        self._world = world
+        self._componenttypes = componenttypes
+        self._archetypes = world._archetypes
+        self._rows = []
+        self._entities = []
+        self._index = {}
+        if self._archetypes is None:
+            comps = world.components
+            keysets = [set(comps[ctype]) for ctype in componenttypes]
+            for entity in keysets[0].intersection(*keysets[1:]):
+                self._add(entity,
+                          tuple(comps[ctype][entity]
+                                for ctype in componenttypes))
+
+    def __iter__(self):
+        if self._archetypes is not None:
+            return self._archetypes.combined_components(self._componenttypes)
+        # Iterate over a copy, since components might be added or removed
+        # while iterating, which moves the rows around.
+        return iter(list(self._rows))
+
+    def __len__(self):
+        if self._archetypes is not None:
+            matches = self._archetypes.matching(self._componenttypes)
+            return sum(len(archetype.entities) for archetype in matches)
+        return len(self._rows)
+
+    def __repr__(self):
+        return "QueryView(componenttypes=%s)" % (self._componenttypes,)
+
+    def _add(self, entity, row):
+        """Adds a row for the entity."""
+        self._index[entity] = len(self._rows)
+        self._rows.append(row)
+        self._entities.append(entity)
+
+    def _update(self, entity):
+        """Adds, replaces or removes the row for the entity, depending on
+        the components it currently carries."""
+        comps = self._world.components
+        try:
+            row = tuple(comps[ctype][entity]
+                        for ctype in self._componenttypes)
+        except KeyError:
+            self._remove(entity)
+            return
+        index = self._index.get(entity, None)
+        if index is None:
+            self._add(entity, row)
+        else:
+            self._rows[index] = row
+
+    def _remove(self, entity):
+        """Removes the row of the entity, if any.
+
+        The last row is moved into the freed slot, so that the rows stay
+        packed.
+        """
+        index = self._index.pop(entity, None)
+        if index is None:
+            return
+        rows = self._rows
+        entities = self._entities
+        lastrow = rows.pop()
+        last = entities.pop()
+        if last is not entity:
+            rows[index] = lastrow
+            entities[index] = last
+            self._index[last] = index
+
+    @property
+    def componenttypes(self):
+        """The component types of the QueryView."""
+        return self._componenttypes
+
+    @property
+    def entities(self):
+        """The entities contained in the QueryView."""
+        if self._archetypes is not None:
+            matches = self._archetypes.matching(self._componenttypes)
+            return [e for archetype in matches for e in archetype.entities]
+        return list(self._entities)
+
+
 class World(object):
     """A simple application world.
 
@@ -117,12 +376,49 @@ class World(object):
     The order in which data is processed depends on the order of the
     added systems.
     """
-    def __init__(self):
-        """Creates a new World instance."""
+    def __init__(self, storage=DICTSTORAGE, idtype=UUIDIDS):
+        """Creates a new World instance.
+
+        storage denotes the way, component data is kept for combined
+        processing. DICTSTORAGE builds the combined sets of components
+        on demand, while ARCHETYPESTORAGE keeps entities with the same
+        set of component types in packed columns, so that combined sets
+        can be walked linearly. The latter speeds up Applicator
+        processing at the cost of slightly more expensive component
+        changes.
+
+        idtype denotes the kind of ids to assign to entities. UUIDIDS
+        assigns a uuid.UUID to each entity, INTEGERIDS assigns compact,
+        generation-tagged integers, which are cheaper to create and to
+        hash.
+        """
+        if storage == DICTSTORAGE:
+            self._archetypes = None
+        elif storage == ARCHETYPESTORAGE:
+            self._archetypes = _ArchetypeStorage()
+        else:
+            raise ValueError("storage must be DICTSTORAGE or ARCHETYPESTORAGE")
+        if idtype == UUIDIDS:
+            self._ids = None
+            self._new_entity_id = uuid.uuid4
+        elif idtype == INTEGERIDS:
+            self._ids = _IntegerIDs()
+            self._new_entity_id = self._ids.allocate
+        else:
+            raise ValueError("idtype must be UUIDIDS or INTEGERIDS")
+        self._storage = storage
+        self._idtype = idtype
+        self._scheduler = None
+        self._profiler = None
         self.entities = set()
         self._systems = []
         self.components = {}
         self._componenttypes = {}
+        self._queries = {}
+        self._queryviews = {}
+        self._ctypecache = {}
+        self._processing = False
+        self._pending = set()
 
     def _system_is_valid(self, system):
         """Checks, if the passed object fulfills the requirements for being
@@ -133,8 +429,88 @@ class World(object):
                 hasattr(system, "process") and \
                 callable(system.process)
 
+    def _get_ctypes(self, classtype):
+        """Gets the component types, a value of the passed class is
+        stored as, adding them to the World, if necessary."""
+        ctypes = self._ctypecache.get(classtype, None)
+        if ctypes is not None:
+            return ctypes
+        # If the value is a compound component (e.g. a Button
+        # inheriting from a Sprite), it needs to be added to all
+        # supported component type instances.
+        mro = inspect.getmro(classtype)
+        if type in mro:
+            stop = mro.index(type)
+        else:
+            stop = mro.index(object)
+        ctypes = mro[0:stop]
+        for clstype in ctypes:
+            self.add_componenttype(clstype)
+        self._ctypecache[classtype] = ctypes
+        return ctypes
+
+    def _set_components(self, entity, ctypes, value):
+        """Associates value with the entity for each of the component
+        types."""
+        components = self.components
+        for ctype in ctypes:
+            components[ctype][entity] = value
+        if self._archetypes is not None:
+            self._archetypes.set_components(entity, ctypes, value)
+        elif self._queryviews:
+            self._update_queries(entity, ctypes)
+
+    def _remove_component(self, entity, ctype):
+        """Removes the component of the specific type from the entity."""
+        del self.components[ctype][entity]
+        if self._archetypes is not None:
+            self._archetypes.remove_component(entity, ctype)
+        elif self._queryviews:
+            self._update_queries(entity, (ctype,))
+
+    def _update_queries(self, entity, ctypes):
+        """Updates all QueryView objects affected by a change of the
+        component types of the entity."""
+        queryviews = self._queryviews
+        updated = set()
+        for ctype in ctypes:
+            for view in queryviews.get(ctype, ()):
+                if view not in updated:
+                    updated.add(view)
+                    view._update(entity)
+
+    def query(self, *componenttypes):
+        """Gets a QueryView on the combined sets of the passed component
+        types.
+
+        The QueryView is created once and kept up to date by the World,
+        so that repeated queries for the same component types do not
+        need to build the combined sets again.
+        """
+        if len(componenttypes) == 0:
+            raise ValueError("at least one component type must be passed")
+        view = self._queries.get(componenttypes, None)
+        if view is not None:
+            return view
+        for classtype in componenttypes:
+            if classtype not in self.components:
+                self.add_componenttype(classtype)
+        view = QueryView(self, componenttypes)
+        self._queries[componenttypes] = view
+        if self._archetypes is None:
+            for classtype in componenttypes:
+                self._queryviews.setdefault(classtype, []).append(view)
+        return view
+
     def combined_components(self, comptypes):
         """A generator view on combined sets of component items."""
+        if self._archetypes is not None:
+            return self._archetypes.combined_components(comptypes)
+        return self._combined_dict_components(comptypes)
+
+    def _combined_dict_components(self, comptypes):
+        """Builds the combined sets of component items from the
+        component dictionaries."""
         comps = self.components
         keysets = [set(comps[ctype]) for ctype in comptypes]
         valsets = [comps[ctype] for ctype in comptypes]
@@ -149,24 +525,71 @@ class World(object):
         self.components[classtype] = {}
         self._componenttypes[classtype.__name__.lower()] = classtype
 
+    def create_entities(self, count, **componentfactories):
+        """Creates multiple entities at once and returns them as list.
+
+        The keyword arguments map component attribute names to factory
+        functions. Each factory function is invoked with the created
+        Entity as single argument and has to return the component value
+        to be set for that attribute.
+
+            world.create_entities(100,
+                                  position=lambda e: Position(0, 0),
+                                  movement=lambda e: Movement(1, 1))
+        """
+        new_entity = Entity.__new__
+        entities = [new_entity(Entity, self) for x in range(count)]
+        get_ctypes = self._get_ctypes
+        set_components = self._set_components
+        for factory in componentfactories.values():
+            for entity in entities:
+                value = factory(entity)
+                set_components(entity, get_ctypes(value.__class__), value)
+        return entities
+
     def delete(self, entity):
-        """Removes an Entity from the World, including all its data."""
-        for componentset in self.components.values():
-            componentset.pop(entity, None)
-        self.entities.discard(entity)
+        """Removes an Entity from the World, including all its data.
+
+        If called while the World is processing its systems, the
+        removal is deferred until all systems have been processed.
+        """
+        if self._processing:
+            self._pending.add(entity)
+        else:
+            self._delete_entities((entity,))
 
     def delete_entities(self, entities):
-        """Removes multiple entities from the World at once."""
-        eids = set(entities)
-        if ISPYTHON2:
-            for compkey, compset in self.components.viewitems():
-                keys = set(compset.viewkeys()) - eids
-                self.components[compkey] = dict((k, compset[k]) for k in keys)
+        """Removes multiple entities from the World at once.
+
+        If called while the World is processing its systems, the
+        removal is deferred until all systems have been processed.
+        """
+        if self._processing:
+            self._pending.update(entities)
+        else:
+            self._delete_entities(entities)
+
+    def _delete_entities(self, entities):
+        """Removes the entities and all their data from the World."""
+        eids = self.entities.intersection(entities)
+        if not eids:
+            return
+        componentsets = list(self.components.values())
+        for entity in eids:
+            for componentset in componentsets:
+                componentset.pop(entity, None)
+        if self._archetypes is not None:
+            for entity in eids:
+                self._archetypes.delete(entity)
         else:
-            for compkey, compset in self.components.items():
-                keys = set(compset.keys()) - eids
-                self.components[compkey] = dict((k, compset[k]) for k in keys)
-        self.entities -= set(entities)
+            for view in self._queries.values():
+                for entity in eids:
+                    view._remove(entity)
+        if self._ids is not None:
+            release = self._ids.release
+            for entity in eids:
+                release(entity.id)
+        self.entities -= eids
 
     def get_components(self, componenttype):
         """Gets all existing components for a sepcific component type.
@@ -228,21 +651,86 @@ class World(object):
         """Removes a processing system from the world."""
         self._systems.remove(system)
 
+    def _process_system(self, system):
+        """Processes the components of a single system, measuring it, if
+        a profiler is set."""
+        if self._profiler is None:
+            self._run_system(system)
+        else:
+            self._profiler.profile_system(self, system)
+
+    def _run_system(self, system):
+        """Processes the components of a single system."""
+        s_process = system.process
+        if getattr(system, "is_applicator", False):
+            s_process(self, self.query(*system.componenttypes))
+        else:
+            components = self.components
+            if ISPYTHON2:
+                for ctype in system.componenttypes:
+                    s_process(self, components[ctype].viewvalues())
+            else:
+                for ctype in system.componenttypes:
+                    s_process(self, components[ctype].values())
+
     def process(self):
-        """Processes all components within their corresponding systems."""
-        components = self.components
-        for system in self._systems:
-            s_process = system.process
-            if getattr(system, "is_applicator", False):
-                comps = self.combined_components(system.componenttypes)
-                s_process(self, comps)
+        """Processes all components within their corresponding systems.
+
+        If a scheduler is set, the processing is delegated to it.
+        Entities deleted while processing are removed at once, after all
+        systems have been processed.
+        """
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.begin_frame()
+        self._processing = True
+        try:
+            if self._scheduler is not None:
+                self._scheduler.process(self)
             else:
-                if ISPYTHON2:
-                    for ctype in system.componenttypes:
-                        s_process(self, components[ctype].viewvalues())
-                else:
-                    for ctype in system.componenttypes:
-                        s_process(self, components[ctype].values())
+                process_system = self._process_system
+                for system in self._systems:
+                    process_system(system)
+        finally:
+            self._processing = False
+            if self._pending:
+                pending = self._pending
+                self._pending = set()
+                self._delete_entities(pending)
+        if profiler is not None:
+            profiler.end_frame()
+
+    @property
+    def profiler(self):
+        """The profiler used to measure the processing of the systems.
+
+        If set to None, no measurements will be taken.
+        """
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, value):
+        """The profiler used to measure the processing of the systems."""
+        if value is not None and not isinstance(value, SystemProfiler):
+            raise TypeError("profiler must be a SystemProfiler")
+        self._profiler = value
+
+    @property
+    def scheduler(self):
+        """The scheduler used to process the systems.
+
+        If set to None, the systems are processed sequentially in the
+        order they were added.
+        """
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, value):
+        """The scheduler used to process the systems."""
+        if value is not None and not (hasattr(value, "process") and
+                                      callable(value.process)):
+            raise TypeError("scheduler must have a process method")
+        self._scheduler = value
 
     @property
     def systems(self):
@@ -254,6 +742,16 @@ class World(object):
         """Gets the supported component types of the world."""
         return self._componenttypes.values()
 
+    @property
+    def storage(self):
+        """The storage type used for combined component sets."""
+        return self._storage
+
+    @property
+    def idtype(self):
+        """The type of ids assigned to entities."""
+        return self._idtype
+
 
 class System(object):
     """A processing system for component data.
@@ -282,3 +780,285 @@ class Applicator(System):
     def __init__(self):
         super(Applicator, self).__init__()
         self.is_applicator = True
+
+
+class _ProfileRecord(object):
+    """Ring buffers with the measurements of a single system."""
+    def __init__(self, frames):
+        self.times = [0.0] * frames
+        self.counts = [0] * frames
+        self.calls = 0
+
+
+def _percentile(values, percent):
+    """Gets the nearest-rank percentile of the passed values."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = max(0, int(math.ceil(percent / 100.0 * len(values))) - 1)
+    return values[min(rank, len(values) - 1)]
+
+
+class SystemProfiler(object):
+    """Measures the processing of the systems of a World.
+
+    The SystemProfiler records the wall time and the amount of processed
+    components of each system for the most recent frames in fixed-size
+    ring buffers, along with the total amount of processing calls and
+    the wall time of each whole World.process() call.
+
+    Every system bound to the World, such as a SpriteRenderer or
+    SoundSink, is measured, once the SystemProfiler is assigned to
+    World.profiler.
+    """
+    def __init__(self, frames=120):
+        """Creates a new SystemProfiler, which keeps the measurements of
+        the last frames World.process() calls."""
+        if frames < 1:
+            raise ValueError("frames must be greater than 0")
+        self._frames = frames
+        self._exportfunc = None
+        self.reset()
+
+    def reset(self):
+        """Removes all measurements."""
+        self._records = {}
+        self._frametimes = [0.0] * self._frames
+        self._frame = 0
+        self._filled = 0
+        self._framestart = 0.0
+
+    def begin_frame(self):
+        """Marks the start of a new frame."""
+        self._framestart = timeit.default_timer()
+
+    def end_frame(self):
+        """Marks the end of the current frame.
+
+        Once the ring buffers are filled completely, the export callback
+        is invoked with the SystemProfiler as argument.
+        """
+        frame = self._frame
+        self._frametimes[frame] = timeit.default_timer() - self._framestart
+        frame += 1
+        if self._filled < self._frames:
+            self._filled += 1
+        if frame == self._frames:
+            frame = 0
+            if self._exportfunc is not None:
+                self._exportfunc(self)
+        self._frame = frame
+
+    def profile_system(self, world, system):
+        """Processes the system within the passed World and records its
+        wall time and the amount of processed components."""
+        record = self._records.get(system, None)
+        if record is None:
+            record = _ProfileRecord(self._frames)
+            self._records[system] = record
+        if getattr(system, "is_applicator", False):
+            count = len(world.query(*system.componenttypes))
+        else:
+            components = world.components
+            count = sum(len(components[ctype])
+                        for ctype in system.componenttypes)
+        start = timeit.default_timer()
+        world._run_system(system)
+        record.times[self._frame] = timeit.default_timer() - start
+        record.counts[self._frame] = count
+        record.calls += 1
+
+    def _ordered(self, ring):
+        """Gets the filled values of the ring buffer, oldest first."""
+        if self._filled < self._frames:
+            return ring[:self._filled]
+        return ring[self._frame:] + ring[:self._frame]
+
+    def get_times(self, system):
+        """Gets the recorded wall times of the system in seconds, oldest
+        first."""
+        return self._ordered(self._records[system].times)
+
+    def get_counts(self, system):
+        """Gets the recorded amounts of processed components of the
+        system, oldest first."""
+        return self._ordered(self._records[system].counts)
+
+    def get_calls(self, system):
+        """Gets the total amount of processing calls for the system."""
+        record = self._records.get(system, None)
+        if record is None:
+            return 0
+        return record.calls
+
+    def percentile(self, system, percent):
+        """Gets the percentile of the recorded wall times of the system.
+
+        If system is None, the wall times of the whole frames are used.
+        """
+        if system is None:
+            return _percentile(self.frametimes, percent)
+        return _percentile(self.get_times(system), percent)
+
+    def get_statistics(self, percentiles=(50, 99)):
+        """Gets the rolling statistics for all measured systems.
+
+        The result is a dictionary, mapping each system to a dictionary
+        containing the amount of calls, the mean wall time, the wall
+        time percentiles (e.g. 'p50' and 'p99' for the default
+        percentiles) and the mean amount of processed components.
+        The statistics of the whole frames are stored under None.
+        """
+        result = {}
+        entries = [(None, self.frametimes, None, None)]
+        for system, record in self._records.items():
+            entries.append((system, self._ordered(record.times),
+                            self._ordered(record.counts), record.calls))
+        for system, times, counts, calls in entries:
+            stats = {"mean": 0.0}
+            if times:
+                stats["mean"] = sum(times) / len(times)
+            for percent in percentiles:
+                stats["p%s" % percent] = _percentile(times, percent)
+            if counts is not None:
+                stats["calls"] = calls
+                stats["components"] = 0.0
+                if counts:
+                    stats["components"] = float(sum(counts)) / len(counts)
+            result[system] = stats
+        return result
+
+    @property
+    def frames(self):
+        """The amount of frames to keep measurements for."""
+        return self._frames
+
+    @property
+    def frametimes(self):
+        """The wall times of the recorded frames in seconds, oldest
+        first."""
+        return self._ordered(self._frametimes)
+
+    @property
+    def systems(self):
+        """The measured systems."""
+        return tuple(self._records.keys())
+
+    @property
+    def exportfunc(self):
+        """The function to be invoked, every time the ring buffers have
+        been filled completely."""
+        return self._exportfunc
+
+    @exportfunc.setter
+    def exportfunc(self, value):
+        """The function to be invoked, every time the ring buffers have
+        been filled completely."""
+        if value is not None and not callable(value):
+            raise TypeError("exportfunc must be callable")
+        self._exportfunc = value
+
+
+def _types_overlap(types1, types2):
+    """Checks, if any of the component types of the first set shares
+    component instances with any of the second set."""
+    for t1 in types1:
+        for t2 in types2:
+            if issubclass(t1, t2) or issubclass(t2, t1):
+                return True
+    return False
+
+
+class ThreadedScheduler(object):
+    """A scheduler, which processes non-conflicting systems concurrently.
+
+    The ThreadedScheduler analyses the component types of the systems of
+    a World and groups them into stages. Systems within the same stage
+    do not operate on the same component types and are processed in
+    parallel using a pool of threads, while the stages are processed one
+    after each other.
+
+    Two systems conflict, if one of them writes a component type the
+    other one reads or writes. By default every component type of a
+    system is considered to be written. A system can declare component
+    types, it only reads, via an optional 'readonly' attribute, which
+    must be an iterable of component types. Conflicting systems are
+    processed in the order they were added to the World.
+
+    Systems, which need to run on the main thread, such as most
+    rendering systems, should not be processed by the
+    ThreadedScheduler.
+    """
+    def __init__(self, workers=None):
+        """Creates a new ThreadedScheduler.
+
+        workers denotes the amount of threads to use. If it is None, the
+        amount of available CPUs will be used.
+        """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers < 1:
+            raise ValueError("workers must be greater than 0")
+        self._workers = workers
+        self._pool = None
+        self._systems = None
+        self._stages = None
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Releases the threads used by the ThreadedScheduler."""
+        if getattr(self, "_pool", None) is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def _conflicts(self, system1, system2):
+        """Checks, if both systems cannot be processed concurrently."""
+        readonly1 = tuple(getattr(system1, "readonly", ()))
+        readonly2 = tuple(getattr(system2, "readonly", ()))
+        writes1 = [t for t in system1.componenttypes if t not in readonly1]
+        writes2 = [t for t in system2.componenttypes if t not in readonly2]
+        return _types_overlap(writes1, system2.componenttypes) or \
+            _types_overlap(writes2, system1.componenttypes)
+
+    def get_stages(self, systems):
+        """Groups the passed systems into stages of systems, which can be
+        processed concurrently.
+
+        A system is placed into the stage following the latest stage of
+        any preceding system it conflicts with.
+        """
+        stages = []
+        levels = []
+        for index, system in enumerate(systems):
+            level = 0
+            for prev in range(index):
+                if levels[prev] >= level and \
+                        self._conflicts(systems[prev], system):
+                    level = levels[prev] + 1
+            levels.append(level)
+            if level == len(stages):
+                stages.append([])
+            stages[level].append(system)
+        return stages
+
+    def process(self, world):
+        """Processes the systems of the passed World."""
+        systems = world.systems
+        if systems != self._systems:
+            self._stages = self.get_stages(systems)
+            self._systems = systems
+        process_system = world._process_system
+        for stage in self._stages:
+            if len(stage) == 1:
+                process_system(stage[0])
+            else:
+                if self._pool is None:
+                    self._pool = ThreadPool(self._workers)
+                self._pool.map(process_system, stage)
+
+    @property
+    def workers(self):
+        """The amount of threads used for processing."""
+        return self._workers
@@ -0,0 +1,412 @@
+"""
+A software audio mixer, which does not require OpenAL.
+
+The Mixer mixes a fixed amount of channels within the SDL2 audio
+callback into the audio output device of SDL2.
+"""
+import wave
+import ctypes
+import weakref
+import pygame2.sdl as sdl
+import pygame2.sdl.audio as sdlaudio
+
+_HASNUMPY = True
+try:
+    import numpy
+except ImportError:
+    _HASNUMPY = False
+
+__all__ = ["Sound", "Channel", "Mixer"]
+
+
+# Supported output formats with their numpy type and center value
+_FORMATMAP = {sdlaudio.AUDIO_U8: ("=u1", 0x80),
+              sdlaudio.AUDIO_S8: ("=i1", 0),
+              sdlaudio.AUDIO_U16SYS: ("=u2", 0x8000),
+              sdlaudio.AUDIO_S16SYS: ("=i2", 0),
+              sdlaudio.AUDIO_S32SYS: ("=i4", 0),
+              sdlaudio.AUDIO_F32SYS: ("=f4", 0)
+              }
+
+# Mixers with an open audio device. They are kept alive until close() is
+# called, so that they are never released within the audio callback.
+_OPENMIXERS = set()
+
+# WAV sample size to SDL2 audio format mapping
+_WAVFORMATMAP = {1: sdlaudio.AUDIO_U8,
+                 2: sdlaudio.AUDIO_S16LSB,
+                 4: sdlaudio.AUDIO_S32LSB
+                 }
+
+
+class Sound(object):
+    """Audio data, which was converted to the output format of a Mixer.
+
+    Sound objects are created by Mixer.create_sound() or
+    Mixer.load_wav_file() and can be played on any Channel of the Mixer.
+    """
+    def __init__(self, data, size, frames, samples=None):
+        """Creates a new Sound from already converted audio data."""
+        self.data = data
+        self.size = size
+        self.frames = frames
+        self.samples = samples
+
+
+class Channel(object):
+    """A mixing channel of a Mixer.
+
+    A Channel plays a single Sound at once with its own gain and
+    stereo panning.
+    """
+    def __init__(self, mixer):
+        """Creates a new Channel for the passed Mixer."""
+        # The Mixer keeps its channels, so do not keep it alive here.
+        self._mixer = weakref.proxy(mixer)
+        self._sound = None
+        self._position = 0
+        self._loops = 0
+        self._gain = 1.0
+        self._pan = 0.0
+        self._volume = None
+        self.paused = False
+        self._update_volume()
+
+    def _update_volume(self):
+        """Precalculates the volume factors for the mixing."""
+        gain = self._gain
+        if self._mixer.channels == 2:
+            volume = (gain * min(1.0, 1.0 - self._pan),
+                      gain * min(1.0, 1.0 + self._pan))
+        else:
+            volume = (gain, )
+        if self._mixer._usenumpy:
+            self._volume = numpy.array(volume, dtype=numpy.float32)
+        else:
+            self._volume = int(min(gain, 1.0) * sdlaudio.SDL_MIX_MAXVOLUME)
+
+    @property
+    def gain(self):
+        """The volume gain of the channel."""
+        return self._gain
+
+    @gain.setter
+    def gain(self, value):
+        """The volume gain of the channel."""
+        if value < 0:
+            raise ValueError("gain must not be negative")
+        self._gain = float(value)
+        self._update_volume()
+
+    @property
+    def pan(self):
+        """The stereo panning of the channel, ranging from -1.0 (left) to
+        1.0 (right)."""
+        return self._pan
+
+    @pan.setter
+    def pan(self, value):
+        """The stereo panning of the channel, ranging from -1.0 (left) to
+        1.0 (right)."""
+        if not -1 <= value <= 1:
+            raise ValueError("pan must be in the range [-1.0, 1.0]")
+        self._pan = float(value)
+        self._update_volume()
+
+    @property
+    def sound(self):
+        """The currently played Sound, if any."""
+        return self._sound
+
+    @property
+    def position(self):
+        """The current sample frame position within the played Sound."""
+        return self._position
+
+    @property
+    def playing(self):
+        """Indicates, if the channel is playing a Sound."""
+        return self._sound is not None and not self.paused
+
+    def play(self, sound, loops=0):
+        """Plays the passed Sound on the channel.
+
+        The currently played Sound is stopped. loops denotes how often the
+        Sound is repeated, -1 repeats it until the channel is stopped.
+        """
+        if not isinstance(sound, Sound):
+            raise TypeError("sound must be a Sound")
+        self._mixer.lock()
+        try:
+            self._sound = sound
+            self._position = 0
+            self._loops = loops
+            self.paused = False
+        finally:
+            self._mixer.unlock()
+
+    def stop(self):
+        """Stops the playback of the channel."""
+        self._mixer.lock()
+        try:
+            self._sound = None
+            self._position = 0
+        finally:
+            self._mixer.unlock()
+
+    def _mix(self, frames, mix):
+        """Passes the parts of the played Sound for the next frames of the
+        output to mix() and advances the channel."""
+        sound = self._sound
+        if sound is None or self.paused:
+            return
+        pos = self._position
+        done = 0
+        while done < frames:
+            count = min(frames - done, sound.frames - pos)
+            if count > 0:
+                mix(self._volume, sound, done, pos, count)
+                done += count
+                pos += count
+            if pos >= sound.frames:
+                if self._loops == 0 or sound.frames == 0:
+                    self._sound = None
+                    pos = 0
+                    break
+                if self._loops > 0:
+                    self._loops -= 1
+                pos = 0
+        self._position = pos
+
+
+class Mixer(object):
+    """A software audio mixer.
+
+    The Mixer opens a SDL2 audio output device and mixes the Sound
+    objects played on its channels into the device's audio buffer
+    within the SDL2 audio callback. If numpy is available, the mixing
+    will be done using numpy arrays, otherwise
+    pygame2.sdl.audio.mix_audio_format() is used, which does not support
+    stereo panning.
+    """
+    def __init__(self, frequency=44100, aformat=sdlaudio.AUDIO_S16SYS,
+                 channels=2, samples=1024, numchannels=8, device=None):
+        """Creates a new Mixer with numchannels mixing channels.
+
+        frequency, aformat, channels and samples denote the output format
+        of the audio device. If device is None, the default audio output
+        device will be used.
+        """
+        if aformat not in _FORMATMAP:
+            raise ValueError("unsupported audio format")
+        if channels not in (1, 2):
+            raise ValueError("channels must be 1 or 2")
+        if numchannels < 1:
+            raise ValueError("numchannels must be greater than 0")
+        self._hasinit = False
+        if sdl.was_init(sdl.SDL_INIT_AUDIO) == 0:
+            if sdl.init_subsystem(sdl.SDL_INIT_AUDIO) != 0:
+                raise sdl.SDLError()
+            self._hasinit = True
+        # The audio callback references the Mixer weakly, so that the
+        # Mixer can be released after close().
+        mixref = weakref.ref(self)
+
+        def _callback(userdata, stream, length):
+            mix = mixref()
+            if mix is not None:
+                mix._audio_callback(userdata, stream, length)
+        self._callback = sdlaudio.SDL_AudioCallback(_callback)
+        desired = sdlaudio.SDL_AudioSpec(frequency, aformat, channels,
+                                         samples, self._callback)
+        try:
+            self.deviceid, self.spec = \
+                sdlaudio.open_audio_device(device, False, desired, 0)
+        except:
+            if self._hasinit:
+                sdl.quit_subsystem(sdl.SDL_INIT_AUDIO)
+            raise
+        _OPENMIXERS.add(self)
+        self.frequency = self.spec.freq
+        self.format = self.spec.format
+        self.channels = self.spec.channels
+        self._framesize = sdlaudio.SDL_AUDIO_BITSIZE(self.format) // 8 * \
+            self.channels
+        self._usenumpy = _HASNUMPY
+        if self._usenumpy:
+            dtype, self._center = _FORMATMAP[self.format]
+            self._dtype = numpy.dtype(dtype)
+            if sdlaudio.SDL_AUDIO_ISFLOAT(self.format):
+                self._minval, self._maxval = -1.0, 1.0
+            else:
+                info = numpy.iinfo(self._dtype)
+                self._minval = info.min - self._center
+                self._maxval = numpy.float32(info.max - self._center)
+                if self._maxval > info.max - self._center:
+                    # Keep float32 rounding from overflowing 32-bit values.
+                    self._maxval = numpy.nextafter(self._maxval,
+                                                   numpy.float32(0))
+            self._mixbuf = numpy.zeros((self.spec.samples, self.channels),
+                                       dtype=numpy.float32)
+        self._channels = [Channel(self) for index in range(numchannels)]
+        sdlaudio.pause_audio_device(self.deviceid, False)
+
+    def _audio_callback(self, userdata, stream, length):
+        """The SDL2 audio callback."""
+        address = ctypes.cast(stream, ctypes.c_void_p).value
+        self.mix((ctypes.c_ubyte * length).from_address(address))
+
+    def _mix_numpy(self, buf):
+        """Mixes the channels into buf using numpy."""
+        frames = len(buf) // self._framesize
+        if len(self._mixbuf) < frames:
+            self._mixbuf = numpy.zeros((frames, self.channels),
+                                       dtype=numpy.float32)
+        out = self._mixbuf[:frames]
+        out.fill(0)
+
+        def mix(volume, sound, dstpos, srcpos, count):
+            out[dstpos:dstpos + count] += \
+                sound.samples[srcpos:srcpos + count] * volume
+
+        for channel in self._channels:
+            channel._mix(frames, mix)
+        numpy.clip(out, self._minval, self._maxval, out=out)
+        dst = numpy.ctypeslib.as_array(buf)[:frames * self._framesize]
+        dst = dst.view(self._dtype).reshape(frames, self.channels)
+        numpy.add(out, self._center, out=dst, casting="unsafe")
+
+    def _mix_sdl(self, buf):
+        """Mixes the channels into buf using SDL_MixAudioFormat()."""
+        framesize = self._framesize
+        frames = len(buf) // framesize
+        aformat = self.format
+        ubytes = ctypes.c_ubyte
+
+        def mix(volume, sound, dstpos, srcpos, count):
+            size = count * framesize
+            dst = (ubytes * size).from_buffer(buf, dstpos * framesize)
+            src = (ubytes * size).from_buffer(sound.data, srcpos * framesize)
+            sdlaudio.mix_audio_format(dst, src, aformat, size, volume)
+
+        for channel in self._channels:
+            channel._mix(frames, mix)
+
+    def mix(self, buf):
+        """Mixes the playing channels into the passed ctypes c_ubyte array.
+
+        The previous contents of buf will be overwritten. mix() is called
+        by the SDL2 audio callback, but can be used to mix the channels
+        into a custom buffer, while the Mixer is paused.
+        """
+        ctypes.memset(buf, self.spec.silence, len(buf))
+        if self._usenumpy:
+            self._mix_numpy(buf)
+        else:
+            self._mix_sdl(buf)
+
+    @property
+    def numchannels(self):
+        """The amount of mixing channels."""
+        return len(self._channels)
+
+    def get_channel(self, index):
+        """Gets the mixing Channel at the passed index."""
+        return self._channels[index]
+
+    def play(self, sound, loops=0):
+        """Plays the Sound on the first free mixing channel.
+
+        Returns the used Channel or None, if all channels are in use.
+        """
+        for channel in self._channels:
+            if channel.sound is None:
+                channel.play(sound, loops)
+                return channel
+        return None
+
+    def stop(self):
+        """Stops the playback of all mixing channels."""
+        for channel in self._channels:
+            channel.stop()
+
+    def create_sound(self, data, aformat, channels, frequency):
+        """Creates a Sound from the passed raw audio data.
+
+        The audio data will be converted to the output format of the Mixer
+        once, so that it can be mixed without any further conversion.
+        """
+        data = bytes(data)
+        framesize = sdlaudio.SDL_AUDIO_BITSIZE(aformat) // 8 * channels
+        size = len(data) - len(data) % framesize
+        cvt = sdlaudio.build_audio_cvt(aformat, channels, frequency,
+                                       self.format, self.channels,
+                                       self.frequency)
+        if cvt.needed:
+            buf = (ctypes.c_ubyte * (size * cvt.len_mult))()
+            ctypes.memmove(buf, data, size)
+            cvt.buf = ctypes.cast(buf, ctypes.POINTER(ctypes.c_ubyte))
+            cvt.len = size
+            sdlaudio.convert_audio(cvt)
+            size = cvt.len_cvt
+        else:
+            buf = (ctypes.c_ubyte * size)()
+            ctypes.memmove(buf, data, size)
+        frames = size // self._framesize
+        samples = None
+        if self._usenumpy:
+            samples = numpy.frombuffer(buf, dtype=self._dtype,
+                                       count=frames * self.channels)
+            samples = samples.astype(numpy.float32) - self._center
+            samples = samples.reshape(frames, self.channels)
+        return Sound(buf, frames * self._framesize, frames, samples)
+
+    def load_wav_file(self, fname):
+        """Loads a WAV file as Sound."""
+        wav = wave.open(fname, "rb")
+        try:
+            aformat = _WAVFORMATMAP.get(wav.getsampwidth(), None)
+            if aformat is None:
+                raise ValueError("unsupported sample size")
+            data = wav.readframes(wav.getnframes())
+            return self.create_sound(data, aformat, wav.getnchannels(),
+                                     wav.getframerate())
+        finally:
+            wav.close()
+
+    def lock(self):
+        """Locks the audio device, so that the SDL2 audio callback is not
+        executed until unlock() is called."""
+        if self.deviceid is not None:
+            sdlaudio.lock_audio_device(self.deviceid)
+
+    def unlock(self):
+        """Unlocks the audio device."""
+        if self.deviceid is not None:
+            sdlaudio.unlock_audio_device(self.deviceid)
+
+    def pause(self):
+        """Pauses the audio output."""
+        if self.deviceid is not None:
+            sdlaudio.pause_audio_device(self.deviceid, True)
+
+    def resume(self):
+        """Resumes the audio output."""
+        if self.deviceid is not None:
+            sdlaudio.pause_audio_device(self.deviceid, False)
+
+    def close(self):
+        """Closes the audio device of the Mixer.
+
+        The Mixer is kept alive, until close() is called.
+        """
+        if self.deviceid is None:
+            return
+        # Waits for a running audio callback to finish, so that the
+        # Mixer is not released within it.
+        sdlaudio.close_audio_device(self.deviceid)
+        self.deviceid = None
+        _OPENMIXERS.discard(self)
+        if self._hasinit:
+            sdl.quit_subsystem(sdl.SDL_INIT_AUDIO)
+            self._hasinit = False
@@ -2,10 +2,12 @@
 A thin wrapper package around the vorbisfile library.
 """
 import ctypes
+from pygame2.compat import byteify
 from pygame2.dll import DLL
 from pygame2.ogg import OggError
 
-__all__ = ["OggVorbis_File", "clear", "fopen", "pcm_total", "read", "info"
+__all__ = ["OggVorbis_File", "clear", "fopen", "pcm_total", "pcm_seek",
+           "read", "info"
            ]
 
 
@@ -107,7 +109,7 @@ def clear(ovfilep):
 def fopen(fname):
     """Opens a file and loads it into a OggVorbis_File."""
     ovf = OggVorbis_File()
-    retval = dll.ov_fopen(str(fname), ctypes.byref(ovf))
+    retval = dll.ov_fopen(byteify(str(fname), "utf-8"), ctypes.byref(ovf))
     if retval != 0:
         raise OggError(_FASTERROR(retval))
     return ovf
@@ -139,6 +141,15 @@ def pcm_total(ovfilep, bstream=-1):
     return retval
 
 
+@vfiletype("ov_pcm_seek", [ctypes.POINTER(OggVorbis_File), ctypes.c_int64],
+           ctypes.c_int)
+def pcm_seek(ovfilep, pos):
+    """Seeks to the passed PCM sample position of a OggVorbis_File."""
+    retval = dll.ov_pcm_seek(ctypes.byref(ovfilep), pos)
+    if retval != 0:
+        raise OggError(_FASTERROR(retval))
+
+
 @vfiletype("ov_read", [ctypes.POINTER(OggVorbis_File),
                        ctypes.POINTER(ctypes.c_char), ctypes.c_int,
                        ctypes.c_int, ctypes.c_int, ctypes.c_int,
@@ -25,7 +25,7 @@ __all__ = ["get_error", "OpenALError", "enable", "disable", "is_enabled",
            "buffer_i", "buffer_3i", "buffer_iv", "get_buffer_f",
            "get_buffer_3f", "get_buffer_fv", "get_buffer_i", "get_buffer_3i",
            "get_buffer_iv", "doppler_factor", "doppler_velocity",
-           "speed_of_sound", "distance_model"
+           "speed_of_sound", "distance_model", "Batch"
            ]
 
 AL_INVALID = -1
@@ -693,15 +693,11 @@ def buffer_data(bid, bformat, data, freq):
 
     The predefined formats expect the data to be valid PCM data,
     extension functions might load other data types as well."""
-    datap = data
-    size = len(data)
-    if isinstance(data, array.CTypesView):
-        datap = data.to_bytes()
-        size = data.bytesize
-    else:
-        size = len(data)
-        datap = (ctypes.c_ubyte * size).from_buffer_copy(data)
-    datap = ctypes.cast(datap, ctypes.POINTER(ctypes.c_ubyte))
+    if not isinstance(data, array.CTypesView):
+        # The data is only read, so read-only objects can be shared, too.
+        data = array._ReadOnlyCTypesView(data)
+    size = data.bytesize
+    datap = ctypes.cast(data.to_bytes(), ctypes.POINTER(ctypes.c_ubyte))
     dll.alBufferData(bid, bformat, datap, size, freq)
     _raise_error_or_continue()
 
@@ -852,3 +848,164 @@ def speed_of_sound(value):
 def distance_model(value):
     """Sets the OpenAL distance model."""
     dll.alDistanceModel(value)
+
+
+# Maximum amount of values per vector update of a Batch.
+_BATCH_VECSIZE = 6
+
+
+class Batch(object):
+    """Collects source and listener updates and passes them to OpenAL at
+    once.
+
+    The updates are executed on commit(), which checks OpenAL's error
+    state only once for all of them. Vector values are stored in a
+    preallocated array instead of creating a new ctypes array for each
+    update. Source state changes are passed to OpenAL via
+    source_stop_v(), source_rewind_v(), source_pause_v() and
+    source_play_v().
+    """
+    def __init__(self, size=64, checked=True):
+        """Creates a new Batch with room for size vector updates.
+
+        If more vector updates are made before commit(), the Batch
+        allocates room for another size updates.
+
+        If checked is False, commit() will not check OpenAL's error state
+        at all.
+        """
+        if size <= 0:
+            raise ValueError("size must be greater than 0")
+        self.size = size
+        self.checked = checked
+        self._blocks = []
+        self._ptrs = []
+        self._nvalues = 0
+        self._grow()
+        self._calls = []
+        self._sids = (ctypes.c_uint * size)()
+        self._states = ([], [], [], [])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.clear()
+
+    def _grow(self):
+        """Allocates room for another size vector updates.
+
+        The values are kept in separate blocks, so that the pointers to
+        the already stored values stay valid.
+        """
+        block = (ctypes.c_float * (self.size * _BATCH_VECSIZE))()
+        address = ctypes.addressof(block)
+        stride = _BATCH_VECSIZE * ctypes.sizeof(ctypes.c_float)
+        fptr = ctypes.POINTER(ctypes.c_float)
+        self._blocks.append(block)
+        self._ptrs.extend(ctypes.cast(address + index * stride, fptr)
+                          for index in range(self.size))
+
+    def _store(self, values):
+        """Copies the passed values into the vector array and returns the
+        pointer to them."""
+        count = len(values)
+        if count > _BATCH_VECSIZE:
+            raise ValueError("values must not contain more than %d items" %
+                             _BATCH_VECSIZE)
+        if self._nvalues == len(self._ptrs):
+            self._grow()
+        index = self._nvalues
+        self._nvalues += 1
+        block, offset = divmod(index, self.size)
+        offset *= _BATCH_VECSIZE
+        self._blocks[block][offset:offset + count] = values
+        return self._ptrs[index]
+
+    def listener_f(self, param, value):
+        """Sets a floating point property for the listener."""
+        self._calls.append((dll.alListenerf, (param, value)))
+
+    def listener_3f(self, param, value1, value2, value3):
+        """Sets a floating point property for the listener."""
+        self._calls.append((dll.alListener3f,
+                            (param, value1, value2, value3)))
+
+    def listener_fv(self, param, values):
+        """Sets a floating point-vector property for the listener."""
+        ptr = self._store(values)
+        self._calls.append((dll.alListenerfv, (param, ptr)))
+
+    def listener_i(self, param, value):
+        """Sets an integer property for the listener."""
+        self._calls.append((dll.alListeneri, (param, value)))
+
+    def source_f(self, sid, param, value):
+        """Sets a floating point property of a source."""
+        self._calls.append((dll.alSourcef, (sid, param, value)))
+
+    def source_3f(self, sid, param, value1, value2, value3):
+        """Sets a floating point property of a source."""
+        self._calls.append((dll.alSource3f,
+                            (sid, param, value1, value2, value3)))
+
+    def source_fv(self, sid, param, values):
+        """Sets a floating point-vector property of a source."""
+        ptr = self._store(values)
+        self._calls.append((dll.alSourcefv, (sid, param, ptr)))
+
+    def source_i(self, sid, param, value):
+        """Sets an integer property of a source."""
+        self._calls.append((dll.alSourcei, (sid, param, value)))
+
+    def source_stop(self, sid):
+        """Stops a source on commit()."""
+        self._states[0].append(sid)
+
+    def source_rewind(self, sid):
+        """Rewinds a source on commit()."""
+        self._states[1].append(sid)
+
+    def source_pause(self, sid):
+        """Pauses a source on commit()."""
+        self._states[2].append(sid)
+
+    def source_play(self, sid):
+        """Plays a source on commit()."""
+        self._states[3].append(sid)
+
+    def clear(self):
+        """Discards all collected updates."""
+        self._calls = []
+        self._nvalues = 0
+        for sids in self._states:
+            del sids[:]
+
+    def commit(self):
+        """Passes all collected updates to OpenAL.
+
+        The property updates are passed in the order they were made,
+        followed by the source state changes. Afterwards, an OpenALError
+        is raised, if OpenAL reported an error for any of the updates and
+        checked is True.
+        """
+        try:
+            for func, args in self._calls:
+                func(*args)
+            funcs = (dll.alSourceStopv, dll.alSourceRewindv,
+                     dll.alSourcePausev, dll.alSourcePlayv)
+            for func, sids in zip(funcs, self._states):
+                count = len(sids)
+                if count == 0:
+                    continue
+                if count > len(self._sids):
+                    self._sids = (ctypes.c_uint * count)()
+                self._sids[:count] = sids
+                func(count, self._sids)
+        finally:
+            self.clear()
+        if self.checked:
+            _raise_error_or_continue()
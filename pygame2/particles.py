@@ -4,7 +4,14 @@ A simple particle engine implementation.
 from pygame2.compat import *
 from pygame2.ebs import System
 
-__all__ = ["Particle", "ParticleEngine"]
+__all__ = ["Particle", "ParticleEngine", "ParticleArray", "ParticleView",
+           "ArrayParticleEngine"]
+
+_HASNUMPY = True
+try:
+    import numpy
+except ImportError:
+    _HASNUMPY = False
 
 
 class Particle(object):
@@ -124,3 +131,243 @@ class ParticleEngine(System):
         if not callable(value):
             raise TypeError("updatefunc must be callable")
         self._updatefunc = value
+
+
+# The particle attributes managed by a ParticleArray and their data
+# types.
+_FIELDS = (("x", "float64"), ("y", "float64"), ("vx", "float64"),
+           ("vy", "float64"), ("life", "float64"), ("type", "int32"))
+_FIELDNAMES = tuple(name for name, dtype in _FIELDS)
+
+
+class ParticleView(object):
+    """A view on a selection of particles within a ParticleArray.
+
+    The view provides the particle attributes x, y, vx, vy, life and
+    type as numpy arrays. Assigning to those attributes, including
+    in-place operations, such as view.x += view.vx, writes the values
+    back to the underlying ParticleArray.
+    """
+    def __init__(self, array, index):
+        """Creates a new ParticleView on the passed ParticleArray.
+
+        index can be a slice or an array of particle indices.
+        """
+        object.__setattr__(self, "array", array)
+        object.__setattr__(self, "index", index)
+
+    def __len__(self):
+        index = self.index
+        if isinstance(index, slice):
+            return len(range(*index.indices(len(self.array))))
+        return len(index)
+
+    def __getattr__(self, name):
+        if name not in _FIELDNAMES:
+            raise AttributeError("object '%s' has no attribute '%s'" % \
+                (self.__class__.__name__, name))
+        return self.array._arrays[name][self.index]
+
+    def __setattr__(self, name, value):
+        if name not in _FIELDNAMES:
+            raise AttributeError("object '%s' has no attribute '%s'" % \
+                (self.__class__.__name__, name))
+        self.array._arrays[name][self.index] = value
+
+
+class ParticleArray(object):
+    """A particle component type, which stores a whole set of particles.
+
+    The particle attributes x, y, vx, vy, life and type are stored in
+    separate numpy arrays, which allows an ArrayParticleEngine to
+    update all particles at once using array operations.
+    """
+    def __init__(self, capacity=1024):
+        """Creates a new, empty ParticleArray.
+
+        capacity denotes the initial amount of particles that can be
+        stored without reallocating the arrays.
+        """
+        if not _HASNUMPY:
+            raise UnsupportedError(ParticleArray,
+                                   "numpy module could not be loaded")
+        if capacity < 1:
+            raise ValueError("capacity must be greater than 0")
+        self._arrays = dict((name, numpy.zeros(capacity, dtype))
+                            for name, dtype in _FIELDS)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return "ParticleArray(count=%d, capacity=%d)" % \
+            (self._count, self.capacity)
+
+    def _get_field(self, name):
+        """Gets the values of the living particles for the attribute."""
+        return self._arrays[name][:self._count]
+
+    def _resize(self, capacity):
+        """Reallocates the arrays to hold capacity particles."""
+        count = self._count
+        for name, dtype in _FIELDS:
+            arr = numpy.zeros(capacity, dtype)
+            arr[:count] = self._arrays[name][:count]
+            self._arrays[name] = arr
+
+    def add(self, count=1, x=0, y=0, vx=0, vy=0, life=0, type=0):
+        """Adds count new particles and returns a ParticleView on them.
+
+        The attribute values can be single values, which will be used
+        for all new particles, or sequences of count values. The arrays
+        are enlarged, if necessary.
+        """
+        start = self._count
+        end = start + count
+        capacity = self.capacity
+        if end > capacity:
+            while capacity < end:
+                capacity *= 2
+            self._resize(capacity)
+        arrays = self._arrays
+        values = (x, y, vx, vy, life, type)
+        for name, value in zip(_FIELDNAMES, values):
+            arrays[name][start:end] = value
+        self._count = end
+        return ParticleView(self, slice(start, end))
+
+    def compact(self):
+        """Removes all particles with a life of 0 or below.
+
+        The living particles are moved to the front of the arrays, so
+        that the freed slots can be reused by add(). The amount of
+        removed particles is returned.
+        """
+        count = self._count
+        alive = self._arrays["life"][:count] > 0
+        living = int(numpy.count_nonzero(alive))
+        if living == count:
+            return 0
+        for arr in self._arrays.values():
+            arr[:living] = arr[:count][alive]
+        self._count = living
+        return count - living
+
+    def clear(self):
+        """Removes all particles."""
+        self._count = 0
+
+    @property
+    def capacity(self):
+        """The amount of particles that can be stored without
+        reallocating the arrays."""
+        return len(self._arrays["x"])
+
+    x = property(lambda self: self._get_field("x"),
+                 doc="The x coordinates of the particles.")
+    y = property(lambda self: self._get_field("y"),
+                 doc="The y coordinates of the particles.")
+    vx = property(lambda self: self._get_field("vx"),
+                  doc="The horizontal velocities of the particles.")
+    vy = property(lambda self: self._get_field("vy"),
+                  doc="The vertical velocities of the particles.")
+    life = property(lambda self: self._get_field("life"),
+                    doc="The remaining life times of the particles.")
+    type = property(lambda self: self._get_field("type"),
+                    doc="The user-defined types of the particles.")
+
+
+class ArrayParticleEngine(System):
+    """A vectorized particle processing system.
+
+    The ArrayParticleEngine works like the ParticleEngine, but operates
+    on ParticleArray components, updating all particles of a
+    ParticleArray at once using numpy array operations.
+
+    The callbacks receive ParticleView objects instead of lists and sets
+    of particles. The creation callback can revive dead particles in
+    place by assigning a new, positive life time and new attribute values
+    to the passed ParticleView, which avoids any reallocation. Particles,
+    which are still dead after the callbacks have been invoked, are
+    removed from the ParticleArray afterwards.
+    """
+    def __init__(self):
+        """Creates a new ArrayParticleEngine."""
+        super(ArrayParticleEngine, self).__init__()
+        self.componenttypes = (ParticleArray, )
+        self._createfunc = None
+        self._deletefunc = None
+        self._updatefunc = None
+
+    def process(self, world, components):
+        """Processes all ParticleArray components, decreasing the life of
+        their particles by 1.
+
+        Once the life of all particles has been decreased and the
+        particles considered dead (life <= 0) are identified, the
+        creation, update and deletion callbacks are invoked for each
+        ParticleArray.
+
+            def particle_createfunc(world, deadview):
+                ...
+
+            def particle_updatefunc(world, livingview):
+                ...
+
+            def particle_deletefunc(world, deadview):
+                ...
+
+        The particles passed to the creation and deletion callbacks are
+        the same. Finally, the ParticleArray is compacted.
+        """
+        for particles in components:
+            count = len(particles)
+            life = particles.life
+            life -= 1
+            dead = numpy.flatnonzero(life <= 0)
+            if len(dead) == 0:
+                living = ParticleView(particles, slice(0, count))
+            else:
+                living = ParticleView(particles, numpy.flatnonzero(life > 0))
+            deadones = ParticleView(particles, dead)
+            self.createfunc(world, deadones)
+            self.updatefunc(world, living)
+            self.deletefunc(world, deadones)
+            particles.compact()
+
+    @property
+    def createfunc(self):
+        """The function to be used for reviving or creating particles."""
+        return self._createfunc
+
+    @createfunc.setter
+    def createfunc(self, value):
+        """The function to be used for reviving or creating particles."""
+        if not callable(value):
+            raise TypeError("createfunc must be callable")
+        self._createfunc = value
+
+    @property
+    def deletefunc(self):
+        """The function to be used for deleting dead particles."""
+        return self._deletefunc
+
+    @deletefunc.setter
+    def deletefunc(self, value):
+        """The function to be used for deleting dead particles."""
+        if not callable(value):
+            raise TypeError("deletefunc must be callable")
+        self._deletefunc = value
+
+    @property
+    def updatefunc(self):
+        """The function to be used for updating particles."""
+        return self._updatefunc
+
+    @updatefunc.setter
+    def updatefunc(self, value):
+        """The function to be used for updating particles."""
+        if not callable(value):
+            raise TypeError("updatefunc must be callable")
+        self._updatefunc = value
@@ -4,9 +4,16 @@ Resource management methods.
 import sys
 import os
 import re
+import posixpath
 import zipfile
 import tarfile
 import io
+import gzip
+import bz2
+import shutil
+import struct
+import tempfile
+import threading
 
 __all__ = ["open_zipfile", "open_tarfile", "open_url", "Resources"]
 
@@ -122,6 +129,192 @@ def open_url(filename, basepath=None):
     return urllib2.urlopen(url)
 
 
+def _get_tar_file(members, info):
+    """Gets the regular file the passed TAR member refers to.
+
+    Hard and symbolic links are followed within the archive. Returns
+    None, if info neither is a regular file nor a link to one.
+    """
+    visited = set()
+    while not info.isfile():
+        if not (info.islnk() or info.issym()) or info.name in visited:
+            return None
+        visited.add(info.name)
+        linkname = info.linkname
+        if info.issym():
+            # Symbolic links are relative to the directory of the link.
+            linkname = posixpath.join(posixpath.dirname(info.name), linkname)
+        info = members.get(posixpath.normpath(linkname))
+        if info is None:
+            return None
+    return info
+
+
+class _MemberReader(io.RawIOBase):
+    """A read-only, seekable stream on a member of an archive.
+
+    The reader accesses the data of the member directly within the
+    archive file, which can be shared with other readers. The archive is
+    kept alive, while the reader is in use.
+    """
+    def __init__(self, archive, fileobj, offset, size):
+        super(_MemberReader, self).__init__()
+        self._archive = archive
+        self._fileobj = fileobj
+        self._lock = archive._lock
+        self._offset = offset
+        self._size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError("invalid whence value")
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readall(self):
+        count = max(0, self._size - self._pos)
+        with self._lock:
+            self._fileobj.seek(self._offset + self._pos)
+            data = self._fileobj.read(count)
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b):
+        count = min(len(b), self._size - self._pos)
+        if count <= 0:
+            return 0
+        with self._lock:
+            self._fileobj.seek(self._offset + self._pos)
+            data = self._fileobj.read(count)
+        count = len(data)
+        b[:count] = data
+        self._pos += count
+        return count
+
+
+class _Archive(object):
+    """A lazily opened ZIP or TAR archive with an index of its members.
+
+    The archive file is opened on the first access and kept open for
+    subsequent ones. Compressed TAR archives are decompressed once into
+    a temporary file, so that their members can be accessed directly.
+    The archive file is closed, once the _Archive is released or leaves
+    a with block.
+    """
+    def __init__(self, filename, archtype, members):
+        self.filename = filename
+        self.archtype = archtype
+        # ZipInfo objects for ZIP, (offset, size) tuples for TAR archives
+        self.members = members
+        self._lock = threading.Lock()
+        self._fileobj = None
+        self._zipfile = None
+        self._offsets = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        if hasattr(self, "_lock"):
+            self.close()
+
+    def close(self):
+        """Closes the archive file."""
+        with self._lock:
+            if self._zipfile is not None:
+                self._zipfile.close()
+            if self._fileobj is not None:
+                self._fileobj.close()
+            self._zipfile = None
+            self._fileobj = None
+            self._offsets = {}
+
+    def _open(self):
+        """Opens the archive file, if it is not already opened."""
+        if self._fileobj is not None:
+            return self._fileobj
+        fileobj = open(self.filename, 'rb')
+        if self.archtype != 'zip':
+            magic = fileobj.read(3)
+            decompress = None
+            if magic[:2] == b"\x1f\x8b":
+                decompress = gzip.GzipFile(self.filename, 'rb')
+            elif magic == b"BZh":
+                decompress = bz2.BZ2File(self.filename, 'rb')
+            if decompress is not None:
+                fileobj.close()
+                fileobj = tempfile.TemporaryFile()
+                try:
+                    shutil.copyfileobj(decompress, fileobj)
+                finally:
+                    decompress.close()
+        self._fileobj = fileobj
+        return fileobj
+
+    def _get_offset(self, info):
+        """Gets the offset of the data of a stored ZIP archive member."""
+        offset = self._offsets.get(info.filename)
+        if offset is None:
+            fileobj = self._open()
+            fileobj.seek(info.header_offset)
+            header = fileobj.read(30)
+            if len(header) != 30 or header[:4] != b"PK\x03\x04":
+                raise zipfile.BadZipfile("bad local file header")
+            namelen, extralen = struct.unpack("<HH", header[26:30])
+            offset = info.header_offset + 30 + namelen + extralen
+            self._offsets[info.filename] = offset
+        return offset
+
+    def get_reader(self, path):
+        """Gets a streaming reader for the passed member.
+
+        Returns None, if the member is compressed within a ZIP archive
+        and thus cannot be read directly.
+        """
+        member = self.members[path]
+        with self._lock:
+            fileobj = self._open()
+            if self.archtype != 'zip':
+                offset, size = member
+            elif member.compress_type != zipfile.ZIP_STORED or \
+                    member.flag_bits & 0x1:
+                return None
+            else:
+                offset, size = self._get_offset(member), member.file_size
+        return _MemberReader(self, fileobj, offset, size)
+
+    def read(self, path):
+        """Reads the data of the passed member."""
+        reader = self.get_reader(path)
+        if reader is not None:
+            return reader.read()
+        with self._lock:
+            if self._zipfile is None:
+                self._zipfile = zipfile.ZipFile(self.filename, 'r')
+            return self._zipfile.read(self.members[path])
+
+
 class Resources(object):
     """The Resources class manages a set of file resources and eases
     accessing them by using relative paths, scanning archives
@@ -135,9 +328,16 @@ class Resources(object):
         scan(path, subdir, excludepattern).
         """
         self.files = {}
+        self._archives = {}
         if path:
             self.scan(path, subdir, excludepattern)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _scanzip(self, filename):
         """Scans the passed ZIP archive and indexes all the files
         contained by it.
@@ -146,11 +346,14 @@ class Resources(object):
             raise TypeError("file '%s' is not a valid ZIP archive" % filename)
         archname = os.path.abspath(filename)
         zipf = zipfile.ZipFile(filename, 'r')
-        for path in zipf.namelist():
-            fname = os.path.split(path)[1]
+        members = {}
+        for info in zipf.infolist():
+            members[info.filename] = info
+            fname = os.path.split(info.filename)[1]
             if fname:
-                self.files[fname] = (archname, 'zip', path)
+                self.files[fname] = (archname, 'zip', info.filename)
         zipf.close()
+        self._add_index(_Archive(archname, 'zip', members))
 
     def _scantar(self, filename, ftype=None):
         """Scans the passed TAR archive and indexes all the files
@@ -168,10 +371,34 @@ class Resources(object):
         if ftype:
             archtype = 'tar%s' % ftype
         tar = tarfile.open(filename, mode)
-        for path in tar.getnames():
-            fname = os.path.split(path)[1]
-            self.files[fname] = (archname, archtype, path)
+        infos = tar.getmembers()
         tar.close()
+        bypath = dict((posixpath.normpath(info.name), info) for info in infos)
+        members = {}
+        for info in infos:
+            # Directories, devices and links, which do not refer to a
+            # file within the archive, can't be read.
+            target = _get_tar_file(bypath, info)
+            if target is None:
+                continue
+            members[info.name] = (target.offset_data, target.size)
+            fname = os.path.split(info.name)[1]
+            self.files[fname] = (archname, archtype, info.name)
+        self._add_index(_Archive(archname, archtype, members))
+
+    def _add_index(self, archive):
+        """Adds the member index of an archive, replacing a previous one
+        of the same archive file."""
+        previous = self._archives.get(archive.filename)
+        if previous is not None:
+            previous.close()
+        self._archives[archive.filename] = archive
+
+    def _get_archive(self, archive, ftype):
+        """Gets the indexed archive for the passed archive file."""
+        if ftype not in ('zip', 'tar', 'tarbz2', 'targz'):
+            raise ValueError("unsupported archive type")
+        return self._archives[archive]
 
     def add(self, filename):
         """Adds a file to the Resources container.
@@ -229,16 +456,7 @@ class Resources(object):
         """
         archive, ftype, pathname = self.files[filename]
         if archive:
-            if ftype == 'zip':
-                return open_zipfile(archive, pathname)
-            elif ftype == 'tar':
-                return open_tarfile(archive, pathname)
-            elif ftype == 'tarbz2':
-                return open_tarfile(archive, pathname, ftype='bz2')
-            elif ftype == 'targz':
-                return open_tarfile(archive, pathname, ftype='gz')
-            else:
-                raise ValueError("unsupported archive type")
+            return io.BytesIO(self._get_archive(archive, ftype).read(pathname))
         dmpdata = open(pathname, 'rb')
         data = io.BytesIO(dmpdata.read())
         dmpdata.close()
@@ -249,24 +467,33 @@ class Resources(object):
         possible.
 
         If the passed filename is only available within an archive, a
-        StringIO instance will be returned.
+        read-only, seekable stream on the data within the archive will
+        be returned. For compressed members of ZIP archives, a BytesIO
+        instance will be returned.
 
         Raises a KeyError, if filename could not be found.
         """
         archive, ftype, pathname = self.files[filename]
         if archive:
-            if ftype == 'zip':
-                return open_zipfile(archive, pathname)
-            elif ftype == 'tar':
-                return open_tarfile(archive, pathname)
-            elif ftype == 'tarbz2':
-                return open_tarfile(archive, pathname, ftype='bz2')
-            elif ftype == 'targz':
-                return open_tarfile(archive, pathname, ftype='gz')
-            else:
-                raise ValueError("unsupported archive type")
+            archive = self._get_archive(archive, ftype)
+            reader = archive.get_reader(pathname)
+            if reader is None:
+                return io.BytesIO(archive.read(pathname))
+            return reader
         return open(pathname, 'rb')
 
+    def close(self):
+        """Closes all archive files opened by the Resources container.
+
+        Streams returned by get_filelike() for files within archives
+        cannot be read anymore afterwards. The archive files are opened
+        again on demand. If close() is not called, the archive files are
+        closed, once the Resources container and all streams on them are
+        released.
+        """
+        for archive in self._archives.values():
+            archive.close()
+
     def get_path(self, filename):
         """Gets the path of the passed filename.
 
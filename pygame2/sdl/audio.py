@@ -155,17 +155,17 @@ SDL_AudioFilter = ctypes.CFUNCTYPE(None, ctypes.POINTER(SDL_AudioCVT),
 # is not supported properly
 _SDL_AudioFilter_p = ctypes.POINTER(SDL_AudioFilter)
 
-SDL_AudioCVT._fields_ = [("_needed", ctypes.c_int),
-                         ("_src_format", ctypes.c_ushort),
-                         ("_dst_format", ctypes.c_ushort),
-                         ("_rate_incr", ctypes.c_double),
-                         ("_buf", ctypes.POINTER(ctypes.c_ubyte)),
-                         ("_len", ctypes.c_int),
-                         ("_len_cvt", ctypes.c_int),
-                         ("_len_mult", ctypes.c_int),
-                         ("_len_ratio", ctypes.c_double),
-                         ("_filters", (_SDL_AudioFilter_p * 10)),
-                         ("_filter_index", ctypes.c_int)
+SDL_AudioCVT._fields_ = [("needed", ctypes.c_int),
+                         ("src_format", ctypes.c_ushort),
+                         ("dst_format", ctypes.c_ushort),
+                         ("rate_incr", ctypes.c_double),
+                         ("buf", ctypes.POINTER(ctypes.c_ubyte)),
+                         ("len", ctypes.c_int),
+                         ("len_cvt", ctypes.c_int),
+                         ("len_mult", ctypes.c_int),
+                         ("len_ratio", ctypes.c_double),
+                         ("filters", (_SDL_AudioFilter_p * 10)),
+                         ("filter_index", ctypes.c_int)
                          ]
 
 
@@ -283,7 +283,8 @@ def open_audio_device(device, iscapture, desired, allowed_changes):
     requested format, and will be automatically converted to the
     hardware audio format if necessary.
     """
-    device = byteify(str(device), "utf-8")
+    if device is not None:
+        device = byteify(str(device), "utf-8")
     if bool(iscapture):
         iscapture = 1
     else:
@@ -398,7 +399,9 @@ def mix_audio(dst, src, length, volume):
         raise ValueError("dst is too small")
     if len(src) < length:
         raise ValueError("src is too small")
-    dll.SDL_MixAudio(ctypes.byref(dst), ctypes.byref(src), length, volume)
+    ptr = ctypes.POINTER(ctypes.c_ubyte)
+    dll.SDL_MixAudio(ctypes.cast(dst, ptr), ctypes.cast(src, ptr), length,
+                     volume)
 
 
 @sdltype("SDL_MixAudioFormat", [ctypes.POINTER(ctypes.c_ubyte),
@@ -412,8 +415,9 @@ def mix_audio_format(dst, src, aformat, length, volume):
         raise ValueError("dst is too small")
     if len(src) < length:
         raise ValueError("src is too small")
-    dll.SDL_MixAudio(ctypes.byref(dst), ctypes.byref(src), aformat, length,
-                     volume)
+    ptr = ctypes.POINTER(ctypes.c_ubyte)
+    dll.SDL_MixAudioFormat(ctypes.cast(dst, ptr), ctypes.cast(src, ptr),
+                           aformat, length, volume)
 
 
 @sdltype("SDL_LockAudio", None, None)
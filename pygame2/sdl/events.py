@@ -16,7 +16,8 @@ __all__ = ["SDL_WindowEvent", "SDL_KeyboardEvent", "SDL_TextEditingEvent",
            "SDL_EventFilter", "add_event_watch", "del_event_watch",
            "event_state", "get_event_state", "filter_events", "flush_event",
            "flush_events", "get_event_filter", "set_event_filter", "has_event",
-           "has_events", "peep_events", "poll_event", "pump_events",
+           "has_events", "peep_events", "peep_events_into", "poll_event",
+           "pump_events",
            "push_event", "register_events", "wait_event", "wait_event_timeout",
            "quit_requested"
            ]
@@ -566,6 +567,25 @@ def peep_events(events, numevents, action, mintype, maxtype):
     return ret, events[:ret]
 
 
+def peep_events_into(events, action, mintype, maxtype):
+    """Checks the event queue for messages and optionally moves them into
+    the passed SDL_Event array.
+
+    In contrast to peep_events(), no new SDL_Event objects are created
+    for SDL_PEEKEVENT and SDL_GETEVENT. Instead up to len(events) events
+    are copied into events and their amount is returned. This allows
+    the same array to be reused for fetching events repeatedly.
+    """
+    numevents = len(events)
+    if numevents < 1:
+        raise ValueError("events must contain at least one value")
+    ptr = ctypes.cast(events, ctypes.POINTER(SDL_Event))
+    ret = dll.SDL_PeepEvents(ptr, numevents, action, mintype, maxtype)
+    if ret < 0:
+        raise SDLError()
+    return ret
+
+
 @sdltype("SDL_PollEvent", [ctypes.POINTER(SDL_Event)], ctypes.c_int)
 def poll_event(getevent=False):
     """Polls for currently pending events.
@@ -25,7 +25,8 @@ __all__ = ["SDL_RendererInfo", "SDL_Renderer", "SDL_Texture",
            "render_clear", "render_draw_point", "render_draw_points",
            "render_draw_line", "render_draw_lines", "render_draw_rect",
            "render_draw_rects", "render_fill_rect", "render_fill_rects",
-           "render_copy", "render_read_pixels", "render_present",
+           "render_copy", "render_copies", "render_read_pixels",
+           "render_present",
            "destroy_texture", "destroy_renderer", "render_get_scale",
            "render_set_scale", "render_get_logical_size",
            "render_set_logical_size"
@@ -401,8 +402,11 @@ def update_texture(texture, rect, pixels, pitch):
     The passed rect can be None, if the entire texture's pixel data
     should be updated (see lock_texture()).
     """
-    retval = dll.SDL_UpdateTexture(ctypes.byref(texture), ctypes.byref(rect),
-                                   ctypes.byref(pixels), pitch)
+    rectval = None
+    if rect is not None:
+        rectval = ctypes.byref(rect)
+    retval = dll.SDL_UpdateTexture(ctypes.byref(texture), rectval, pixels,
+                                   pitch)
     if retval == -1:
         raise SDLError()
 
@@ -711,6 +715,26 @@ def render_copy(renderer, texture, srcrect=None, dstrect=None):
         raise SDLError()
 
 
+def render_copies(renderer, textures, srcrects, dstrects):
+    """Copies portions of the passed textures to the current rendering
+    target.
+
+    textures, srcrects and dstrects are sequences, which denote the
+    texture, source area and destination area of each copy. None areas
+    are treated as in render_copy(). Consecutive copies of the same
+    texture share a single texture reference.
+    """
+    rcopy = dll.SDL_RenderCopy
+    rendererval = ctypes.byref(renderer)
+    lasttexture = textureval = None
+    for texture, srcrect, dstrect in zip(textures, srcrects, dstrects):
+        if texture is not lasttexture:
+            lasttexture = texture
+            textureval = ctypes.byref(texture)
+        if rcopy(rendererval, textureval, srcrect, dstrect) == -1:
+            raise SDLError()
+
+
 @sdltype("SDL_RenderReadPixels", [ctypes.POINTER(SDL_Renderer),
                                   ctypes.POINTER(SDL_Rect), ctypes.c_uint,
                                   ctypes.POINTER(ctypes.c_uint), ctypes.c_int],
@@ -2,21 +2,101 @@ import sys
 import unittest
 import pygame2.algorithms as algo
 
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
+
 
 class AlgorithmsTest(unittest.TestCase):
 
-    @unittest.skip("not implemented")
+    def tearDown(self):
+        algo._HASNUMPY = _HASNUMPY
+
     def test_cohensutherland(self):
-        pass
+        clip = algo.cohensutherland
+        self.assertEqual(clip(0, 0, 10, 10, 2, 2, 8, 8), (2, 2, 8, 8))
+        self.assertEqual(clip(0, 0, 10, 10, -5, 5, 15, 5), (0, 5, 10, 5))
+        self.assertEqual(clip(0, 0, 10, 10, 15, 5, -5, 5), (10, 5, 0, 5))
+        self.assertEqual(clip(0, 0, 10, 10, 5, -5, 5, 15), (5, 0, 5, 10))
+        self.assertEqual(clip(0, 0, 10, 10, -5, -5, 15, 15), (0, 0, 10, 10))
+        self.assertEqual(clip(0, 0, 10, 10, 20, 5, 30, 5),
+                         (None, None, None, None))
+        self.assertEqual(clip(0, 0, 10, 10, -5, 20, 20, 20),
+                         (None, None, None, None))
 
-    @unittest.skip("not implemented")
     def test_liangbarsky(self):
-        pass
-    
-    @unittest.skip("not implemented")
+        clip = algo.liangbarsky
+        self.assertEqual(clip(0, 0, 10, 10, 2, 2, 8, 8), (2, 2, 8, 8))
+        self.assertEqual(clip(0, 0, 10, 10, -5, 5, 15, 5), (0, 5, 10, 5))
+        self.assertEqual(clip(0, 0, 10, 10, 15, 5, -5, 5), (10, 5, 0, 5))
+        self.assertEqual(clip(0, 0, 10, 10, 5, -5, 5, 15), (5, 0, 5, 10))
+        self.assertEqual(clip(0, 0, 10, 10, -5, -5, 15, 15), (0, 0, 10, 10))
+        self.assertEqual(clip(0, 0, 10, 10, -10, 0, 10, 5), (0, 2.5, 10, 5))
+        self.assertEqual(clip(0, 0, 10, 10, 20, 5, 30, 5),
+                         (None, None, None, None))
+        self.assertEqual(clip(0, 0, 10, 10, -5, 20, 20, 20),
+                         (None, None, None, None))
+
     def test_clipline(self):
-        pass
+        self.assertEqual(algo.clipline(0, 0, 10, 10, -5, 5, 15, 5),
+                         (0, 5, 10, 5))
+        self.assertEqual(algo.clipline(0, 0, 10, 10, -5, 5, 15, 5,
+                                       method=algo.cohensutherland),
+                         (0, 5, 10, 5))
+
+    def test_cliplines(self):
+        lines = ((2, 2, 8, 8),
+                 (-5, 5, 15, 5),
+                 (20, 5, 30, 5),
+                 (5, -5, 5, 15),
+                 (-10, 0, 10, 5),
+                 (-5, 20, 20, 20))
+        expected = ((2, 2, 8, 8),
+                    (0, 5, 10, 5),
+                    (20, 5, 30, 5),
+                    (5, 0, 5, 10),
+                    (0, 2.5, 10, 5),
+                    (-5, 20, 20, 20))
+        emask = [True, True, False, True, True, False]
+        flat = [value for line in lines for value in line]
+        for hasnumpy in set((False, _HASNUMPY)):
+            algo._HASNUMPY = hasnumpy
+            for seq in (lines, flat):
+                clipped, mask = algo.cliplines(0, 0, 10, 10, seq)
+                self.assertEqual(list(mask), emask)
+                self.assertEqual(len(clipped), len(expected))
+                for cline, eline in zip(clipped, expected):
+                    self.assertEqual(tuple(cline), eline)
+            self.assertRaises(ValueError, algo.cliplines, 0, 0, 10, 10,
+                              (1, 2, 3))
+            clipped, mask = algo.cliplines(0, 0, 10, 10, [])
+            self.assertEqual(len(clipped), 0)
+            self.assertEqual(len(mask), 0)
+
+    @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
+    def test_cliplines_numpy(self):
+        lines = numpy.array([[-5, 5, 15, 5], [20, 5, 30, 5]])
+        clipped, mask = algo.cliplines(0, 0, 10, 10, lines)
+        self.assertIsInstance(clipped, numpy.ndarray)
+        self.assertEqual(clipped.shape, (2, 4))
+        self.assertEqual(list(mask), [True, False])
+        self.assertEqual(list(clipped[mask][0]), [0, 5, 10, 5])
 
+    def test_sutherlandhodgman(self):
+        clip = algo.sutherlandhodgman
+        triangle = [(2, 2), (8, 2), (5, 8)]
+        self.assertEqual(clip(0, 0, 10, 10, triangle), triangle)
+        self.assertEqual(clip(0, 0, 10, 10, [(20, 20), (30, 20), (30, 30)]),
+                         [])
+        self.assertEqual(clip(0, 0, 10, 10, [(-5, -5), (15, -5), (15, 15),
+                                             (-5, 15)]),
+                         [(0, 10), (0, 0), (10, 0), (10, 10)])
+        self.assertEqual(clip(0, 0, 10, 10, [(2, 2), (14, 2), (2, 8)]),
+                         [(2, 2), (10, 2), (10, 4), (2, 8)])
+        self.assertEqual(clip(0, 0, 10, 10, [(2, 2), (8, 2), (8, 12)]),
+                         [(6.8, 10), (2, 2), (8, 2), (8, 10)])
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -1,10 +1,17 @@
 import sys
 import array
 import ctypes
+import mmap
 import struct
 import unittest
 import pygame2.array as pgarray
 
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
+
 singlebyteseq = [x for x in range(0x100)]
 doublebyteseq = [x for x in range(0x10000)]
 quadbyteseq = [0x00000000,
@@ -160,6 +167,108 @@ class ArrayTest(unittest.TestCase):
             for index, x in enumerate(bytebuf):
                 self.assertEqual(x, seq[index])
 
+    def test_to_ctypes_buffer(self):
+        class Point(ctypes.Structure):
+            _fields_ = [("x", ctypes.c_int), ("y", ctypes.c_int)]
+
+        buf = bytearray(range(8))
+        values, size = pgarray.to_ctypes(buf, ctypes.c_ubyte)
+        self.assertEqual(size, 8)
+        self.assertEqual(list(values), list(range(8)))
+        # Writable buffers are shared.
+        values[0] = 0xFF
+        self.assertEqual(buf[0], 0xFF)
+
+        values, size = pgarray.to_ctypes(bytes(buf), ctypes.c_ubyte, 4)
+        self.assertEqual(size, 4)
+        self.assertEqual(list(values), [0xFF, 1, 2, 3])
+
+        ctview = pgarray.CTypesView(quadbytebuf, UINT_SIZE)
+        values, size = pgarray.to_ctypes(ctview, ctypes.c_uint)
+        self.assertEqual(size, len(quadbyteseq))
+        self.assertEqual(list(values), quadbyteseq)
+        values, size = pgarray.to_ctypes(ctview, ctypes.c_ushort, 2)
+        self.assertEqual(size, 2)
+        self.assertRaises(ValueError, pgarray.to_ctypes, ctview,
+                          ctypes.c_uint, len(quadbyteseq) + 1)
+
+        if sys.version_info[0] < 3:
+            # array.array does not support the new buffer protocol
+            return
+        points = array.array("i", [0, 1, 10, 11, 20, 21])
+        values, size = pgarray.to_ctypes(points, Point)
+        self.assertEqual(size, 3)
+        self.assertEqual((values[2].x, values[2].y), (20, 21))
+        # Mismatching item types are still converted element-wise.
+        values, size = pgarray.to_ctypes(points, ctypes.c_float)
+        self.assertEqual(size, 6)
+        self.assertEqual(values[2], 10.0)
+        # Structures are only reinterpreted from their own layout.
+        self.assertRaises(TypeError, pgarray.to_ctypes,
+                          array.array("d", [0, 1, 10, 11]), Point)
+        points = (Point * 2)(Point(1, 2), Point(3, 4))
+        values, size = pgarray.to_ctypes(points, Point)
+        self.assertEqual(size, 2)
+        values[1].x = 30
+        self.assertEqual(points[1].x, 30)
+
+    @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
+    def test_to_ctypes_numpy(self):
+        class Point(ctypes.Structure):
+            _fields_ = [("x", ctypes.c_int), ("y", ctypes.c_int)]
+
+        points = numpy.array([[1, 2], [3, 4]], dtype=numpy.intc)
+        values, size = pgarray.to_ctypes(points, Point)
+        self.assertEqual(size, 2)
+        self.assertEqual([(p.x, p.y) for p in values], [(1, 2), (3, 4)])
+        values[0].x = 10
+        self.assertEqual(points[0][0], 10)
+
+        # Mismatching item types are converted element-wise and thus
+        # can't be used for structures.
+        self.assertRaises(TypeError, pgarray.to_ctypes,
+                          numpy.array([[1, 2], [3, 4]], dtype=numpy.int64),
+                          Point)
+        self.assertRaises(TypeError, pgarray.to_ctypes,
+                          numpy.array([[1, 2], [3, 4]], dtype=numpy.float64),
+                          Point)
+
+    def test_CTypesView__buffers(self):
+        data = bytes(bytearray(range(16)))
+        objs = [data]
+        if sys.version_info[0] >= 3:
+            # Python 2.7 does not provide the object of a memoryview.
+            objs.append(memoryview(data))
+        for obj in objs:
+            # Read-only objects are copied, so that they can't be changed.
+            ctview = pgarray.CTypesView(obj)
+            self.assertFalse(ctview.is_shared)
+            self.assertFalse(ctview.is_readonly)
+            self.assertEqual(ctview.bytesize, 16)
+            self.assertEqual(list(ctview.to_bytes()), list(range(16)))
+            ctview.view[0] = 0xFF
+            self.assertEqual(bytearray(data)[0], 0)
+            # The private read-only view shares them.
+            ctview = pgarray._ReadOnlyCTypesView(obj)
+            self.assertTrue(ctview.is_shared)
+            self.assertTrue(ctview.is_readonly)
+            self.assertEqual(list(ctview.to_bytes()), list(range(16)))
+
+        ctview = pgarray.CTypesView(memoryview(data)[4:])
+        self.assertFalse(ctview.is_shared)
+        self.assertFalse(ctview.is_readonly)
+        self.assertEqual(list(ctview.to_bytes()), list(range(4, 16)))
+
+        mmbuf = mmap.mmap(-1, 16)
+        ctview = pgarray.CTypesView(mmbuf)
+        self.assertTrue(ctview.is_shared)
+        self.assertFalse(ctview.is_readonly)
+        ctview.view[3] = 0xFF
+        self.assertEqual(bytearray(mmbuf[:4]), bytearray([0, 0, 0, 0xFF]))
+        del ctview
+
+        self.assertRaises(TypeError, pgarray.CTypesView, [1, 2, 3])
+
     def test_CTypesView__singlebytes(self):
         buf1 = pgarray.CTypesView(singlebyteseq, docopy=True)
         buf2 = pgarray.CTypesView(singlebytebuf, docopy=False)
@@ -315,7 +424,92 @@ class ArrayTest(unittest.TestCase):
             self.assertEqual(val, source[index])
         for index, val in enumerate(word2):
             self.assertEqual(val, source[index + 7])
-        # TODO: more tests
+        self.assertEqual(view[1, 0], " ")
+        self.assertEqual(view[-1][-1], "r")
+        self.assertEqual(view[-1, -7], " ")
+        self.assertRaises(IndexError, view.__getitem__, 2)
+        self.assertRaises(IndexError, view.__getitem__, -3)
+        self.assertRaises(IndexError, view.__getitem__, (0, 7))
+        self.assertRaises(IndexError, view.__getitem__, (0, 0, 0))
+
+    def test_MemoryView_slicing(self):
+        source = bytearray(range(24))
+        view = pgarray.MemoryView(source, 1, (4, 6))
+        sub = view[1:3]
+        self.assertEqual(sub.strides, (2, 6))
+        self.assertEqual(sub[0][0], bytearray([6]))
+        self.assertEqual(sub[1, 5], bytearray([17]))
+
+        sub = view[::2, 1::2]
+        self.assertEqual(sub.strides, (2, 3))
+        self.assertEqual([sub[y, x][0] for y in range(2) for x in range(3)],
+                         [1, 3, 5, 13, 15, 17])
+        self.assertEqual(view[:, -1].strides, (4,))
+        self.assertEqual([v[0] for v in view[:, -1]], [5, 11, 17, 23])
+        self.assertEqual([v[0] for v in view[2, ::-2]], [17, 15, 13])
+        self.assertEqual(view[4:].strides, (0, 6))
+
+        view[0, 1:3] = [bytearray([100]), bytearray([101])]
+        self.assertEqual(source[1:3], bytearray([100, 101]))
+        view[:, 0] = [bytearray([200])] * 4
+        self.assertEqual(source[::6], bytearray([200] * 4))
+        view[3, -1] = bytearray([99])
+        self.assertEqual(source[23], 99)
+        self.assertRaises(ValueError, view.__setitem__, 0, [1, 2])
+
+    def test_MemoryView_steps(self):
+        # Rows of 3 items of 2 bytes, padded to 8 bytes.
+        source = bytearray(range(24))
+        self.assertRaises(ValueError, pgarray.MemoryView, source, 2,
+                          (3, 3), steps=(8,))
+        view = pgarray.MemoryView(source, 2, (3, 3), steps=(8, 2))
+        self.assertEqual(view[1, 0], bytearray([8, 9]))
+        self.assertEqual(view[2][2], bytearray([20, 21]))
+        self.assertEqual(view.tobytes(),
+                         bytes(bytearray([0, 1, 2, 3, 4, 5, 8, 9, 10, 11,
+                                          12, 13, 16, 17, 18, 19, 20, 21])))
+        self.assertRaises(ValueError, view.cast, 1, (18,))
+
+    def test_MemoryView_tobytes(self):
+        source = bytearray(range(12))
+        view = pgarray.MemoryView(source, 2, (2, 3))
+        self.assertEqual(view.tobytes(), bytes(source))
+        self.assertEqual(view[1].tobytes(), bytes(source[6:]))
+        self.assertEqual(view[:, 1].tobytes(),
+                         bytes(bytearray([2, 3, 8, 9])))
+
+        ar = (ctypes.c_ubyte * 12)(*range(12))
+        ptr = ctypes.cast(ar, ctypes.POINTER(ctypes.c_ubyte))
+        view = pgarray.MemoryView(ptr, 1, (3, 4), srcsize=12)
+        self.assertEqual(view[1:].tobytes(), bytes(bytearray(range(4, 12))))
+
+        view = pgarray.MemoryView("Example buffer", 1, (2, 7))
+        self.assertEqual(view[1].tobytes(), b" buffer")
+
+    def test_MemoryView_cast(self):
+        source = bytearray(range(12))
+        view = pgarray.MemoryView(source, 1, (12,))
+        cview = view.cast(4, (3,))
+        self.assertEqual(cview.itemsize, 4)
+        self.assertEqual(cview.strides, (3,))
+        self.assertEqual(cview[1], bytearray([4, 5, 6, 7]))
+        cview = view[6:].cast(2, (3,))
+        self.assertEqual(cview[2], bytearray([10, 11]))
+        self.assertRaises(ValueError, view.cast, 4, (4,))
+        self.assertRaises(ValueError, view[::2].cast, 1, (6,))
+
+    @unittest.skipIf(sys.version_info < (3, 12),
+                     "the buffer protocol requires Python 3.12")
+    def test_MemoryView_buffer(self):
+        source = bytearray(range(12))
+        view = pgarray.MemoryView(source, 2, (2, 3))
+        buf = memoryview(view[1])
+        self.assertEqual(buf.tobytes(), bytes(source[6:]))
+        # Contiguous views share the data.
+        buf[0] = 100
+        self.assertEqual(source[6], 100)
+        buf = memoryview(view[:, 0])
+        self.assertEqual(buf.tobytes(), bytes(bytearray([0, 1, 100, 7])))
 
     def test_MemoryView_ndim_strides(self):
         source = "Example buffer"
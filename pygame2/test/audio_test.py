@@ -1,4 +1,5 @@
 import sys
+import time
 import unittest
 import pygame2.openal.al as al
 import pygame2.audio as audio
@@ -40,10 +41,12 @@ class AudioTest(unittest.TestCase):
         self.assertIsNone(source.ssid)
         self.assertIsNone(source.ssid)
         self.assertEqual(source._buffers, list())
+        self.assertIsNone(source.stream)
         self.assertEqual(source.gain, 1.0)
         self.assertEqual(source.pitch, 1.0)
         self.assertEqual(source.position, (0, 0, 0))
         self.assertEqual(source.velocity, (0, 0, 0))
+        self.assertEqual(source.priority, 0)
         self.assertEqual(source.request, audio.SOURCE_NONE)
 
     def test_SoundSource_queue(self):
@@ -62,9 +65,171 @@ class AudioTest(unittest.TestCase):
         sink = audio.SoundSink()
         self.assertIsInstance(sink, audio.SoundSink)
 
-    @unittest.skip("not implemented")
     def test_SoundSink_process(self):
-        pass
+        sink = audio.SoundSink()
+        data = audio.load_file(RESOURCES.get_path("hey.wav"))
+        source1 = audio.SoundSource()
+        source2 = audio.SoundSource()
+        source1.queue(data)
+        source2.queue(data)
+        sink.process(None, [source1, source2])
+        bufid = data.bufid
+        self.assertIsNotNone(bufid)
+        self.assertEqual(source1._buffers, [])
+        for ssid in (source1.ssid, source2.ssid):
+            self.assertEqual(al.get_source_i(ssid, al.AL_BUFFERS_QUEUED), 1)
+
+        # Processed data must not be uploaded or queued again.
+        sink.process(None, [source1, source2])
+        self.assertEqual(data.bufid, bufid)
+        for ssid in (source1.ssid, source2.ssid):
+            self.assertEqual(al.get_source_i(ssid, al.AL_BUFFERS_QUEUED), 1)
+
+        source1.gain = 0.5
+        sink.process(None, [source1, source2])
+        self.assertAlmostEqual(al.get_source_f(source1.ssid, al.AL_GAIN), 0.5)
+        self.assertAlmostEqual(al.get_source_f(source2.ssid, al.AL_GAIN), 1.0)
+
+        # Played buffers are unqueued, before new data is queued.
+        source1.request = audio.SOURCE_STOP
+        sink.process(None, [source1])
+        source1.queue(data)
+        sink.process(None, [source1])
+        self.assertEqual(al.get_source_i(source1.ssid, al.AL_BUFFERS_QUEUED),
+                         1)
+        self.assertEqual(sink._queued[source1.ssid], [data])
+
+        # The buffers belong to the SoundSink and are released with it.
+        del sink
+        self.assertIsNone(data.bufid)
+        self.assertIsNone(source1.ssid)
+
+    def test_SoundSink_buffers(self):
+        sink = audio.SoundSink()
+        source = audio.SoundSource()
+        source.queue(audio.load_file(RESOURCES.get_path("hey.wav")))
+        sink.process(None, [source])
+        source.request = audio.SOURCE_STOP
+        sink.process(None, [source])
+        free = len(sink._freebuffers)
+        # Unqueueing the played data releases the last reference to it,
+        # which puts its buffer back into the pool.
+        source.queue(audio.load_file(RESOURCES.get_path("hey.wav")))
+        sink.process(None, [source])
+        self.assertEqual(len(sink._freebuffers), free)
+        self.assertEqual(len(sink._bufids), 1)
+
+    def test_SoundSink_process_stream(self):
+        sink = audio.SoundSink()
+        stream = audio.load_stream(RESOURCES.get_path("hey.wav"), buffers=3,
+                                   buffersize=4096)
+        source = audio.SoundSource()
+        source.stream = stream
+        source.request = audio.SOURCE_PLAY
+        for tick in range(10):
+            sink.process(None, [source])
+            self.assertLessEqual(al.get_source_i(source.ssid,
+                                                 al.AL_BUFFERS_QUEUED),
+                                 stream.buffers)
+            time.sleep(0.02)
+
+        # Stopped streams start over and are not decoded any further.
+        reads = []
+        read = stream.read
+        stream.read = lambda: reads.append(1) or read()
+        source.request = audio.SOURCE_STOP
+        sink.process(None, [source])
+        del reads[:]
+        for tick in range(5):
+            sink.process(None, [source])
+            self.assertEqual(al.get_source_i(source.ssid, al.AL_SOURCE_STATE),
+                             al.AL_INITIAL)
+            self.assertEqual(al.get_source_i(source.ssid,
+                                             al.AL_BUFFERS_QUEUED),
+                             stream.buffers)
+            time.sleep(0.02)
+        self.assertEqual(reads, [])
+        source.request = audio.SOURCE_PLAY
+        sink.process(None, [source])
+        self.assertEqual(al.get_source_i(source.ssid, al.AL_SOURCE_STATE),
+                         al.AL_PLAYING)
+        del stream.read
+
+        # Rewinding puts the source into its initial state, like for a
+        # static source.
+        source.request = audio.SOURCE_REWIND
+        for tick in range(2):
+            sink.process(None, [source])
+            self.assertEqual(al.get_source_i(source.ssid, al.AL_SOURCE_STATE),
+                             al.AL_INITIAL)
+            self.assertEqual(al.get_source_i(source.ssid,
+                                             al.AL_BUFFERS_QUEUED),
+                             stream.buffers)
+        stream.close()
+
+    def test_SoundSink_exhausted(self):
+        sink = audio.SoundSink()
+        data = audio.load_file(RESOURCES.get_path("hey.wav"))
+        first = audio.SoundSource(priority=0)
+        first.queue(data)
+        first.request = audio.SOURCE_PLAY
+        sink.process(None, [first])
+        self.assertIsNotNone(first.ssid)
+
+        # Let the device refuse to create any more sources.
+        def gen_sources(count):
+            raise al.OpenALError("out of sources")
+        gen_sources_orig = al.gen_sources
+        al.gen_sources = gen_sources
+        try:
+            # Drop the unused sources of the pool.
+            al.delete_sources(sink._freesources)
+            for ssid in sink._freesources:
+                del sink._sources[ssid]
+            sink._freesources = []
+            second = audio.SoundSource(priority=1)
+            second.queue(data)
+            second.request = audio.SOURCE_PLAY
+            sink.process(None, [second])
+        finally:
+            al.gen_sources = gen_sources_orig
+        # The public limit stays untouched.
+        self.assertIsNone(sink.maxsources)
+        self.assertIsNotNone(second.ssid)
+        self.assertIsNone(first.ssid)
+
+    def test_SoundSink_maxsources(self):
+        sink = audio.SoundSink(maxsources=2)
+        self.assertEqual(sink.maxsources, 2)
+        data = audio.load_file(RESOURCES.get_path("hey.wav"))
+        sources = []
+        for priority in (1, 0, 0, 2):
+            source = audio.SoundSource(priority=priority)
+            source.queue(data)
+            source.request = audio.SOURCE_PLAY
+            sources.append(source)
+
+        sink.process(None, sources[:2])
+        self.assertIsNotNone(sources[0].ssid)
+        self.assertIsNotNone(sources[1].ssid)
+        # No lower priority source to take the OpenAL source from
+        sink.process(None, [sources[2]])
+        self.assertIsNone(sources[2].ssid)
+        self.assertEqual(sources[2].request, audio.SOURCE_PLAY)
+        # The lowest priority source loses its OpenAL source.
+        sink.process(None, [sources[3]])
+        self.assertIsNotNone(sources[3].ssid)
+        self.assertIsNotNone(sources[0].ssid)
+        self.assertIsNone(sources[1].ssid)
+        self.assertEqual(sources[1]._buffers, [data])
+        # Stopped sources are taken first.
+        sources[0].request = audio.SOURCE_STOP
+        sink.process(None, [sources[0]])
+        sink.process(None, [sources[2]])
+        self.assertIsNotNone(sources[2].ssid)
+        self.assertIsNone(sources[0].ssid)
+        # Played data is not queued again.
+        self.assertEqual(sources[0]._buffers, [])
 
     def test_load_file(self):
         wavfile = RESOURCES.get_path("hey.wav")
@@ -89,9 +254,77 @@ class AudioTest(unittest.TestCase):
         oggfile = RESOURCES.get_path("hey.ogg")
         snddata = audio.load_ogg_file(oggfile)
 
-    @unittest.skip("not implemented")
     def test_load_stream(self):
-        pass
+        wavfile = RESOURCES.get_path("hey.wav")
+        snddata = audio.load_wav_file(wavfile)
+        stream = audio.load_stream(wavfile, buffers=3, buffersize=4096)
+        self.assertIsInstance(stream, audio.SoundStream)
+        self.assertEqual(stream.format, al.AL_FORMAT_MONO16)
+        self.assertEqual(stream.frequency, 44100)
+        self.assertEqual(stream.buffers, 3)
+        self.assertEqual(stream.buffersize, 4096)
+        self.assertFalse(stream.loop)
+
+        chunks = []
+        chunk = stream.read()
+        while chunk:
+            self.assertLessEqual(len(chunk), 4096)
+            chunks.append(chunk)
+            chunk = stream.read()
+        self.assertTrue(stream.finished)
+        self.assertEqual(b"".join(chunks), snddata.data)
+        stream.rewind()
+        self.assertFalse(stream.finished)
+        self.assertEqual(stream.read(), chunks[0])
+        stream.close()
+
+        stream = audio.load_stream(RESOURCES.get("hey.wav"), loop=True,
+                                   buffersize=snddata.size)
+        self.assertEqual(stream.read(), snddata.data)
+        self.assertEqual(stream.read(), snddata.data)
+        self.assertFalse(stream.finished)
+        stream.close()
+
+        self.assertRaises(ValueError, audio.load_stream, wavfile, buffers=1)
+        self.assertRaises(ValueError, audio.load_stream, wavfile,
+                          buffersize=0)
+        self.assertRaises(ValueError, audio.load_stream, "invalid.xyz")
+
+    def test_load_stream_ogg(self):
+        oggfile = RESOURCES.get_path("hey.ogg")
+        stream = audio.load_stream(oggfile, buffers=3, buffersize=4096)
+        self.assertIsInstance(stream, audio.SoundStream)
+        self.assertIn(stream.format, (al.AL_FORMAT_MONO16,
+                                      al.AL_FORMAT_STEREO16))
+        self.assertEqual(stream.frequency, 44100)
+
+        chunks = []
+        chunk = stream.read()
+        while chunk:
+            self.assertLessEqual(len(chunk), 4096)
+            chunks.append(chunk)
+            chunk = stream.read()
+        self.assertTrue(stream.finished)
+        self.assertGreater(len(chunks), 1)
+        stream.rewind()
+        self.assertFalse(stream.finished)
+        self.assertEqual(stream.read(), chunks[0])
+        stream.close()
+
+        # Streams of Ogg-Vorbis files are played like any other stream.
+        sink = audio.SoundSink()
+        stream = audio.load_stream(oggfile, buffers=3, buffersize=4096,
+                                   loop=True)
+        source = audio.SoundSource()
+        source.stream = stream
+        source.request = audio.SOURCE_PLAY
+        for tick in range(5):
+            sink.process(None, [source])
+            self.assertEqual(al.get_source_i(source.ssid,
+                                             al.AL_BUFFERS_QUEUED),
+                             stream.buffers)
+            time.sleep(0.02)
+        stream.close()
 
 
 if __name__ == '__main__':
@@ -17,6 +17,10 @@ class Movement(object):
         self.vy = vy
 
 
+class Tag(object):
+    pass
+
+
 class PositionEntity(Entity):
     def __init__(self, world, x=0, y=0):
         self.position = Position(x, y)
@@ -86,6 +90,40 @@ class EBSTest(unittest.TestCase):
         ent2 = Entity(world)
         self.assertNotEqual(ent1.id, ent2.id)
 
+    def test_Entity_id_integer(self):
+        world = World(idtype=INTEGERIDS)
+        entities = [Entity(world) for x in range(10)]
+        ids = [e.id for e in entities]
+        self.assertEqual(len(set(ids)), 10)
+        for eid in ids:
+            self.assertIsInstance(eid, int)
+
+        # Ids of deleted entities are reused with a new generation.
+        entities[3].delete()
+        e = Entity(world)
+        self.assertNotEqual(e.id, ids[3])
+        self.assertEqual(e.id & 0xFFFFFFFF, ids[3] & 0xFFFFFFFF)
+        self.assertNotEqual(e, entities[3])
+        self.assertEqual(len(world.entities), 10)
+
+        # Deleting a stale entity must not affect the entity reusing
+        # its id.
+        entities[3].delete()
+        world.delete_entities([entities[3]])
+        self.assertEqual(len(world.entities), 10)
+        self.assertTrue(e in world.entities)
+        newids = set(Entity(world).id for x in range(5))
+        self.assertEqual(len(newids), 5)
+        self.assertTrue(e.id not in newids)
+
+        world.delete_entities(entities[:3])
+        self.assertEqual(len(set(Entity(world).id for x in range(3)) &
+                             set(ids)), 0)
+
+        pos = PositionEntity(world, 1, 2)
+        self.assertEqual(pos.position.x, 1)
+        self.assertFalse(hasattr(Entity(world), "__dict__"))
+
     def test_Entity_world(self):
         world = World()
         world2 = World()
@@ -138,6 +176,111 @@ class EBSTest(unittest.TestCase):
         w = World()
         self.assertIsInstance(w, World)
 
+    def test_World_storage(self):
+        w = World()
+        self.assertEqual(w.storage, DICTSTORAGE)
+        w = World(storage=ARCHETYPESTORAGE)
+        self.assertEqual(w.storage, ARCHETYPESTORAGE)
+        self.assertRaises(ValueError, World, storage=None)
+        self.assertRaises(ValueError, World, storage=1234)
+
+    def test_World_idtype(self):
+        w = World()
+        self.assertEqual(w.idtype, UUIDIDS)
+        w = World(idtype=INTEGERIDS)
+        self.assertEqual(w.idtype, INTEGERIDS)
+        self.assertRaises(ValueError, World, idtype=None)
+        self.assertRaises(ValueError, World, idtype=1234)
+
+    def test_World_combined_components(self):
+        for storage in (DICTSTORAGE, ARCHETYPESTORAGE):
+            w = World(storage=storage)
+            moving = [MovingEntity(w, x, x, 1, 1) for x in range(10)]
+            for x in range(10):
+                PositionEntity(w, x, x)
+            items = list(w.combined_components((Position, Movement)))
+            self.assertEqual(len(items), 10)
+            for p, m in items:
+                self.assertIsInstance(p, Position)
+                self.assertIsInstance(m, Movement)
+            self.assertEqual(len(list(w.combined_components((Position,)))),
+                             20)
+
+            # Changing the component signature of an entity must be
+            # reflected in the combined sets.
+            del moving[0].movement
+            self.assertEqual(len(list(w.combined_components((Position,
+                                                             Movement)))),
+                             9)
+            moving[0].movement = Movement(2, 2)
+            items = list(w.combined_components((Position, Movement)))
+            self.assertEqual(len(items), 10)
+            self.assertTrue(moving[0].movement in [m for p, m in items])
+
+            # Replacing a component keeps the entity in place.
+            pos = Position(100, 100)
+            moving[1].position = pos
+            items = list(w.combined_components((Position, Movement)))
+            self.assertEqual(len(items), 10)
+            self.assertTrue(pos in [p for p, m in items])
+
+            w.delete(moving[2])
+            w.delete_entities(moving[3:5])
+            items = list(w.combined_components((Position, Movement)))
+            self.assertEqual(len(items), 7)
+
+    def test_World_query(self):
+        for storage in (DICTSTORAGE, ARCHETYPESTORAGE):
+            w = World(storage=storage)
+            self.assertRaises(ValueError, w.query)
+            moving = [MovingEntity(w, x, x, 1, 1) for x in range(10)]
+            for x in range(10):
+                PositionEntity(w, x, x)
+
+            view = w.query(Position, Movement)
+            self.assertIsInstance(view, QueryView)
+            self.assertEqual(view.componenttypes, (Position, Movement))
+            self.assertIs(w.query(Position, Movement), view)
+            self.assertIsNot(w.query(Movement, Position), view)
+            self.assertEqual(len(view), 10)
+            self.assertEqual(len(w.query(Position)), 20)
+            for p, m in view:
+                self.assertIsInstance(p, Position)
+                self.assertIsInstance(m, Movement)
+
+            # The view must follow the changes on the entities.
+            del moving[0].movement
+            self.assertEqual(len(view), 9)
+            self.assertTrue(moving[0] not in view.entities)
+            moving[0].movement = Movement(2, 2)
+            self.assertEqual(len(view), 10)
+            self.assertTrue(moving[0].movement in [m for p, m in view])
+
+            pos = Position(100, 100)
+            moving[1].position = pos
+            self.assertEqual(len(view), 10)
+            self.assertTrue(pos in [p for p, m in view])
+
+            e = MovingEntity(w)
+            self.assertEqual(len(view), 11)
+            self.assertTrue(e in view.entities)
+            w.delete(e)
+            self.assertEqual(len(view), 10)
+            e.delete()
+            w.delete_entities(moving[2:5])
+            self.assertEqual(len(view), 7)
+            self.assertEqual(len(w.query(Position)), 17)
+            w.delete_entities(moving[2:5])
+            self.assertEqual(len(view), 7)
+
+            # Query views can be requested for yet unknown component
+            # types.
+            class Unknown(object):
+                pass
+            self.assertEqual(len(w.query(Unknown)), 0)
+            moving[5].unknown = Unknown()
+            self.assertEqual(len(w.query(Unknown)), 1)
+
     def test_World_add_remove_system(self):
         world = World()
         self.assertIsInstance(world, World)
@@ -210,6 +353,64 @@ class EBSTest(unittest.TestCase):
         # The next should have no effect
         w.delete_entities((e1, e2))
 
+    def test_World_delete_entities_process(self):
+        class DeletingSystem(System):
+            def __init__(self):
+                super(DeletingSystem, self).__init__()
+                self.componenttypes = (Position,)
+
+            def process(self, world, components):
+                entities = [e for e in world.entities]
+                world.delete(entities[0])
+                world.delete_entities(entities[1:5])
+                # Deletions are deferred until the processing is done.
+                self.counts.append(len(world.entities))
+
+        for storage in (DICTSTORAGE, ARCHETYPESTORAGE):
+            w = World(storage=storage)
+            dsystem = DeletingSystem()
+            dsystem.counts = []
+            w.add_system(dsystem)
+            w.add_system(MovementApplicator())
+            for x in range(10):
+                MovingEntity(w, vx=1, vy=1)
+            w.process()
+            self.assertEqual(dsystem.counts, [10])
+            self.assertEqual(len(w.entities), 5)
+            self.assertEqual(len(w.components[Position]), 5)
+            self.assertEqual(len(w.query(Position, Movement)), 5)
+            for p in w.components[Position].values():
+                self.assertEqual((p.x, p.y), (1, 1))
+
+    def test_World_create_entities(self):
+        for idtype in (UUIDIDS, INTEGERIDS):
+            w = World(idtype=idtype)
+            entities = w.create_entities(0)
+            self.assertEqual(entities, [])
+            entities = w.create_entities(10)
+            self.assertEqual(len(entities), 10)
+            self.assertEqual(len(w.entities), 10)
+            for e in entities:
+                self.assertIsInstance(e, Entity)
+                self.assertEqual(e.world, w)
+
+            seen = []
+            def create_position(entity):
+                seen.append(entity)
+                return Position(1, 2)
+            entities = w.create_entities(20, position=create_position,
+                                         movement=lambda e: Movement(3, 4))
+            self.assertEqual(seen, entities)
+            self.assertEqual(len(w.entities), 30)
+            self.assertEqual(len(w.query(Position, Movement)), 20)
+            for e in entities:
+                self.assertEqual((e.position.x, e.position.y), (1, 2))
+                self.assertEqual((e.movement.vx, e.movement.vy), (3, 4))
+
+            w.delete_entities(entities[5:])
+            self.assertEqual(len(w.entities), 15)
+            self.assertEqual(len(w.query(Position, Movement)), 5)
+
     def test_World_get_entities(self):
         w = World()
         e1 = PositionEntity(w, 1, 1)
@@ -313,6 +514,231 @@ class EBSTest(unittest.TestCase):
             self.assertEqual(c.x, 2)
             self.assertEqual(c.y, 2)
 
+        world3 = World(storage=ARCHETYPESTORAGE)
+        world3.add_system(MovementApplicator())
+        for x in range(10):
+            MovingEntity(world3, vx=1, vy=1)
+            PositionEntity(world3)
+        world3.process()
+        for c in world3.components[Position].values():
+            self.assertIn((c.x, c.y), ((0, 0), (1, 1)))
+        self.assertEqual(len([c for c in world3.components[Position].values()
+                              if c.x == 1]), 10)
+
+    def test_Applicator_process_changes(self):
+        # Components added or removed during the iteration must not cause
+        # other entities to be skipped or visited twice.
+        class ChangingApplicator(Applicator):
+            def __init__(self):
+                super(ChangingApplicator, self).__init__()
+                self.componenttypes = (Position, Movement)
+                self.visited = []
+
+            def process(self, world, componentsets):
+                for p, m in componentsets:
+                    self.visited.append(p.x)
+                    entity = world.get_entities(p)[0]
+                    if p.x % 2 == 0:
+                        del entity.movement
+                    else:
+                        entity.tag = Tag()
+                    if p.x == 1:
+                        # New entities are processed on the next run.
+                        MovingEntity(world, x=10)
+
+        for storage in (DICTSTORAGE, ARCHETYPESTORAGE):
+            world = World(storage=storage)
+            applicator = ChangingApplicator()
+            world.add_system(applicator)
+            for x in range(6):
+                MovingEntity(world, x=x)
+            world.process()
+            self.assertEqual(sorted(applicator.visited), list(range(6)))
+            applicator.visited = []
+            world.process()
+            self.assertEqual(sorted(applicator.visited), [1, 3, 5, 10])
+
+    def test_World_scheduler(self):
+        world = World()
+        self.assertIsNone(world.scheduler)
+        for val in (1234, "Test", Position):
+            self.assertRaises(TypeError, setattr, world, "scheduler", val)
+        scheduler = ThreadedScheduler(2)
+        world.scheduler = scheduler
+        self.assertIs(world.scheduler, scheduler)
+        world.scheduler = None
+        self.assertIsNone(world.scheduler)
+        scheduler.close()
+
+    def test_ThreadedScheduler(self):
+        self.assertRaises(ValueError, ThreadedScheduler, 0)
+        scheduler = ThreadedScheduler()
+        self.assertTrue(scheduler.workers > 0)
+        scheduler.close()
+        scheduler = ThreadedScheduler(4)
+        self.assertEqual(scheduler.workers, 4)
+
+        class Other(object):
+            pass
+
+        class SubPosition(Position):
+            pass
+
+        class SimpleSystem(object):
+            def __init__(self, ctypes, readonly=()):
+                self.componenttypes = ctypes
+                self.readonly = readonly
+
+            def process(self, world, components):
+                pass
+
+        possys = SimpleSystem((Position,))
+        othersys = SimpleSystem((Other,))
+        movsys = SimpleSystem((Position, Movement))
+        readpos = SimpleSystem((Position, Other), readonly=(Position,))
+        readpos2 = SimpleSystem((Position,), readonly=(Position,))
+        subpos = SimpleSystem((SubPosition,))
+
+        stages = scheduler.get_stages([possys, othersys, movsys])
+        self.assertEqual(stages, [[possys, othersys], [movsys]])
+        stages = scheduler.get_stages([othersys, possys, readpos])
+        self.assertEqual(stages, [[othersys, possys], [readpos]])
+        stages = scheduler.get_stages([readpos, readpos2, othersys])
+        self.assertEqual(stages, [[readpos, readpos2], [othersys]])
+        stages = scheduler.get_stages([subpos, othersys, possys])
+        self.assertEqual(stages, [[subpos, othersys], [possys]])
+        self.assertEqual(scheduler.get_stages([]), [])
+        scheduler.close()
+
+    def test_ThreadedScheduler_process(self):
+        world = World()
+        world.scheduler = ThreadedScheduler(2)
+
+        class Velocity(object):
+            def __init__(self):
+                self.count = 0
+
+        class VelocitySystem(System):
+            def __init__(self):
+                super(VelocitySystem, self).__init__()
+                self.componenttypes = (Velocity,)
+
+            def process(self, world, components):
+                for c in components:
+                    c.count += 1
+
+        class VelocityEntity(Entity):
+            def __init__(self, world):
+                self.velocity = Velocity()
+
+        world.add_system(PositionSystem())
+        world.add_system(VelocitySystem())
+        world.add_system(MovementApplicator())
+        for x in range(10):
+            MovingEntity(world, vx=1, vy=1)
+            VelocityEntity(world)
+        world.process()
+        world.process()
+        for c in world.components[Position].values():
+            self.assertEqual(c.x, 4)
+            self.assertEqual(c.y, 4)
+        for c in world.components[Velocity].values():
+            self.assertEqual(c.count, 2)
+
+        class ErrornousSystem(System):
+            def __init__(self):
+                super(ErrornousSystem, self).__init__()
+                self.componenttypes = (Velocity,)
+        world.insert_system(0, ErrornousSystem())
+        self.assertRaises(NotImplementedError, world.process)
+        world.scheduler.close()
+
+    def test_World_profiler(self):
+        world = World()
+        self.assertIsNone(world.profiler)
+        for val in (1234, "Test", ThreadedScheduler):
+            self.assertRaises(TypeError, setattr, world, "profiler", val)
+        profiler = SystemProfiler()
+        world.profiler = profiler
+        self.assertIs(world.profiler, profiler)
+        world.profiler = None
+        self.assertIsNone(world.profiler)
+
+    def test_SystemProfiler(self):
+        self.assertRaises(ValueError, SystemProfiler, 0)
+        profiler = SystemProfiler()
+        self.assertEqual(profiler.frames, 120)
+        self.assertEqual(profiler.frametimes, [])
+        self.assertEqual(profiler.systems, ())
+        self.assertIsNone(profiler.exportfunc)
+        self.assertRaises(TypeError, setattr, profiler, "exportfunc", 1234)
+
+        world = World()
+        psystem = PositionSystem()
+        mapplicator = MovementApplicator()
+        world.add_system(psystem)
+        world.add_system(mapplicator)
+        for x in range(10):
+            MovingEntity(world, vx=1, vy=1)
+        for x in range(5):
+            PositionEntity(world)
+
+        exports = []
+        profiler = SystemProfiler(4)
+        profiler.exportfunc = exports.append
+        world.profiler = profiler
+        for x in range(6):
+            world.process()
+        self.assertEqual(exports, [profiler])
+        self.assertEqual(len(profiler.frametimes), 4)
+        self.assertEqual(set(profiler.systems), set((psystem, mapplicator)))
+        self.assertEqual(profiler.get_calls(psystem), 6)
+        self.assertEqual(profiler.get_calls(None), 0)
+        self.assertEqual(profiler.get_counts(psystem), [15, 15, 15, 15])
+        self.assertEqual(profiler.get_counts(mapplicator), [10, 10, 10, 10])
+        self.assertEqual(len(profiler.get_times(mapplicator)), 4)
+        for t in profiler.get_times(psystem):
+            self.assertTrue(t >= 0)
+        times = sorted(profiler.get_times(psystem))
+        self.assertEqual(profiler.percentile(psystem, 50), times[1])
+        self.assertEqual(profiler.percentile(psystem, 99), times[3])
+        self.assertTrue(profiler.percentile(None, 50) >= 0)
+
+        stats = profiler.get_statistics()
+        self.assertEqual(set(stats.keys()),
+                         set((None, psystem, mapplicator)))
+        self.assertEqual(stats[psystem]["calls"], 6)
+        self.assertEqual(stats[psystem]["components"], 15)
+        for key in ("mean", "p50", "p99"):
+            self.assertTrue(key in stats[None])
+            self.assertTrue(key in stats[mapplicator])
+        stats = profiler.get_statistics((90,))
+        self.assertTrue("p90" in stats[psystem])
+
+        # The processing results must not be affected.
+        for c in world.components[Movement].values():
+            self.assertEqual(c.vx, 1)
+        self.assertEqual(len([c for c in world.components[Position].values()
+                              if c.x == 12]), 10)
+
+        profiler.reset()
+        self.assertEqual(profiler.frametimes, [])
+        self.assertEqual(profiler.systems, ())
+
+    def test_SystemProfiler_percentile(self):
+        from pygame2.ebs import _percentile
+        self.assertEqual(_percentile([], 50), 0.0)
+        self.assertEqual(_percentile([1, 2], 50), 1)
+        self.assertEqual(_percentile([2, 1], 51), 2)
+        values = list(range(1, 11))
+        self.assertEqual(_percentile(values, 0), 1)
+        self.assertEqual(_percentile(values, 50), 5)
+        self.assertEqual(_percentile(values, 90), 9)
+        self.assertEqual(_percentile(values, 91), 10)
+        self.assertEqual(_percentile(values, 100), 10)
+        values = list(range(100, 0, -1))
+        self.assertEqual(_percentile(values, 99), 99)
+        self.assertEqual(_percentile(values, 99.5), 100)
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
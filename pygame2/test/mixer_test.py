@@ -0,0 +1,178 @@
+import os
+import sys
+import array
+import ctypes
+import struct
+import weakref
+import unittest
+import pygame2.sdl as sdl
+import pygame2.sdl.audio as audio
+import pygame2.mixer as mixer
+from pygame2.resources import Resources
+
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
+
+RESOURCES = Resources(__file__, "resources")
+
+
+class MixerTest(unittest.TestCase):
+    __tags__ = ["sdl"]
+
+    def setUp(self):
+        if sys.version.startswith("3.1"):
+            self.assertIsInstance = \
+                lambda x, t: self.assertTrue(isinstance(x, t))
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        sdl.init(0)
+        self.mixers = []
+
+    def tearDown(self):
+        for mix in self.mixers:
+            mix.close()
+        del self.mixers
+        sdl.quit()
+
+    def _create_mixer(self, **kwargs):
+        mix = mixer.Mixer(**kwargs)
+        self.mixers.append(mix)
+        return mix
+
+    def _create_sound(self, mix, value, frames):
+        data = struct.pack("=hh", value, value) * frames
+        return mix.create_sound(data, audio.AUDIO_S16SYS, 2, 44100)
+
+    def _mix(self, mix, frames):
+        buf = (ctypes.c_ubyte * (frames * 4))()
+        mix.mix(buf)
+        return list(array.array("h", bytes(bytearray(buf))))
+
+    def test_Mixer(self):
+        mix = self._create_mixer(numchannels=4)
+        self.assertIsInstance(mix, mixer.Mixer)
+        self.assertEqual(mix.frequency, 44100)
+        self.assertEqual(mix.format, audio.AUDIO_S16SYS)
+        self.assertEqual(mix.channels, 2)
+        self.assertEqual(mix.numchannels, 4)
+        for index in range(4):
+            channel = mix.get_channel(index)
+            self.assertIsInstance(channel, mixer.Channel)
+            self.assertIsNone(channel.sound)
+            self.assertFalse(channel.playing)
+            self.assertEqual(channel.gain, 1.0)
+            self.assertEqual(channel.pan, 0.0)
+        mix.close()
+        mix.close()
+        # A closed mixer does not touch the audio device anymore.
+        mix.lock()
+        mix.unlock()
+        mix.pause()
+        mix.resume()
+
+        self.assertRaises(ValueError, mixer.Mixer, aformat=0x1234)
+        self.assertRaises(ValueError, mixer.Mixer, channels=4)
+        self.assertRaises(ValueError, mixer.Mixer, numchannels=0)
+
+    def test_Mixer_release(self):
+        mix = mixer.Mixer()
+        ref = weakref.ref(mix)
+        # The Mixer is kept alive, while its audio device is open.
+        del mix
+        self.assertIsNotNone(ref())
+        ref().close()
+        self.assertIsNone(ref())
+
+    def test_Mixer_create_sound(self):
+        mix = self._create_mixer()
+        mix.pause()
+        sound = self._create_sound(mix, 1000, 100)
+        self.assertIsInstance(sound, mixer.Sound)
+        self.assertEqual(sound.frames, 100)
+        self.assertEqual(sound.size, 400)
+        # Incomplete sample frames are skipped.
+        sound = mix.create_sound(b"\0" * 5, audio.AUDIO_S16SYS, 2, 44100)
+        self.assertEqual(sound.frames, 1)
+        # 8-bit mono data with half the rate of the mixer
+        sound = mix.create_sound(b"\x80" * 100, audio.AUDIO_U8, 1, 22050)
+        self.assertEqual(sound.frames, 200)
+        self.assertEqual(sound.size, 800)
+        mix.close()
+
+    def test_Mixer_load_wav_file(self):
+        mix = self._create_mixer()
+        mix.pause()
+        sound = mix.load_wav_file(RESOURCES.get_path("hey.wav"))
+        self.assertIsInstance(sound, mixer.Sound)
+        self.assertGreater(sound.frames, 0)
+        mix.close()
+
+    def test_Mixer_mix(self):
+        self._check_mix()
+
+    def test_Mixer_mix_sdl(self):
+        # Mixes via SDL_MixAudioFormat() instead of numpy.
+        hasnumpy = mixer._HASNUMPY
+        mixer._HASNUMPY = False
+        try:
+            self._check_mix()
+        finally:
+            mixer._HASNUMPY = hasnumpy
+
+    def _check_mix(self):
+        mix = self._create_mixer(numchannels=2)
+        mix.pause()
+        self.assertEqual(self._mix(mix, 10), [0] * 20)
+        sound = self._create_sound(mix, 1000, 100)
+        channel = mix.play(sound)
+        self.assertEqual(channel, mix.get_channel(0))
+        self.assertTrue(channel.playing)
+        self.assertEqual(self._mix(mix, 50), [1000] * 100)
+        self.assertEqual(channel.position, 50)
+        self.assertEqual(self._mix(mix, 100), [1000] * 100 + [0] * 100)
+        self.assertIsNone(channel.sound)
+        self.assertFalse(channel.playing)
+
+        channel.play(sound, loops=1)
+        self.assertEqual(self._mix(mix, 250), [1000] * 400 + [0] * 100)
+        self.assertIsNone(channel.sound)
+
+        channel.play(sound, loops=-1)
+        channel.paused = True
+        self.assertEqual(self._mix(mix, 10), [0] * 20)
+        channel.paused = False
+        channel.gain = 0.5
+        self.assertEqual(self._mix(mix, 300), [500] * 600)
+        self.assertEqual(mix.play(sound), mix.get_channel(1))
+        self.assertIsNone(mix.play(sound))
+        self.assertEqual(self._mix(mix, 10), [1500] * 20)
+
+        mix.stop()
+        loud = self._create_sound(mix, 30000, 10)
+        mix.play(loud)
+        mix.play(loud)
+        self.assertEqual(self._mix(mix, 10), [32767] * 20)
+        mix.close()
+
+    @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
+    def test_Channel_pan(self):
+        mix = self._create_mixer(numchannels=1)
+        mix.pause()
+        channel = mix.get_channel(0)
+        channel.play(self._create_sound(mix, 1000, 10), loops=-1)
+        channel.pan = -1
+        self.assertEqual(self._mix(mix, 2), [1000, 0, 1000, 0])
+        channel.pan = 1
+        self.assertEqual(self._mix(mix, 2), [0, 1000, 0, 1000])
+        channel.pan = 0.5
+        self.assertEqual(self._mix(mix, 1), [500, 1000])
+        self.assertRaises(ValueError, setattr, channel, "pan", 1.5)
+        self.assertRaises(ValueError, setattr, channel, "pan", -2)
+        self.assertRaises(ValueError, setattr, channel, "gain", -1)
+        mix.close()
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -2,6 +2,7 @@ import sys
 import unittest
 from ctypes import ArgumentError
 import pygame2.openal.al as al
+import pygame2.openal.alc as alc
 
 
 class ALTest(unittest.TestCase):
@@ -383,5 +384,60 @@ class ALTest(unittest.TestCase):
     def test_distance_model(self):
         pass
 
+    def test_Batch(self):
+        self.assertRaises(ValueError, al.Batch, 0)
+        device = alc.open_device()
+        context = alc.create_context(device)
+        alc.make_context_current(context)
+        sources = list(al.gen_sources(2))
+
+        batch = al.Batch(size=2)
+        self.assertTrue(batch.checked)
+        for sid in sources:
+            batch.source_f(sid, al.AL_GAIN, 0.5)
+            batch.source_fv(sid, al.AL_POSITION, (1, 2, 3))
+        batch.listener_fv(al.AL_VELOCITY, (4, 5, 6))
+        # Nothing is passed to OpenAL before the commit.
+        self.assertAlmostEqual(al.get_source_f(sources[0], al.AL_GAIN), 1.0)
+        batch.commit()
+        for sid in sources:
+            self.assertAlmostEqual(al.get_source_f(sid, al.AL_GAIN), 0.5)
+            self.assertEqual(al.get_source_3f(sid, al.AL_POSITION),
+                             (1, 2, 3))
+        self.assertEqual(al.get_listener_3f(al.AL_VELOCITY), (4, 5, 6))
+
+        # Updates are discarded, if an exception is raised.
+        def discard():
+            with batch:
+                for sid in sources:
+                    batch.source_fv(sid, al.AL_POSITION, (0, 0, 0))
+                batch.listener_fv(al.AL_VELOCITY, (0, 0, 0))
+                raise KeyError()
+        self.assertRaises(KeyError, discard)
+        for sid in sources:
+            self.assertEqual(al.get_source_3f(sid, al.AL_POSITION),
+                             (1, 2, 3))
+        self.assertEqual(al.get_listener_3f(al.AL_VELOCITY), (4, 5, 6))
+        self.assertRaises(ValueError, batch.source_fv, sources[0],
+                          al.AL_POSITION, range(7))
+
+        with batch:
+            for sid in sources:
+                batch.source_stop(sid)
+        for sid in sources:
+            self.assertEqual(al.get_source_i(sid, al.AL_SOURCE_STATE),
+                             al.AL_STOPPED)
+
+        batch.source_f(sources[0], 0, 1)
+        self.assertRaises(al.OpenALError, batch.commit)
+        batch.checked = False
+        batch.source_f(sources[0], 0, 1)
+        batch.commit()
+        self.assertEqual(al.get_error(), al.AL_INVALID_ENUM)
+
+        al.delete_sources(sources)
+        alc.destroy_context(context)
+        alc.close_device(device)
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
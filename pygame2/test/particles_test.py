@@ -2,6 +2,12 @@ import sys
 import unittest
 import pygame2.particles as particles
 
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
+
 
 class ParticlesTest(unittest.TestCase):
 
@@ -129,6 +135,88 @@ class ParticlesTest(unittest.TestCase):
         world["runs"] = 2
         engine.process(world, plist)
 
+    @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
+    def test_ParticleArray(self):
+        self.assertRaises(ValueError, particles.ParticleArray, 0)
+        parray = particles.ParticleArray(4)
+        self.assertEqual(len(parray), 0)
+        self.assertEqual(parray.capacity, 4)
+        self.assertEqual(len(parray.x), 0)
+
+        view = parray.add(3, x=1, y=2, vx=(1, 2, 3), life=5, type=1)
+        self.assertIsInstance(view, particles.ParticleView)
+        self.assertEqual(len(view), 3)
+        self.assertEqual(len(parray), 3)
+        self.assertEqual(list(parray.x), [1, 1, 1])
+        self.assertEqual(list(parray.y), [2, 2, 2])
+        self.assertEqual(list(parray.vx), [1, 2, 3])
+        self.assertEqual(list(parray.vy), [0, 0, 0])
+        self.assertEqual(list(parray.life), [5, 5, 5])
+        self.assertEqual(list(parray.type), [1, 1, 1])
+
+        # Exceeding the capacity enlarges the arrays.
+        parray.add(6, x=10, life=1)
+        self.assertEqual(len(parray), 9)
+        self.assertTrue(parray.capacity >= 9)
+        self.assertEqual(list(parray.vx[:3]), [1, 2, 3])
+        self.assertEqual(list(parray.x[3:]), [10] * 6)
+
+        view.x += view.vx
+        self.assertEqual(list(parray.x[:3]), [2, 3, 4])
+        self.assertRaises(AttributeError, getattr, view, "foo")
+        self.assertRaises(AttributeError, setattr, view, "foo", 1)
+
+        parray.life[3:] = 0
+        self.assertEqual(parray.compact(), 6)
+        self.assertEqual(len(parray), 3)
+        self.assertEqual(parray.compact(), 0)
+        parray.clear()
+        self.assertEqual(len(parray), 0)
+
+    @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
+    def test_ArrayParticleEngine(self):
+        engine = particles.ArrayParticleEngine()
+        self.assertIsInstance(engine, particles.ArrayParticleEngine)
+        self.assertTrue(particles.ParticleArray in engine.componenttypes)
+        self.assertIsNone(engine.createfunc)
+        self.assertIsNone(engine.deletefunc)
+        self.assertIsNone(engine.updatefunc)
+        for name in ("createfunc", "deletefunc", "updatefunc"):
+            for val in (None, "Test", 1234):
+                self.assertRaises(TypeError, setattr, engine, name, val)
+
+    @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
+    def test_ArrayParticleEngine_process(self):
+        def cfunc(w, c):
+            self.assertEqual(len(c), w["runs"])
+            self.assertTrue((c.life <= 0).all())
+            if w["revive"]:
+                c.life = 100
+
+        def ufunc(w, c):
+            self.assertEqual(len(c), w["total"] - w["runs"])
+            self.assertTrue((c.life >= 1).all())
+            c.x += c.vx
+
+        def dfunc(w, c):
+            self.assertEqual(len(c), w["runs"])
+
+        parray = particles.ParticleArray()
+        parray.add(100, x=range(100), vx=1, life=range(1, 101))
+        engine = particles.ArrayParticleEngine()
+        engine.createfunc = cfunc
+        engine.updatefunc = ufunc
+        engine.deletefunc = dfunc
+        world = {"runs": 1, "revive": False, "total": 100}
+        engine.process(world, [parray])
+        self.assertEqual(len(parray), 99)
+        self.assertEqual(list(parray.x), list(range(2, 101)))
+        world["total"] = 99
+        world["revive"] = True
+        engine.process(world, [parray])
+        self.assertEqual(len(parray), 99)
+        self.assertTrue(100 in list(parray.life))
+
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -1,6 +1,13 @@
+import gc
+import io
 import os
 import sys
+import shutil
+import tarfile
+import tempfile
 import unittest
+import warnings
+import zipfile
 import urllib
 if sys.version_info[0] < 3:
     import urllib2
@@ -209,6 +216,114 @@ class ResourcesTest(unittest.TestCase):
         self.assertRaises(KeyError, res.get_filelike, "invalid")
         self.assertRaises(KeyError, res.get_filelike, 1234)
 
+    def test_Resources_get_filelike_archives(self):
+        fpath = os.path.join(os.path.dirname(__file__), "resources")
+        tfile = os.path.join(fpath, "resources.tar.gz")
+        tar = tarfile.open(tfile)
+        data = tar.extractfile("resources/surfacetest.bmp").read()
+        tar.close()
+
+        # Members of TAR archives are read directly from the archive,
+        # without reading the whole data.
+        res = resources.Resources()
+        res.add_archive(tfile, typehint="targz")
+        reader = res.get_filelike("surfacetest.bmp")
+        self.assertEqual(reader.read(2), data[:2])
+        self.assertEqual(reader.tell(), 2)
+        self.assertEqual(reader.seek(-4, io.SEEK_END), len(data) - 4)
+        self.assertEqual(reader.read(), data[-4:])
+        self.assertEqual(reader.read(), b"")
+        reader.seek(10)
+        self.assertEqual(reader.read(5), data[10:15])
+        self.assertRaises(ValueError, reader.seek, -1)
+        self.assertEqual(res.get("surfacetest.bmp").read(), data)
+
+        # The archive is opened again after closing it.
+        res.close()
+        self.assertRaises(ValueError, reader.read)
+        self.assertEqual(res.get_filelike("surfacetest.bmp").read(), data)
+        res.close()
+
+        # Members stored without compression in ZIP archives are read
+        # directly as well.
+        tmpdir = tempfile.mkdtemp()
+        try:
+            zfile = os.path.join(tmpdir, "stored.zip")
+            zipf = zipfile.ZipFile(zfile, "w", zipfile.ZIP_STORED)
+            zipf.writestr("data/stored.txt", b"Stored data")
+            zipf.close()
+            res = resources.Resources()
+            res.add(zfile)
+            reader = res.get_filelike("stored.txt")
+            self.assertNotIsInstance(reader, io.BytesIO)
+            reader.seek(7)
+            self.assertEqual(reader.read(), b"data")
+            self.assertEqual(res.get("stored.txt").read(), b"Stored data")
+            res.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_Resources_tar_links(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            tfile = os.path.join(tmpdir, "links.tar")
+            tar = tarfile.open(tfile, "w")
+            info = tarfile.TarInfo("data")
+            info.type = tarfile.DIRTYPE
+            tar.addfile(info)
+            info = tarfile.TarInfo("data/file.txt")
+            info.size = 9
+            tar.addfile(info, io.BytesIO(b"File data"))
+            for name, ltype, target in (
+                    ("data/hard.txt", tarfile.LNKTYPE, "data/file.txt"),
+                    ("data/sym.txt", tarfile.SYMTYPE, "file.txt"),
+                    ("symsym.txt", tarfile.SYMTYPE, "data/sym.txt"),
+                    ("dangling.txt", tarfile.SYMTYPE, "invalid.txt"),
+                    ("loop.txt", tarfile.SYMTYPE, "loop.txt")):
+                info = tarfile.TarInfo(name)
+                info.type = ltype
+                info.linkname = target
+                tar.addfile(info)
+            tar.close()
+
+            res = resources.Resources()
+            res.add_archive(tfile, typehint="tar")
+            for name in ("file.txt", "hard.txt", "sym.txt", "symsym.txt"):
+                self.assertEqual(res.get(name).read(), b"File data")
+                self.assertEqual(res.get_filelike(name).read(), b"File data")
+            for name in ("data", "dangling.txt", "loop.txt"):
+                self.assertRaises(KeyError, res.get, name)
+            res.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_Resources_close(self):
+        fpath = os.path.join(os.path.dirname(__file__), "resources")
+        zfile = os.path.join(fpath, "resources.zip")
+        with resources.Resources() as res:
+            res.add_archive(zfile)
+            data = res.get("rwopstest.txt").read()
+            self.assertTrue(data.startswith(b"This is a test file"))
+            archive = res._archives[zfile]
+            self.assertIsNotNone(archive._fileobj)
+        self.assertIsNone(archive._fileobj)
+        self.assertIsNone(archive._zipfile)
+
+        # Released archives do not leave open files behind.
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            res = resources.Resources()
+            res.add_archive(zfile)
+            reader = res.get_filelike("rwopstest.txt")
+            del res
+            gc.collect()
+            # Streams keep the archive open.
+            self.assertEqual(reader.read(), data)
+            del reader
+            gc.collect()
+        self.assertEqual([w for w in caught
+                          if w.category.__name__ == "ResourceWarning"], [])
+
     def test_Resources_get_path(self):
         fpath = os.path.join(os.path.dirname(__file__), "resources")
         zfile = os.path.join(fpath, "resources.zip")
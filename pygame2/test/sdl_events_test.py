@@ -193,6 +193,31 @@ class SDLEventsTest(unittest.TestCase):
     def test_peep_events(self):
         pass
 
+    def test_peep_events_into(self):
+        events.flush_events(events.SDL_FIRSTEVENT, events.SDL_LASTEVENT)
+        for index in range(5):
+            ev = events.SDL_Event()
+            ev.type = events.SDL_USEREVENT
+            ev.user.code = index
+            events.push_event(ev)
+        evbuf = (events.SDL_Event * 3)()
+        ret = events.peep_events_into(evbuf, events.SDL_PEEKEVENT,
+                                      events.SDL_USEREVENT,
+                                      events.SDL_USEREVENT)
+        self.assertEqual(ret, 3)
+        self.assertEqual([ev.user.code for ev in evbuf], [0, 1, 2])
+        codes = []
+        for expected in (3, 2, 0):
+            ret = events.peep_events_into(evbuf, events.SDL_GETEVENT,
+                                          events.SDL_USEREVENT,
+                                          events.SDL_USEREVENT)
+            self.assertEqual(ret, expected)
+            codes.extend(evbuf[index].user.code for index in range(ret))
+        self.assertEqual(codes, [0, 1, 2, 3, 4])
+        self.assertRaises(ValueError, events.peep_events_into,
+                          (events.SDL_Event * 0)(), events.SDL_GETEVENT,
+                          events.SDL_USEREVENT, events.SDL_USEREVENT)
+
     @unittest.skip("not implemented")
     def test_poll_event(self):
         pass
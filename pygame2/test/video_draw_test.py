@@ -5,6 +5,13 @@ import pygame2.array as array
 import pygame2.sdl.surface as surface
 import pygame2.sdl.pixels as pixels
 import pygame2.video as video
+import pygame2.video.draw as draw
+
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
 
 
 class VideoDrawTest(unittest.TestCase):
@@ -17,8 +24,33 @@ class VideoDrawTest(unittest.TestCase):
         video.init()
 
     def tearDown(self):
+        draw._HASNUMPY = _HASNUMPY
         video.quit()
 
+    def _drawn_pixels(self, sprite):
+        drawn = set()
+        with video.PixelView(sprite) as view:
+            for y, row in enumerate(view):
+                for x, col in enumerate(row):
+                    if col != 0:
+                        drawn.add((x, y))
+        return drawn
+
+    def _draw_variants(self, func, *args):
+        # Draws using the pure Python and, if possible, the numpy
+        # implementation and returns the drawn pixels of both.
+        results = []
+        factory = video.SpriteFactory(video.SOFTWARE)
+        for hasnumpy in set((False, _HASNUMPY)):
+            draw._HASNUMPY = hasnumpy
+            sprite = factory.create_sprite(size=(20, 20), bpp=32)
+            func(sprite, *args)
+            results.append(self._drawn_pixels(sprite))
+        draw._HASNUMPY = _HASNUMPY
+        if len(results) == 2:
+            self.assertEqual(results[0], results[1])
+        return results[0]
+
     @unittest.skipIf(hasattr(sys, "pypy_version_info"),
                      "PyPy's ctypes can't do byref(value, offset)")
     def test_fill(self):
@@ -48,6 +80,154 @@ class VideoDrawTest(unittest.TestCase):
                     else:
                         self.assertEqual(col, 0, "color mismatch at (x, y)")
 
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_line(self):
+        color = 0xFFFFFFFF
+        drawn = self._draw_variants(video.line, color, (2, 3, 8, 3))
+        self.assertEqual(drawn, set((x, 3) for x in range(2, 9)))
+        drawn = self._draw_variants(video.line, color, (4, 9, 4, 2))
+        self.assertEqual(drawn, set((4, y) for y in range(2, 10)))
+        drawn = self._draw_variants(video.line, color, (0, 0, 5, 5))
+        self.assertEqual(drawn, set((i, i) for i in range(6)))
+        drawn = self._draw_variants(video.line, color, (6, 0, 0, 3))
+        self.assertEqual(drawn, set(((6, 0), (5, 1), (4, 1), (3, 2),
+                                     (2, 2), (1, 3), (0, 3))))
+        # Multiple lines, partially outside of the surface
+        drawn = self._draw_variants(video.line, color, (-10, 1, 30, 1,
+                                                        5, -5, 5, 25))
+        self.assertEqual(drawn, set([(x, 1) for x in range(20)] +
+                                    [(5, y) for y in range(20)]))
+        drawn = self._draw_variants(video.line, color, (2, 5, 12, 5), 3)
+        self.assertEqual(drawn, set((x, y) for x in range(2, 13)
+                                    for y in range(4, 7)))
+        drawn = self._draw_variants(video.line, color, (0, 0, 10, 10), 2)
+        self.assertEqual(drawn, set([(i, i) for i in range(11)] +
+                                    [(i, i - 1) for i in range(1, 11)]))
+
+        factory = video.SpriteFactory(video.SOFTWARE)
+        sprite = factory.create_sprite(size=(20, 20), bpp=32)
+        self.assertRaises(ValueError, video.line, sprite, color, (1, 2, 3))
+        self.assertRaises(ValueError, video.line, sprite, color,
+                          (1, 2, 3, 4), 0)
+        self.assertRaises(TypeError, video.line, None, color, (1, 2, 3, 4))
+
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_line_bpp(self):
+        factory = video.SpriteFactory(video.SOFTWARE)
+        expected = set([(i, i) for i in range(5)] + [(0, 4), (1, 4)])
+        for bpp in (8, 16, 24, 32):
+            sprite = factory.create_sprite(size=(5, 5), bpp=bpp)
+            rcolor = video.prepare_color(0xFFFFFFFF, sprite)
+            video.line(sprite, 0xFFFFFFFF, (0, 0, 4, 4, 0, 4, 1, 4))
+            with video.PixelView(sprite) as view:
+                for y in range(5):
+                    for x in range(5):
+                        if (x, y) in expected:
+                            self.assertEqual(view[y, x], rcolor)
+                        else:
+                            self.assertEqual(view[y, x], 0)
+
+    def test_line_spans(self):
+        # Wide lines along the edges of the clip area are clipped on the
+        # minor axis, too.
+        lines = (0, 0, 9, 0, 0, 9, 9, 9, 0, 0, 0, 9, 9, 0, 9, 9,
+                 -3, 5, 12, 7, 2, -4, 4, 13)
+        funcs = [draw._line_spans]
+        if _HASNUMPY:
+            funcs.append(draw._line_spans_numpy)
+        for func in funcs:
+            spans = [int(v) for v in func(lines, 5, (1, 2, 10, 12))]
+            self.assertGreater(len(spans), 0)
+            for idx in range(0, len(spans), 4):
+                x, y, w, h = spans[idx:idx + 4]
+                self.assertTrue(w > 0 and h > 0)
+                self.assertTrue(x >= 1 and x + w <= 10)
+                self.assertTrue(y >= 2 and y + h <= 12)
+
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_lines(self):
+        color = 0xFFFFFFFF
+        drawn = self._draw_variants(video.lines, color, (1, 1, 5, 1, 5, 4))
+        self.assertEqual(drawn, set([(x, 1) for x in range(1, 6)] +
+                                    [(5, y) for y in range(1, 5)]))
+        drawn = self._draw_variants(video.lines, color, (1, 1, 5, 1, 5, 4),
+                                    True)
+        self.assertTrue(drawn.issuperset(((2, 2), (3, 2), (4, 3))))
+        self.assertRaises(ValueError, video.lines, None, color, (1, 1))
+        self.assertRaises(ValueError, video.lines, None, color, (1, 1, 2))
+
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_polygon(self):
+        color = 0xFFFFFFFF
+        square = (2, 2, 10, 2, 10, 10, 2, 10)
+        drawn = self._draw_variants(video.polygon, color, square, True)
+        self.assertEqual(drawn, set((x, y) for x in range(2, 11)
+                                    for y in range(2, 11)))
+        drawn = self._draw_variants(video.polygon, color, square)
+        self.assertEqual(len(drawn), 32)
+        self.assertFalse((5, 5) in drawn)
+        drawn = self._draw_variants(video.polygon, color,
+                                    (0, 0, 19, 0, 0, 19), True)
+        self.assertEqual(len(drawn), 210)
+        self.assertRaises(ValueError, video.polygon, None, color,
+                          (1, 1, 2, 2))
+
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_circle(self):
+        color = 0xFFFFFFFF
+        drawn = self._draw_variants(video.circle, color, (10, 10, 0))
+        self.assertEqual(drawn, set([(10, 10)]))
+        drawn = self._draw_variants(video.circle, color, (10, 10, 5), True)
+        for x, y in drawn:
+            self.assertLessEqual((x - 10) ** 2 + (y - 10) ** 2, 30)
+        self.assertTrue(set(((5, 10), (15, 10), (10, 5), (10, 15),
+                             (10, 10))).issubset(drawn))
+        outline = self._draw_variants(video.circle, color, (10, 10, 5))
+        self.assertTrue(outline.issubset(drawn))
+        self.assertFalse((10, 10) in outline)
+        self.assertTrue(set(((5, 10), (15, 10), (10, 5),
+                             (10, 15))).issubset(outline))
+        ring = self._draw_variants(video.circle, color, (10, 10, 5), False, 2)
+        self.assertTrue(outline.issubset(ring))
+        self.assertTrue((6, 10) in ring)
+        # Multiple circles, partially outside of the surface
+        drawn = self._draw_variants(video.circle, color,
+                                    (0, 0, 3, 19, 19, 3), True)
+        self.assertEqual(len(drawn), 24)
+        self.assertRaises(ValueError, video.circle, None, color, (1, 1))
+        self.assertRaises(ValueError, video.circle, None, color, (1, 1, 1),
+                          False, 0)
+
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_aaline(self):
+        factory = video.SpriteFactory(video.SOFTWARE)
+        results = []
+        for hasnumpy in set((False, _HASNUMPY)):
+            draw._HASNUMPY = hasnumpy
+            sprite = factory.create_sprite(size=(20, 20), bpp=32,
+                                           masks=(0xFF0000, 0x00FF00,
+                                                  0x0000FF, 0))
+            video.aaline(sprite, 0xFFFFFFFF, (0, 0, 10, 5, 0, 10, 10, 10))
+            with video.PixelView(sprite) as view:
+                results.append([[col for col in row] for row in view])
+                # Straight lines are not blended.
+                for x in range(11):
+                    self.assertEqual(view[10, x], 0xFFFFFF)
+                self.assertEqual(view[0, 0], 0xFFFFFF)
+                self.assertEqual(view[5, 10], 0xFFFFFF)
+                # The line passes (1, 0.5), so both pixels are half set
+                self.assertEqual(view[0, 1], 0x808080)
+                self.assertEqual(view[1, 1], 0x808080)
+                self.assertEqual(view[5, 0], 0)
+        if len(results) == 2:
+            self.assertEqual(results[0], results[1])
+
     def test_prepare_color(self):
         rcolors = (Color(0, 0, 0, 0),
                    Color(255, 255, 255, 255),
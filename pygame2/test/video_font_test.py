@@ -1,4 +1,6 @@
+import os
 import sys
+import weakref
 import unittest
 from pygame2.resources import Resources
 import pygame2.video as video
@@ -39,21 +41,162 @@ class VideoFontTest(unittest.TestCase):
         font = video.BitmapFont(sprite, (32, 32), FONTMAP)
         self.assertIsInstance(font, video.BitmapFont)
 
-    @unittest.skip("not implemented")
+        self.assertRaises(TypeError, video.BitmapFont, None, (32, 32))
+        self.assertRaises(ValueError, video.BitmapFont, sf, (32, 32),
+                          textcache=-1)
+
     def test_BitmapFont_render(self):
-        pass
+        sf = sdlsurface.load_bmp(RESOURCES.get_path("font.bmp"))
+        font = video.BitmapFont(sf, (32, 32), FONTMAP, textcache=2)
+        sprite = font.render("1234")
+        self.assertIsInstance(sprite, video.SoftwareSprite)
+        self.assertEqual(sprite.size, (128, 32))
+        self.assertEqual(sprite.surface.format.BitsPerPixel,
+                         sf.format.BitsPerPixel)
+        # Each call returns a sprite of its own.
+        self.assertIsNot(font.render("1234"), sprite)
+        sprite = font.render(os.linesep.join(("12", "345")), 32)
+        self.assertEqual(sprite.size, (96, 64))
+        self.assertEqual(sprite.surface.format.BitsPerPixel, 32)
+
+        # Released sprites are reused for texts of the same size.
+        font.release(sprite)
+        self.assertRaises(ValueError, font.release, sprite)
+        self.assertIs(font.render(os.linesep.join(("99", "999")), 32),
+                      sprite)
+
+        font = video.BitmapFont(sf, (32, 32), FONTMAP, textcache=0)
+        self.assertIsNot(font.render("1234"), font.render("1234"))
+
+    def test_BitmapFont_render_cached(self):
+        sf = sdlsurface.load_bmp(RESOURCES.get_path("font.bmp"))
+        font = video.BitmapFont(sf, (32, 32), FONTMAP, textcache=2)
+        sprite = font.render_cached("1234")
+        self.assertIsInstance(sprite, video.SoftwareSprite)
+        self.assertEqual(sprite.size, (128, 32))
+        self.assertIs(font.render_cached("1234"), sprite)
+        self.assertIsNot(font.render("1234"), sprite)
+        sprite = font.render_cached(os.linesep.join(("12", "345")), 32)
+        self.assertEqual(sprite.size, (96, 64))
+        self.assertEqual(sprite.surface.format.BitsPerPixel, 32)
+
+        # Texts removed from the cache give their sprite to new texts of
+        # the same size, once the sprite was released.
+        held = font.render_cached("0000")
+        font.render_cached("5678", 32)
+        font.render_cached("9999", 32)
+        self.assertIsNot(font.render_cached("1111"), held)
+        released = font.render_cached("2222")
+        self.assertIs(font.render_cached("2222"), released)
+        font.release(released)
+        font.render_cached("5678", 32)
+        font.render_cached("9999", 32)
+        # Still used by the second render_cached() call.
+        self.assertIsNot(font.render_cached("3333"), released)
+        font.release(released)
+        self.assertIs(font.render_cached("4444"), released)
+        font.release(released)
+        self.assertRaises(ValueError, font.release, released)
+        font.release(held)
+        self.assertRaises(ValueError, font.release, held)
+
+        font = video.BitmapFont(sf, (32, 32), FONTMAP, textcache=0)
+        self.assertIsNot(font.render_cached("1234"),
+                         font.render_cached("1234"))
 
-    @unittest.skip("not implemented")
     def test_BitmapFont_render_on(self):
-        pass
+        sf = sdlsurface.load_bmp(RESOURCES.get_path("font.bmp"))
+        font = video.BitmapFont(sf, (32, 32), FONTMAP)
+        factory = video.SpriteFactory(video.SOFTWARE)
+        sprite = factory.create_sprite(size=(200, 100), bpp=32)
+        self.assertEqual(font.render_on(sprite, "123", (10, 5)),
+                         (10, 5, 96, 32))
+        text = os.linesep.join(("12", "345"))
+        self.assertEqual(font.render_on(sprite.surface, text),
+                         (0, 0, 96, 64))
+        self.assertRaises(TypeError, font.render_on, None, "123")
+
+        context = video.RenderContext(sprite)
+        self.assertEqual(font.render_on(context, "123", (10, 5)),
+                         (10, 5, 96, 32))
+
+        # The texture of the font does not keep the context alive.
+        ref = weakref.ref(context)
+        del context
+        self.assertIsNone(ref())
 
-    @unittest.skip("not implemented")
     def test_BitmapFont_contains(self):
-        pass
+        sf = sdlsurface.load_bmp(RESOURCES.get_path("font.bmp"))
+        font = video.BitmapFont(sf, (32, 32), FONTMAP)
+        for line in FONTMAP:
+            for c in line:
+                self.assertTrue(font.contains(c))
+        self.assertFalse(font.contains("#"))
 
-    @unittest.skip("not implemented")
     def test_BitmapFont_can_render(self):
-        pass
+        sf = sdlsurface.load_bmp(RESOURCES.get_path("font.bmp"))
+        font = video.BitmapFont(sf, (32, 32), FONTMAP)
+        self.assertTrue(font.can_render("Test 1234"))
+        self.assertTrue(font.can_render(os.linesep.join(("Test", "1234"))))
+        self.assertFalse(font.can_render("Test #1234"))
+
+    def test_TTFFont(self):
+        fname = RESOURCES.get_path("tuffy.ttf")
+        self.assertRaises(ValueError, video.TTFFont, fname, 20, capacity=0)
+        self.assertRaises(ValueError, video.TTFFont, fname, 20, textcache=-1)
+        font = video.TTFFont(fname, 20)
+        self.assertIsInstance(font, video.TTFFont)
+        self.assertEqual(font.ptsize, 20)
+        self.assertEqual(font.style, 0)
+        self.assertGreater(font.height, 0)
+        font.close()
+        font.close()
+
+    def test_TTFFont_text_size(self):
+        font = video.TTFFont(RESOURCES.get_path("tuffy.ttf"), 20)
+        self.assertEqual(font.text_size(""), (0, font.height))
+        w, h = font.text_size("Test")
+        self.assertGreater(w, 0)
+        self.assertEqual(h, font.height)
+        self.assertEqual(font.text_size(os.linesep.join(("Test", "Test"))),
+                         (w, font.lineskip + font.height))
+        self.assertGreater(font.text_size("Test Text")[0], w)
+        font.close()
+
+    def test_TTFFont_render(self):
+        font = video.TTFFont(RESOURCES.get_path("tuffy.ttf"), 20,
+                             textcache=2)
+        sprite = font.render("Test", (255, 0, 0))
+        self.assertIsInstance(sprite, video.SoftwareSprite)
+        self.assertEqual(sprite.size, font.text_size("Test"))
+        self.assertIs(font.render("Test", (255, 0, 0)), sprite)
+        self.assertIsNot(font.render("Test", (0, 255, 0)), sprite)
+        font.render("Text", (255, 0, 0))
+        self.assertIsNot(font.render("Test", (255, 0, 0)), sprite)
+        font.close()
+
+    def test_TTFFont_render_on(self):
+        # Less glyphs than characters in the text enforce replacing
+        # glyphs in the atlas during rendering.
+        font = video.TTFFont(RESOURCES.get_path("tuffy.ttf"), 20,
+                             capacity=2)
+        factory = video.SpriteFactory(video.SOFTWARE)
+        sprite = factory.create_sprite(size=(200, 100), bpp=32)
+        self.assertRaises(TypeError, font.render_on, None, "Test")
+        text = os.linesep.join(("abcd", "efgh"))
+        area = font.render_on(sprite, text, (10, 5))
+        w, h = font.text_size(text)
+        self.assertEqual(area, (10, 5, w, h))
+        drawn = False
+        with video.PixelView(sprite) as view:
+            for y, row in enumerate(view):
+                for x, col in enumerate(row):
+                    if 10 <= x < 10 + w and 5 <= y < 5 + h:
+                        drawn = drawn or col != 0
+                    else:
+                        self.assertEqual(col, 0)
+        self.assertTrue(drawn)
+        font.close()
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
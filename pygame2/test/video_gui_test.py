@@ -1,6 +1,26 @@
 import sys
 import unittest
 import pygame2.video as video
+import pygame2.sdl.events as events
+from pygame2.ebs import World, Entity
+
+
+class UIEntity(Entity):
+    def __init__(self, world, sprite):
+        self.sprite = sprite
+
+
+def mouse_event(etype, x, y):
+    event = events.SDL_Event()
+    event.type = etype
+    if etype == events.SDL_MOUSEMOTION:
+        event.motion.x = x
+        event.motion.y = y
+    else:
+        event.button.x = x
+        event.button.y = y
+        event.button.button = 1
+    return event
 
 
 class VideoGUITest(unittest.TestCase):
@@ -43,9 +63,13 @@ class VideoGUITest(unittest.TestCase):
     def test_TextEntry(self):
         pass
 
-    @unittest.skip("not implemented")
     def test_UIProcessor(self):
-        pass
+        processor = video.UIProcessor()
+        self.assertIsInstance(processor, video.UIProcessor)
+        self.assertTrue(video.Sprite in processor.componenttypes)
+        processor = video.UIProcessor(cellsize=16)
+        self.assertRaises(ValueError, video.UIProcessor, 0)
+        self.assertRaises(ValueError, video.UIProcessor, -10)
 
     @unittest.skip("not implemented")
     def test_UIProcessor_activate(self):
@@ -55,9 +79,161 @@ class VideoGUITest(unittest.TestCase):
     def test_UIProcessor_deactivate(self):
         pass
 
-    @unittest.skip("not implemented")
     def test_UIProcessor_dispatch(self):
-        pass
+        factory = video.UIFactory(video.SpriteFactory(video.SOFTWARE))
+        world = World()
+        processor = video.UIProcessor(cellsize=16)
+        world.add_system(processor)
+        buttons = []
+        for index in range(100):
+            button = factory.create_button(size=(10, 10))
+            button.position = (index % 10) * 20, (index // 10) * 20
+            UIEntity(world, button)
+            buttons.append(button)
+
+        def hovered():
+            return [b for b in buttons if b.state & video.HOVERED]
+
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 25, 45))
+        self.assertEqual(hovered(), [buttons[21]])
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 15, 15))
+        self.assertEqual(hovered(), [])
+
+        # Other sprites do not cause the index to be rebuilt.
+        cells = processor._grid.cells
+        UIEntity(world, factory.spritefactory.create_sprite(size=(10, 10)))
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 25, 45))
+        self.assertIs(processor._grid.cells, cells)
+        self.assertEqual(hovered(), [buttons[21]])
+
+        # Moved and added buttons are found at their new position, once
+        # the index was updated.
+        buttons[0].position = 300, 300
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEMOTION, 305, 305))
+        self.assertEqual(hovered(), [])
+        world.process()
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEMOTION, 305, 305))
+        self.assertEqual(hovered(), [buttons[0]])
+        button = factory.create_button(size=(10, 10))
+        button.position = 400, 400
+        UIEntity(world, button)
+        buttons.append(button)
+        world.process()
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEMOTION, 401, 409))
+        self.assertEqual(hovered(), [button])
+
+        clicks = []
+        button.click += lambda b, e: clicks.append(b)
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEBUTTONDOWN, 401, 409))
+        self.assertTrue(button.state & video.PRESSED)
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEBUTTONUP, 401, 409))
+        self.assertEqual(clicks, [button])
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 0, 0))
+        self.assertEqual(hovered(), [])
+
+        # A button press elsewhere releases a pressed button, so that a
+        # later button release on it is no click.
+        del clicks[:]
+        for etype, x, y in ((events.SDL_MOUSEBUTTONDOWN, 401, 409),
+                            (events.SDL_MOUSEMOTION, 150, 150),
+                            (events.SDL_MOUSEBUTTONUP, 150, 150),
+                            (events.SDL_MOUSEBUTTONDOWN, 150, 150)):
+            processor.dispatch(world, mouse_event(etype, x, y))
+        self.assertFalse(button.state & video.PRESSED)
+        for etype in (events.SDL_MOUSEMOTION, events.SDL_MOUSEBUTTONUP):
+            processor.dispatch(world, mouse_event(etype, 401, 409))
+        self.assertEqual(clicks, [])
+
+    def test_UIProcessor_dispatch_unprocessed(self):
+        factory = video.UIFactory(video.SpriteFactory(video.SOFTWARE))
+        world = World()
+        processor = video.UIProcessor(cellsize=16)
+        button = factory.create_button(size=(10, 10))
+        UIEntity(world, button)
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 5, 5))
+        self.assertTrue(button.state & video.HOVERED)
+
+        # Without process() calls, changes are found on the next event.
+        button.position = 100, 100
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEMOTION, 105, 105))
+        self.assertTrue(button.state & video.HOVERED)
+        button2 = factory.create_button(size=(10, 10))
+        UIEntity(world, button2)
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 5, 5))
+        self.assertFalse(button.state & video.HOVERED)
+        self.assertTrue(button2.state & video.HOVERED)
+
+    def test_UIProcessor_dispatch_visited(self):
+        factory = video.UIFactory(video.SpriteFactory(video.SOFTWARE))
+        world = World()
+        processor = video.UIProcessor(cellsize=16)
+        world.add_system(processor)
+        buttons = []
+        for index in range(100):
+            button = factory.create_button(size=(10, 10))
+            button.position = (index % 10) * 20, (index // 10) * 20
+            UIEntity(world, button)
+            buttons.append(button)
+        world.process()
+
+        visited = []
+        for etype in (events.SDL_MOUSEMOTION, events.SDL_MOUSEBUTTONDOWN,
+                      events.SDL_MOUSEBUTTONUP):
+            handler = processor.handlers[etype]
+            processor.handlers[etype] = \
+                lambda c, e, handler=handler: (visited.append(c),
+                                               handler(c, e))
+
+        # Only the buttons under the cursor and the previously hovered or
+        # pressed ones receive the mouse events.
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 25, 45))
+        self.assertEqual(visited, [buttons[21]])
+        del visited[:]
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 45, 45))
+        self.assertEqual(visited, [buttons[22], buttons[21]])
+        del visited[:]
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEBUTTONDOWN, 45, 45))
+        self.assertEqual(visited, [buttons[22]])
+        del visited[:]
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEMOTION, 85, 5))
+        self.assertEqual(visited, [buttons[4], buttons[22]])
+        del visited[:]
+        processor.dispatch(world, mouse_event(events.SDL_MOUSEBUTTONUP, 85, 5))
+        self.assertEqual(visited, [buttons[4], buttons[22]])
+        del visited[:]
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEMOTION, 155, 195))
+        self.assertEqual(visited, [buttons[4]])
+        del visited[:]
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEBUTTONDOWN, 155, 195))
+        self.assertEqual(visited, [buttons[22]])
+        self.assertFalse(buttons[22].state & video.PRESSED)
+        del visited[:]
+        processor.dispatch(world,
+                           mouse_event(events.SDL_MOUSEBUTTONDOWN, 155, 195))
+        self.assertEqual(visited, [])
+
+    def test_UIFactory_componenttypes(self):
+        factory = video.UIFactory(video.SpriteFactory(video.SOFTWARE))
+        world = World()
+        sprite = UIEntity(world, factory.spritefactory.create_sprite(
+                size=(10, 10)))
+        button = UIEntity(world, factory.create_button(size=(10, 10)))
+        # UI elements are stored as components of their sprite class.
+        self.assertEqual(set(world.componenttypes),
+                         set((video.SoftwareSprite, video.Sprite)))
+        self.assertIsInstance(sprite.softwaresprite, video.SoftwareSprite)
+        self.assertIsInstance(button.softwaresprite, video.SoftwareSprite)
+        self.assertEqual(button.softwaresprite.uitype, video.BUTTON)
+        self.assertEqual(len(world.get_components(video.Sprite)), 2)
 
     @unittest.skip("not implemented")
     def test_UIProcessor_mousedown(self):
@@ -2,6 +2,7 @@ import os
 import sys
 import unittest
 import pygame2.video as video
+from pygame2.compat import UnsupportedError
 
 try:
     import numpy
@@ -37,6 +38,64 @@ class VideoPixelAccessTest(unittest.TestCase):
                 for col in row:
                     self.assertEqual(col, 0x0)
 
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_PixelView_bpp(self):
+        factory = video.SpriteFactory(video.SOFTWARE)
+        for bpp in (8, 16, 24, 32):
+            # An odd width causes padding bytes at the end of each row.
+            sprite = factory.create_sprite(size=(5, 3), bpp=bpp)
+            with video.PixelView(sprite) as view:
+                self.assertEqual(len(view), 3)
+                self.assertEqual(len(view[0]), 5)
+                view[2][4] = 0xFFFFFFFF
+                view[1][0] = 0xFFFFFFFF
+                rcolor = video.prepare_color(0xFFFFFFFF, sprite)
+                for y in range(3):
+                    for x in range(5):
+                        if (x, y) in ((4, 2), (0, 1)):
+                            self.assertEqual(view[y][x], rcolor)
+                        else:
+                            self.assertEqual(view[y][x], 0)
+
+    def test_SurfaceLock(self):
+        factory = video.SpriteFactory(video.SOFTWARE)
+        sprite = factory.create_sprite(size=(5, 10), bpp=32)
+        self.assertRaises(TypeError, video.SurfaceLock, None)
+        self.assertRaises(TypeError, video.SurfaceLock, "Test")
+        with video.SurfaceLock(sprite) as surface:
+            self.assertEqual(surface, sprite.surface)
+            self.assertIsNotNone(surface.pixels)
+        lock = video.SurfaceLock(sprite.surface)
+        lock.release()
+        lock.release()
+
+    def test_pixelbuffer(self):
+        if sys.version_info[0] < 3:
+            self.assertRaises(UnsupportedError, video.pixelbuffer, None)
+            return
+        factory = video.SpriteFactory(video.SOFTWARE)
+        for bpp, fmt in ((8, "B"), (16, "H"), (24, "B"), (32, "I")):
+            sprite = factory.create_sprite(size=(5, 3), bpp=bpp)
+            video.fill(sprite, 0xFFFFFFFF, (4, 2, 1, 1))
+            rcolor = video.prepare_color(0xFFFFFFFF, sprite)
+            with video.pixelbuffer(sprite) as buf:
+                self.assertEqual(buf.format, fmt)
+                bytespp = bpp // 8
+                if bpp == 24:
+                    self.assertEqual(buf.shape, (3, sprite.surface.pitch))
+                    self.assertEqual(buf[2, 12], 0xFF)
+                    self.assertEqual(buf[2, 11], 0)
+                else:
+                    self.assertEqual(buf.shape,
+                                     (3, sprite.surface.pitch // bytespp))
+                    self.assertEqual(buf[2, 4], rcolor)
+                    self.assertEqual(buf[2, 3], 0)
+                    buf[0, 0] = rcolor
+            with video.PixelView(sprite) as view:
+                if bpp != 24:
+                    self.assertEqual(view[0][0], rcolor)
+
     @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
     def test_pixels2d(self):
         factory = video.SpriteFactory(video.SOFTWARE)
@@ -45,7 +104,25 @@ class VideoPixelAccessTest(unittest.TestCase):
                                               0x0000FF00, 0x000000FF))
         video.fill(sprite, 0xAABBCCDD, (2, 2, 2, 2))
         nparray = video.pixels2d(sprite)
+        rcolor = video.prepare_color(0xAABBCCDD, sprite)
+        self.assertEqual(nparray.shape, (5, 10))
+        self.assertEqual(nparray[2, 2], rcolor)
+        self.assertEqual(nparray[3, 3], rcolor)
+        self.assertEqual(nparray[1, 2], 0)
+        self.assertEqual(nparray[2, 4], 0)
 
+        for bpp, dtype in ((8, numpy.uint8), (16, numpy.uint16)):
+            sprite = factory.create_sprite(size=(5, 3), bpp=bpp)
+            video.fill(sprite, 0xFFFFFFFF, (4, 2, 1, 1))
+            with video.pixels2d(sprite) as nparray:
+                self.assertEqual(nparray.dtype, dtype)
+                self.assertEqual(nparray.shape, (5, 3))
+                self.assertEqual(nparray[4, 2],
+                                 video.prepare_color(0xFFFFFFFF, sprite))
+                self.assertEqual(nparray[3, 2], 0)
+
+        sprite = factory.create_sprite(size=(5, 3), bpp=24)
+        self.assertRaises(ValueError, video.pixels2d, sprite)
 
     @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
     def test_pixels3d(self):
@@ -55,6 +132,24 @@ class VideoPixelAccessTest(unittest.TestCase):
                                               0x0000FF00, 0x000000FF))
         video.fill(sprite, 0xAABBCCDD, (1, 2, 3, 4))
         nparray = video.pixels3d(sprite)
+        rcolor = video.prepare_color(0xAABBCCDD, sprite)
+        rbytes = [(rcolor >> (8 * i)) & 0xFF for i in range(4)]
+        if sys.byteorder == "big":
+            rbytes.reverse()
+        self.assertEqual(nparray.shape, (5, 10, 4))
+        self.assertEqual(list(nparray[1, 2]), rbytes)
+        self.assertEqual(list(nparray[0, 2]), [0, 0, 0, 0])
+
+        # 24-bit surfaces with padding bytes at the end of each row.
+        sprite = factory.create_sprite(size=(5, 3), bpp=24)
+        video.fill(sprite, 0xFFFFFFFF, (4, 2, 1, 1))
+        with video.pixels3d(sprite) as nparray:
+            self.assertEqual(nparray.shape, (5, 3, 3))
+            self.assertEqual(list(nparray[4, 2]), [0xFF, 0xFF, 0xFF])
+            self.assertEqual(list(nparray[3, 2]), [0, 0, 0])
+            nparray[0, 1] = 0xFF
+        with video.PixelView(sprite) as view:
+            self.assertEqual(view[1][0], view[2][4])
 
 
 if __name__ == '__main__':
@@ -1,4 +1,5 @@
 import sys
+import gc
 import unittest
 from ctypes import ArgumentError
 from pygame2.resources import Resources
@@ -167,6 +168,82 @@ class VideoSpriteTest(unittest.TestCase):
             self.assertRaises((AttributeError, ArgumentError, TypeError),
                               factory.from_surface, 1234)
 
+    def test_SpriteFactory_atlas(self):
+        window = video.Window("Test", size=(1, 1))
+        renderer = video.RenderContext(window)
+        atlas = video.TextureAtlas(renderer, size=(64, 64))
+        factory = video.SpriteFactory(video.TEXTURE, renderer=renderer,
+                                      atlas=atlas)
+        self.assertEqual(factory.atlas, atlas)
+        self.assertFalse("atlas" in factory.default_args)
+
+        sprites = [factory.from_color(0xFF0000, size=(10, 10))
+                   for i in range(4)]
+        imgname = RESOURCES.get_path("surfacetest.bmp")
+        sprites += factory.from_images([imgname])
+        self.assertEqual(len(atlas.textures), 1)
+        for sprite in sprites:
+            self.assertIsInstance(sprite, video.TextureSprite)
+            self.assertEqual(sprite.texture, atlas.textures[0])
+            self.assertFalse(sprite.free)
+        self.assertEqual(sprites[0].size, (10, 10))
+
+        # Empty sprites are not placed in the atlas.
+        sprite = factory.create_sprite(size=(10, 10))
+        self.assertIsNone(sprite.srcrect)
+
+    def test_TextureAtlas(self):
+        window = video.Window("Test", size=(1, 1))
+        renderer = video.RenderContext(window)
+        self.assertRaises(TypeError, video.TextureAtlas, None)
+        self.assertRaises(ValueError, video.TextureAtlas, renderer, (0, 10))
+        self.assertRaises(ValueError, video.TextureAtlas, renderer,
+                          (10, 10), padding=-1)
+
+        atlas = video.TextureAtlas(renderer, size=(32, 32))
+        self.assertEqual(atlas.textures, [])
+        sf = create_rgb_surface(15, 15, 32)
+        self.assertRaises(TypeError, atlas.add_surface, None)
+        self.assertRaises(ValueError, atlas.add_surface,
+                          create_rgb_surface(33, 10, 32))
+
+        # Surfaces filling the whole texture do not need any padding.
+        sprite = atlas.add_surface(create_rgb_surface(32, 32, 32), True)
+        self.assertEqual(sprite.size, (32, 32))
+        self.assertEqual(len(atlas.textures), 1)
+
+        sprites = atlas.add_surfaces([sf, create_rgb_surface(8, 15, 32),
+                                      sf, sf])
+        self.assertEqual(len(atlas.textures), 2)
+        areas = []
+        for sp in sprites:
+            r = sp.srcrect
+            self.assertEqual(sp.texture, atlas.textures[1])
+            self.assertTrue(r.x + r.w <= 32 and r.y + r.h <= 32)
+            for ax, ay, aw, ah in areas:
+                self.assertTrue(r.x >= ax + aw + 1 or ax >= r.x + r.w + 1 or
+                                r.y >= ay + ah + 1 or ay >= r.y + r.h + 1)
+            areas.append((r.x, r.y, r.w, r.h))
+        self.assertEqual(sprites[1].size, (8, 15))
+
+        # The surface of a SoftwareSprite is detached, before it is freed.
+        swsprite = video.SoftwareSprite(create_rgb_surface(10, 10, 32), True)
+        sprite = atlas.add_surface(swsprite, True)
+        self.assertEqual(sprite.size, (10, 10))
+        self.assertFalse(swsprite.free)
+        self.assertIsNone(swsprite.surface)
+        del swsprite
+        swsprite = video.SoftwareSprite(create_rgb_surface(33, 10, 32), True)
+        self.assertRaises(ValueError, atlas.add_surface, swsprite, True)
+        self.assertIsNone(swsprite.surface)
+        del swsprite
+
+        trenderer = video.TextureSpriteRenderer(renderer)
+        trenderer.render(sprites)
+        trenderer.render(sprites[0])
+        trenderer = video.TextureSpriteRenderer(renderer, batched=True)
+        trenderer.render(sprites)
+
     def test_SpriteRenderer(self):
         renderer = video.SpriteRenderer()
         self.assertIsInstance(renderer, video.SpriteRenderer)
@@ -192,9 +269,60 @@ class VideoSpriteTest(unittest.TestCase):
     def test_SpriteRenderer_render(self):
         pass
 
-    @unittest.skip("not implemented")
     def test_SpriteRenderer_process(self):
-        pass
+        class MRenderer(video.SpriteRenderer):
+            def render(self, sprites):
+                self.rendered.append(sprites)
+
+        renderer = MRenderer()
+        renderer.rendered = []
+        sprites = [MSprite() for x in range(10)]
+        for index, sp in enumerate(sprites):
+            sp.depth = 10 - index
+        renderer.process(None, sprites)
+        self.assertEqual(renderer.rendered[0], list(reversed(sprites)))
+
+        # Unchanged depths and sprites keep the sort order.
+        renderer.process(None, sprites)
+        self.assertIs(renderer.rendered[0], renderer.rendered[1])
+
+        sprites[0].depth = -1
+        renderer.process(None, sprites)
+        self.assertEqual(renderer.rendered[2][0], sprites[0])
+
+        sp = MSprite()
+        sp.depth = 100
+        renderer.process(None, iter(sprites[1:] + [sp]))
+        self.assertEqual(len(renderer.rendered[3]), 10)
+        self.assertEqual(renderer.rendered[3][-1], sp)
+
+        renderer.sortfunc = lambda e: -e.depth
+        renderer.process(None, sprites)
+        self.assertEqual(renderer.rendered[4][-1], sprites[0])
+        self.assertRaises(TypeError, renderer.process, None, None)
+
+        # Depth changes only affect the renderers of the changed sprites.
+        renderer1, renderer2 = MRenderer(), MRenderer()
+        renderer1.rendered, renderer2.rendered = [], []
+        sprites1 = [MSprite() for x in range(5)]
+        sprites2 = [MSprite() for x in range(5)]
+        renderer1.process(None, sprites1)
+        renderer2.process(None, sprites2)
+        sprites1[0].depth = 10
+        renderer1.process(None, sprites1)
+        renderer2.process(None, sprites2)
+        self.assertIsNot(renderer1.rendered[0], renderer1.rendered[1])
+        self.assertEqual(renderer1.rendered[1][-1], sprites1[0])
+        self.assertIs(renderer2.rendered[0], renderer2.rendered[1])
+
+        # Sprites do not keep the sort states of released renderers or of
+        # renderers, which do not sort them anymore.
+        renderer2.process(None, sprites1)
+        self.assertEqual(len(sprites1[0]._sortstates), 2)
+        self.assertEqual(len(sprites2[0]._sortstates), 0)
+        del renderer1
+        gc.collect()
+        self.assertEqual(len(sprites1[0]._sortstates), 1)
 
     def test_SoftwareSpriteRenderer(self):
         self.assertRaises(TypeError, video.SoftwareSpriteRenderer)
@@ -284,9 +412,82 @@ class VideoSpriteTest(unittest.TestCase):
 
         self.assertRaises(TypeError, renderer.process, None, None)
 
-    @unittest.skip("not implemented")
     def test_TextureSpriteRenderer(self):
-        pass
+        window = video.Window("Test", size=(1, 1))
+        renderer = video.TextureSpriteRenderer(window)
+        self.assertIsInstance(renderer, video.SpriteRenderer)
+        self.assertFalse(renderer.batched)
+        self.assertTrue(video.TextureSprite in renderer.componenttypes)
+
+        renderer = video.TextureSpriteRenderer(window, batched=True)
+        self.assertTrue(renderer.batched)
+        self.assertIsNotNone(renderer.sortfunc)
+
+        # Texture changes invalidate the batched sort order.
+        factory = video.SpriteFactory(video.TEXTURE,
+                                      renderer=renderer.sdlrenderer)
+        sprites = [factory.create_texture_sprite(renderer.sdlrenderer,
+                                                 size=(1, 1))
+                   for x in range(2)]
+        keyfunc = lambda sp: id(sp.texture)
+        self.assertEqual(renderer._sort(sprites), sorted(sprites, key=keyfunc))
+        sprites[0].texture, sprites[1].texture = \
+            sprites[1].texture, sprites[0].texture
+        self.assertEqual(renderer._sort(sprites), sorted(sprites, key=keyfunc))
+
+    @unittest.skipIf(hasattr(sys, "pypy_version_info"),
+                     "PyPy's ctypes can't do byref(value, offset)")
+    def test_SoftwareSpriteRenderer_dirtyrects(self):
+        window = video.Window("Test", size=(20, 20))
+        renderer = video.SoftwareSpriteRenderer(window)
+        self.assertFalse(renderer.dirtyrects)
+        self.assertIsNone(renderer.background)
+        self.assertRaises(TypeError, video.SoftwareSpriteRenderer, window,
+                          True, "Test")
+
+        bg = create_rgb_surface(20, 20, 32)
+        video.fill(bg, 0x0000FF)
+        renderer = video.SoftwareSpriteRenderer(window, True, bg)
+        self.assertTrue(renderer.dirtyrects)
+        self.assertEqual(renderer.background, bg)
+        # The first frame draws the background over the old contents.
+        video.fill(renderer.surface, 0xFFFFFF)
+
+        sf1 = create_rgb_surface(5, 5, 32)
+        sp1 = video.SoftwareSprite(sf1, True)
+        video.fill(sp1, 0xFF0000)
+        sf2 = create_rgb_surface(3, 3, 32)
+        sp2 = video.SoftwareSprite(sf2, True)
+        video.fill(sp2, 0x00FF00)
+        sp2.position = 10, 10
+
+        renderer.render([sp1, sp2])
+        view = video.PixelView(renderer.surface)
+        self.assertEqual(view[19][19], 0x0000FF)
+        self.check_pixels(view, 20, 20, sp1, 0xFF0000, (0x0000FF, 0x00FF00))
+        self.check_pixels(view, 20, 20, sp2, 0x00FF00, (0x0000FF, 0xFF0000))
+        del view
+
+        # Moving a sprite restores its old area from the background.
+        sp1.position = 2, 3
+        renderer.render([sp1, sp2])
+        view = video.PixelView(renderer.surface)
+        self.check_pixels(view, 20, 20, sp1, 0xFF0000, (0x0000FF, 0x00FF00))
+        self.check_pixels(view, 20, 20, sp2, 0x00FF00, (0x0000FF, 0xFF0000))
+        del view
+
+        # Removed sprites vanish.
+        renderer.render([sp2])
+        view = video.PixelView(renderer.surface)
+        self.check_pixels(view, 20, 20, sp2, 0x00FF00, (0x0000FF, ))
+        del view
+
+        renderer.invalidate(sp2)
+        renderer.invalidate()
+        renderer.render([sp2])
+        view = video.PixelView(renderer.surface)
+        self.check_pixels(view, 20, 20, sp2, 0x00FF00, (0x0000FF, ))
+        del view
 
     @unittest.skip("not implemented")
     def test_TextureSpriteRenderer_render(self):
@@ -296,6 +497,13 @@ class VideoSpriteTest(unittest.TestCase):
     def test_TextureSpriteRenderer_process(self):
         pass
 
+    def test_Sprite_depth(self):
+        sprite = MSprite()
+        self.assertEqual(sprite.depth, 0)
+        for depth in (-10, 0, 99):
+            sprite.depth = depth
+            self.assertEqual(sprite.depth, depth)
+
     def test_Sprite(self):
         sprite = MSprite()
         self.assertIsInstance(sprite, MSprite)
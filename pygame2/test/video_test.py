@@ -2,7 +2,22 @@ import os
 import sys
 import unittest
 import pygame2.sdl as sdl
+import pygame2.sdl.events as events
 import pygame2.video as video
+from pygame2.events import EventHandler
+
+
+def push_events(etype, amount):
+    for index in range(amount):
+        event = events.SDL_Event()
+        event.type = etype
+        if etype == events.SDL_MOUSEMOTION:
+            event.motion.x = index
+            event.motion.xrel = 1
+            event.motion.yrel = 2
+        else:
+            event.user.code = index
+        events.push_event(event)
 
 
 class VideoTest(unittest.TestCase):
@@ -37,10 +52,69 @@ class VideoTest(unittest.TestCase):
         self.assertNotEqual(sdl.was_init(sdl.SDL_INIT_VIDEO),
                             sdl.SDL_INIT_VIDEO)
 
-    @unittest.skip("not implemented")
     def test_get_events(self):
-        pass
-                            
+        video.init()
+        events.flush_events(events.SDL_FIRSTEVENT, events.SDL_LASTEVENT)
+        push_events(events.SDL_USEREVENT, 150)
+        evlist = video.get_events(batchsize=16)
+        userevents = [ev for ev in evlist if ev.type == events.SDL_USEREVENT]
+        self.assertEqual(len(userevents), 150)
+        # The events must not be changed by later calls.
+        push_events(events.SDL_USEREVENT + 1, 10)
+        video.get_events(batchsize=16)
+        self.assertEqual([ev.user.code for ev in userevents],
+                         list(range(150)))
+        self.assertRaises(ValueError, video.get_events, 0)
+        video.quit()
+
+    def test_EventDispatcher(self):
+        dispatcher = video.EventDispatcher()
+        self.assertEqual(dispatcher.batchsize, 64)
+        self.assertTrue(dispatcher.coalesce)
+        self.assertEqual(dispatcher.handlers, {})
+        self.assertRaises(ValueError, video.EventDispatcher, 0)
+        handler = dispatcher[events.SDL_QUIT]
+        self.assertIsInstance(handler, EventHandler)
+        self.assertEqual(handler.sender, dispatcher)
+        self.assertEqual(dispatcher[events.SDL_QUIT], handler)
+        del dispatcher[events.SDL_QUIT]
+        self.assertFalse(events.SDL_QUIT in dispatcher.handlers)
+
+        def setf(d, h):
+            d[events.SDL_QUIT] = h
+        self.assertRaises(TypeError, setf, dispatcher, None)
+        self.assertRaises(TypeError, setf, dispatcher, len)
+
+    def test_EventDispatcher_dispatch(self):
+        video.init()
+        events.flush_events(events.SDL_FIRSTEVENT, events.SDL_LASTEVENT)
+        received = []
+
+        def onuser(sender, event):
+            received.append(event.user.code)
+
+        def onmotion(sender, event):
+            received.append((event.motion.x, event.motion.xrel,
+                             event.motion.yrel))
+
+        dispatcher = video.EventDispatcher(batchsize=8)
+        dispatcher[events.SDL_USEREVENT] += onuser
+        dispatcher[events.SDL_MOUSEMOTION] += onmotion
+        push_events(events.SDL_MOUSEMOTION, 5)
+        push_events(events.SDL_USEREVENT, 20)
+        push_events(events.SDL_MOUSEMOTION, 12)
+        self.assertEqual(dispatcher.dispatch(), 22)
+        self.assertEqual(received,
+                         [(4, 5, 10)] + list(range(20)) + [(11, 12, 24)])
+
+        del received[:]
+        dispatcher.coalesce = False
+        push_events(events.SDL_MOUSEMOTION, 3)
+        self.assertEqual(dispatcher.dispatch(), 3)
+        self.assertEqual(received, [(0, 1, 2), (1, 1, 2), (2, 1, 2)])
+        self.assertEqual(dispatcher.dispatch(), 0)
+        video.quit()
+
     def test_TestEventProcessor(self):
         proc = video.TestEventProcessor()
         self.assertIsInstance(proc, video.TestEventProcessor)
@@ -5,24 +5,29 @@ graphics functionality of the underlying SDL bindings. It enables you to
 easily create windows, display on them and to manipulate the shown
 graphics.
 """
+import ctypes
 from pygame2.compat import isiterable
+from pygame2.events import EventHandler
 import pygame2.sdl as sdl
 import pygame2.sdl.events as events
 import pygame2.sdl.timer as timer
 from pygame2.video.sprite import *
 from pygame2.video.window import Window
 from pygame2.video.draw import *
-from pygame2.video.font import BitmapFont
+from pygame2.video.font import BitmapFont, TTFFont
 from pygame2.video.gui import *
 from pygame2.video.image import *
 from pygame2.video.pixelaccess import *
 
 
-__all__ = ["TestEventProcessor", "init", "quit", "Window",
+__all__ = ["TestEventProcessor", "EventDispatcher", "init", "quit", "Window",
            "Sprite", "SpriteRenderer", "SoftwareSprite",
            "SoftwareSpriteRenderer", "TextureSprite", "TextureSpriteRenderer",
+           "TextureAtlas",
            "RenderContext", "SOFTWARE", "TEXTURE", "prepare_color", "fill",
-           "line", "PixelView", "pixels2d", "pixels3d", "BitmapFont",
+           "line", "lines", "polygon", "circle", "aaline", "PixelView",
+           "SurfaceLock", "pixels2d", "pixels3d", "pixelbuffer", "BitmapFont",
+           "TTFFont",
            "UIFactory", "UIProcessor", "BUTTON", "CHECKBUTTON", "TEXTENTRY",
            "RELEASED", "HOVERED", "PRESSED",
            "get_image_formats", "load_image"
@@ -50,23 +55,151 @@ def quit():
         sdl.quit()
 
 
-def get_events():
-    """Gets all SDL events that are currently on the event queue."""
+class _EventBuffer(object):
+    """A preallocated SDL_Event array, which is reused for fetching
+    events from the event queue."""
+    def __init__(self, batchsize):
+        if batchsize < 1:
+            raise ValueError("batchsize must be greater than 0")
+        self.batchsize = batchsize
+        self.events = (events.SDL_Event * batchsize)()
+
+    def fetch(self):
+        """Moves up to batchsize events from the event queue into the
+        buffer and returns the amount of fetched events."""
+        return events.peep_events_into(self.events, events.SDL_GETEVENT,
+                                       events.SDL_FIRSTEVENT,
+                                       events.SDL_LASTEVENT)
+
+
+_EVENTBUFFERS = {}
+
+
+def get_events(batchsize=64):
+    """Gets all SDL events that are currently on the event queue.
+
+    The events are fetched in batches of batchsize events into a buffer,
+    which is reused on every call.
+    """
+    buf = _EVENTBUFFERS.get(batchsize, None)
+    if buf is None:
+        buf = _EVENTBUFFERS[batchsize] = _EventBuffer(batchsize)
     events.pump_events()
 
     evlist = []
     eappend = evlist.append
-    peep_events = events.peep_events
-    op = events.SDL_GETEVENT
-    first = events.SDL_FIRSTEVENT
-    last = events.SDL_LASTEVENT
-    ret, ev = peep_events(None, 10, op, first, last)
+    copy = events.SDL_Event.from_buffer_copy
+    evbuf = buf.events
+    ret = buf.fetch()
     while ret > 0:
-        evlist += list(ev)
-        ret, ev = peep_events(None, 10, op, first, last)
+        for index in range(ret):
+            eappend(copy(evbuf[index]))
+        if ret < batchsize:
+            break
+        ret = buf.fetch()
     return evlist
 
 
+class EventDispatcher(object):
+    """Routes SDL events to the handlers registered for their type."""
+    def __init__(self, batchsize=64, coalesce=True):
+        """Creates a new EventDispatcher.
+
+        The events are fetched in batches of batchsize events into a
+        buffer, which is reused on every dispatch() call. If coalesce is
+        True, consecutive SDL_MOUSEMOTION events are merged into the
+        last one of them, which carries the summed up relative motion.
+        """
+        self._buffer = _EventBuffer(batchsize)
+        self._motion = events.SDL_Event()
+        self.coalesce = coalesce
+        self.handlers = {}
+
+    @property
+    def batchsize(self):
+        """The amount of events to fetch at once."""
+        return self._buffer.batchsize
+
+    def __getitem__(self, etype):
+        """Gets the EventHandler for the passed event type."""
+        handler = self.handlers.get(etype, None)
+        if handler is None:
+            handler = self.handlers[etype] = EventHandler(self)
+        return handler
+
+    def __setitem__(self, etype, handler):
+        """Sets the EventHandler for the passed event type."""
+        if not isinstance(handler, EventHandler):
+            raise TypeError("handler must be an EventHandler")
+        self.handlers[etype] = handler
+
+    def __delitem__(self, etype):
+        """Removes the EventHandler for the passed event type."""
+        del self.handlers[etype]
+
+    def __repr__(self):
+        return "EventDispatcher(batchsize=%d, coalesce=%s)" % \
+            (self.batchsize, self.coalesce)
+
+    def dispatch(self):
+        """Passes all events, which are currently on the event queue, to
+        the EventHandler of their type and returns the amount of
+        dispatched events.
+
+        The events passed to the callbacks are only valid during the
+        callback invocation and must be copied, if they are needed
+        afterwards.
+        """
+        events.pump_events()
+        buf = self._buffer
+        evbuf = buf.events
+        batchsize = buf.batchsize
+        handlers = self.handlers
+        coalesce = self.coalesce
+        mousemotion = events.SDL_MOUSEMOTION
+        motion = self._motion
+        motionaddr = ctypes.addressof(motion)
+        memmove = ctypes.memmove
+        evsize = ctypes.sizeof(events.SDL_Event)
+        pending = False
+        count = 0
+        ret = buf.fetch()
+        while ret > 0:
+            for index in range(ret):
+                event = evbuf[index]
+                etype = event.type
+                if coalesce and etype == mousemotion:
+                    if pending:
+                        xrel = motion.motion.xrel + event.motion.xrel
+                        yrel = motion.motion.yrel + event.motion.yrel
+                        memmove(motionaddr, ctypes.addressof(event), evsize)
+                        motion.motion.xrel = xrel
+                        motion.motion.yrel = yrel
+                    else:
+                        memmove(motionaddr, ctypes.addressof(event), evsize)
+                        pending = True
+                    continue
+                if pending:
+                    pending = False
+                    count += 1
+                    handler = handlers.get(mousemotion, None)
+                    if handler is not None:
+                        handler(motion)
+                count += 1
+                handler = handlers.get(etype, None)
+                if handler is not None:
+                    handler(event)
+            if ret < batchsize:
+                break
+            ret = buf.fetch()
+        if pending:
+            count += 1
+            handler = handlers.get(mousemotion, None)
+            if handler is not None:
+                handler(motion)
+        return count
+
+
 class TestEventProcessor(object):
     """A simple event processor for testing purposes."""
     def run(self, window):
@@ -1,14 +1,22 @@
 """Drawing routines for software surfaces."""
+import sys
+import math
 import ctypes
-from pygame2.compat import isiterable, UnsupportedError
+from pygame2.compat import isiterable
 from pygame2.color import convert_to_color
 import pygame2.sdl.surface as sdlsurface
 import pygame2.sdl.pixels as sdlpixels
 import pygame2.sdl.rect as rect
-from pygame2.algorithms import clipline
 from pygame2.video.sprite import SoftwareSprite
 
-__all__ = ["prepare_color", "fill", "line"]
+_HASNUMPY = True
+try:
+    import numpy
+except ImportError:
+    _HASNUMPY = False
+
+__all__ = ["prepare_color", "fill", "line", "lines", "polygon", "circle",
+           "aaline"]
 
 
 def _get_target_surface(target):
@@ -76,12 +84,530 @@ def fill(target, color, area=None):
         sdlsurface.fill_rects(rtarget, varea, color)
 
 
+_BIGENDIAN = sys.byteorder == "big"
+
+_CTYPES = {1: ctypes.c_ubyte,
+           2: ctypes.c_ushort,
+           4: ctypes.c_uint
+           }
+
+
+def _get_clip(surface):
+    """Gets the clipping area of the surface as (left, top, right,
+    bottom) tuple. right and bottom are not part of the area."""
+    clip = surface.clip_rect
+    return clip.x, clip.y, clip.x + clip.w, clip.y + clip.h
+
+
+def _lock(surface):
+    """Locks the surface, if necessary, and returns, if it was locked."""
+    if sdlsurface.SDL_MUSTLOCK(surface):
+        sdlsurface.lock_surface(surface)
+        return True
+    return False
+
+
+def _fill_spans(surface, color, spans):
+    """Fills a set of rectangular areas on the surface with a single
+    SDL_FillRects() call.
+
+    spans is a flat sequence or numpy array of x, y, w, h values.
+    """
+    count = len(spans) // 4
+    if count == 0:
+        return
+    rectptr = ctypes.POINTER(rect.SDL_Rect * count)
+    if _HASNUMPY and isinstance(spans, numpy.ndarray):
+        values = numpy.ascontiguousarray(spans, dtype=numpy.intc)
+        rects = values.ctypes.data_as(rectptr).contents
+    else:
+        values = (ctypes.c_int * (count * 4))(*spans)
+        rects = ctypes.cast(values, rectptr).contents
+    locked = _lock(surface)
+    try:
+        sdlsurface.fill_rects(surface, rects, color)
+    finally:
+        if locked:
+            sdlsurface.unlock_surface(surface)
+
+
+def _line_spans(lines, width, clip):
+    """Splits a set of lines into the horizontal runs of pixels of
+    flat lines and vertical runs of steep lines.
+
+    The pixels of a line are placed at the major axis positions i =
+    0..n with the minor axis offset round(i * dminor / n). The runs are
+    widened by width along the minor axis. Runs and parts of them,
+    which are outside of the clip area, are skipped on both axes.
+    """
+    left, top, right, bottom = clip
+    half = width // 2
+    spans = []
+    for idx in range(0, len(lines), 4):
+        x1, y1, x2, y2 = [int(v) for v in lines[idx:idx + 4]]
+        dx, dy = x2 - x1, y2 - y1
+        xmajor = abs(dx) >= abs(dy)
+        if xmajor:
+            a1, b1, da, db = x1, y1, dx, dy
+            amin, amax, bmin, bmax = left, right - 1, top, bottom - 1
+        else:
+            a1, b1, da, db = y1, x1, dy, dx
+            amin, amax, bmin, bmax = top, bottom - 1, left, right - 1
+        n, adm = abs(da), abs(db)
+        # Visible runs, k, on the minor axis...
+        blo, bhi = bmin - width + 1 + half, bmax + half
+        if db < 0:
+            sb = -1
+            klo, khi = max(b1 - bhi, 0), min(b1 - blo, adm)
+        else:
+            sb = 1
+            klo, khi = max(blo - b1, 0), min(bhi - b1, adm)
+        # ... and pixels, i, on the major axis.
+        if da < 0:
+            sa = -1
+            ilo, ihi = max(a1 - amax, 0), min(a1 - amin, n)
+        else:
+            sa = 1
+            ilo, ihi = max(amin - a1, 0), min(amax - a1, n)
+        if ilo > ihi:
+            continue
+        for k in range(klo, khi + 1):
+            if adm == 0:
+                istart, iend = ilo, ihi
+            else:
+                istart = max(ilo, -((n - 2 * n * k) // (2 * adm)))
+                iend = min(ihi, -((n - 2 * n * (k + 1)) // (2 * adm)) - 1)
+                if istart > iend:
+                    continue
+            if sa > 0:
+                a = a1 + istart
+            else:
+                a = a1 - iend
+            # Clip the run on the minor axis.
+            b = b1 + sb * k - half
+            bstart = max(b, bmin)
+            bwidth = min(b + width - 1, bmax) - bstart + 1
+            length = iend - istart + 1
+            if xmajor:
+                spans.extend((a, bstart, length, bwidth))
+            else:
+                spans.extend((bstart, a, bwidth, length))
+    return spans
+
+
+def _line_spans_numpy(lines, width, clip):
+    """numpy implementation of _line_spans(), which calculates the runs
+    of all lines at once."""
+    left, top, right, bottom = clip
+    half = width // 2
+    where = numpy.where
+    segs = numpy.asarray(lines, dtype=numpy.int64).reshape(-1, 4)
+    x1, y1, x2, y2 = segs[:, 0], segs[:, 1], segs[:, 2], segs[:, 3]
+    dx, dy = x2 - x1, y2 - y1
+    xmajor = numpy.abs(dx) >= numpy.abs(dy)
+    a1, b1 = where(xmajor, x1, y1), where(xmajor, y1, x1)
+    da, db = where(xmajor, dx, dy), where(xmajor, dy, dx)
+    n, adm = numpy.abs(da), numpy.abs(db)
+    amin = where(xmajor, left, top)
+    amax = where(xmajor, right, bottom) - 1
+    bmin = where(xmajor, top, left)
+    bmax = where(xmajor, bottom, right) - 1
+
+    blo, bhi = bmin - width + 1 + half, bmax + half
+    klo = numpy.maximum(where(db < 0, b1 - bhi, blo - b1), 0)
+    khi = numpy.minimum(where(db < 0, b1 - blo, bhi - b1), adm)
+    ilo = numpy.maximum(where(da < 0, a1 - amax, amin - a1), 0)
+    ihi = numpy.minimum(where(da < 0, a1 - amin, amax - a1), n)
+
+    counts = where(ilo <= ihi, numpy.maximum(khi - klo + 1, 0), 0)
+    total = counts.sum()
+    if total == 0:
+        return numpy.zeros(0, dtype=numpy.intc)
+    seg = numpy.repeat(numpy.arange(len(segs)), counts)
+    k = klo[seg] + numpy.arange(total) - (numpy.cumsum(counts) - counts)[seg]
+    n, adm = n[seg], adm[seg]
+    steps = 2 * numpy.maximum(adm, 1)
+    istart = numpy.maximum(ilo[seg], -((n - 2 * n * k) // steps))
+    iend = numpy.minimum(ihi[seg], -((n - 2 * n * (k + 1)) // steps) - 1)
+    flat = adm == 0
+    istart = where(flat, ilo[seg], istart)
+    iend = where(flat, ihi[seg], iend)
+
+    keep = istart <= iend
+    seg, k, istart, iend = seg[keep], k[keep], istart[keep], iend[keep]
+    a = where(da[seg] < 0, a1[seg] - iend, a1[seg] + istart)
+    b = b1[seg] + where(db[seg] < 0, -k, k) - half
+    bstart = numpy.maximum(b, bmin[seg])
+    bwidth = numpy.minimum(b + width - 1, bmax[seg]) - bstart + 1
+    length = iend - istart + 1
+    xmajor = xmajor[seg]
+    spans = numpy.empty((len(seg), 4), dtype=numpy.intc)
+    spans[:, 0] = where(xmajor, a, bstart)
+    spans[:, 1] = where(xmajor, bstart, a)
+    spans[:, 2] = where(xmajor, length, bwidth)
+    spans[:, 3] = where(xmajor, bwidth, length)
+    return spans.ravel()
+
+
+def _polygon_spans(points, clip):
+    """Calculates the horizontal spans of the filled polygon area.
+
+    A pixel is part of the area, if its center lies within the polygon.
+    The pixel centers are located at the integer coordinates.
+    """
+    left, top, right, bottom = clip
+    xs, ys = points[0::2], points[1::2]
+    edges = []
+    for idx in range(len(xs)):
+        xa, ya, xb, yb = xs[idx - 1], ys[idx - 1], xs[idx], ys[idx]
+        if ya == yb:
+            continue
+        if ya > yb:
+            xa, ya, xb, yb = xb, yb, xa, ya
+        edges.append((ya, yb, xa, (xb - xa) / float(yb - ya)))
+    spans = []
+    for y in range(max(int(min(ys)), top), min(int(max(ys)), bottom - 1) + 1):
+        xcross = sorted([xa + (y - ya) * slope
+                         for ya, yb, xa, slope in edges if ya <= y < yb])
+        for idx in range(0, len(xcross) - 1, 2):
+            xl = max(int(math.ceil(xcross[idx])), left)
+            xr = min(int(math.floor(xcross[idx + 1])), right - 1)
+            if xl <= xr:
+                spans.extend((xl, y, xr - xl + 1, 1))
+    return spans
+
+
+def _polygon_spans_numpy(points, clip):
+    """numpy implementation of _polygon_spans(), which calculates the
+    spans of all rows at once."""
+    left, top, right, bottom = clip
+    pts = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+    xa, ya = pts[:, 0], pts[:, 1]
+    xb, yb = numpy.roll(xa, 1), numpy.roll(ya, 1)
+    keep = ya != yb
+    xa, ya, xb, yb = xa[keep], ya[keep], xb[keep], yb[keep]
+    ymin, ymax = numpy.minimum(ya, yb), numpy.maximum(ya, yb)
+    xstart = numpy.where(ya < yb, xa, xb)
+    slope = (xb - xa) / (yb - ya)
+
+    rows = numpy.arange(max(int(pts[:, 1].min()), top),
+                        min(int(pts[:, 1].max()), bottom - 1) + 1)
+    if len(rows) == 0 or len(slope) == 0:
+        return numpy.zeros(0, dtype=numpy.intc)
+    ycol = rows[:, None]
+    inside = (ycol >= ymin) & (ycol < ymax)
+    xcross = numpy.where(inside, xstart + (ycol - ymin) * slope, numpy.inf)
+    xcross.sort(axis=1)
+    pairs = len(slope) // 2
+    xl = numpy.ceil(xcross[:, 0:2 * pairs:2])
+    xr = numpy.floor(xcross[:, 1:2 * pairs:2])
+    valid = numpy.isfinite(xr)
+    xl = numpy.maximum(xl[valid], left).astype(numpy.intc)
+    xr = numpy.minimum(xr[valid], right - 1).astype(numpy.intc)
+    yy = numpy.broadcast_to(ycol, valid.shape)[valid]
+    valid = xl <= xr
+    spans = numpy.empty((valid.sum(), 4), dtype=numpy.intc)
+    spans[:, 0] = xl[valid]
+    spans[:, 1] = yy[valid]
+    spans[:, 2] = (xr - xl + 1)[valid]
+    spans[:, 3] = 1
+    return spans.ravel()
+
+
+def _circle_spans(circles, width, filled, clip):
+    """Calculates the horizontal spans of a set of circles.
+
+    Unless filled is True, only a ring of width pixels is created for
+    each circle.
+    """
+    left, top, right, bottom = clip
+    spans = []
+    for idx in range(0, len(circles), 3):
+        cx, cy, radius = [int(v) for v in circles[idx:idx + 3]]
+        if radius < 0:
+            raise ValueError("radius must not be negative")
+        inner = -1
+        if not filled:
+            inner = radius - width
+        for dy in range(max(-radius, top - cy),
+                        min(radius, bottom - 1 - cy) + 1):
+            xo = int(math.sqrt(radius * radius - dy * dy) + 0.5)
+            if abs(dy) > inner:
+                spans.extend((cx - xo, cy + dy, 2 * xo + 1, 1))
+                continue
+            xi = min(int(math.sqrt(inner * inner - dy * dy) + 0.5), xo - 1)
+            spans.extend((cx - xo, cy + dy, xo - xi, 1,
+                          cx + xi + 1, cy + dy, xo - xi, 1))
+    return spans
+
+
+def _circle_spans_numpy(circles, width, filled, clip):
+    """numpy implementation of _circle_spans(), which calculates the
+    spans of all circles at once."""
+    left, top, right, bottom = clip
+    circs = numpy.asarray(circles, dtype=numpy.int64).reshape(-1, 3)
+    cx, cy, radius = circs[:, 0], circs[:, 1], circs[:, 2]
+    if (radius < 0).any():
+        raise ValueError("radius must not be negative")
+    ylo = numpy.maximum(-radius, top - cy)
+    counts = numpy.maximum(numpy.minimum(radius, bottom - 1 - cy) - ylo + 1,
+                           0)
+    total = counts.sum()
+    if total == 0:
+        return numpy.zeros(0, dtype=numpy.intc)
+    seg = numpy.repeat(numpy.arange(len(circs)), counts)
+    dy = ylo[seg] + numpy.arange(total) - (numpy.cumsum(counts) - counts)[seg]
+    cx, y, radius = cx[seg], cy[seg] + dy, radius[seg]
+    xo = numpy.floor(numpy.sqrt(radius * radius - dy * dy) + 0.5)
+    xo = xo.astype(numpy.int64)
+    if filled:
+        inner = numpy.zeros_like(radius) - 1
+    else:
+        inner = radius - width
+    ring = numpy.abs(dy) <= inner
+    xi = numpy.sqrt(numpy.maximum(inner * inner - dy * dy, 0))
+    xi = numpy.minimum(numpy.floor(xi + 0.5).astype(numpy.int64), xo - 1)
+
+    full = ~ring
+    nfull, nring = full.sum(), ring.sum()
+    spans = numpy.empty((nfull + 2 * nring, 4), dtype=numpy.intc)
+    spans[:nfull, 0] = (cx - xo)[full]
+    spans[:nfull, 1] = y[full]
+    spans[:nfull, 2] = (2 * xo + 1)[full]
+    lring = slice(nfull, nfull + nring)
+    rring = slice(nfull + nring, None)
+    spans[lring, 0] = (cx - xo)[ring]
+    spans[rring, 0] = (cx + xi + 1)[ring]
+    spans[lring, 1] = spans[rring, 1] = y[ring]
+    spans[lring, 2] = spans[rring, 2] = (xo - xi)[ring]
+    spans[:, 3] = 1
+    return spans.ravel()
+
+
+def _aaline_pixels(lines, clip):
+    """Calculates the pixels and their coverage for a set of
+    anti-aliased lines.
+
+    Each pixel of the line on the major axis is split up into the two
+    nearest pixels on the minor axis, which are weighted by their
+    distance to the exact line position.
+    """
+    left, top, right, bottom = clip
+    xs, ys, covs = [], [], []
+    for idx in range(0, len(lines), 4):
+        x1, y1, x2, y2 = [int(v) for v in lines[idx:idx + 4]]
+        dx, dy = x2 - x1, y2 - y1
+        xmajor = abs(dx) >= abs(dy)
+        if xmajor:
+            a1, b1, da, db, amin, amax = x1, y1, dx, dy, left, right - 1
+        else:
+            a1, b1, da, db, amin, amax = y1, x1, dy, dx, top, bottom - 1
+        n = abs(da)
+        sa = -1 if da < 0 else 1
+        if da < 0:
+            ilo, ihi = max(a1 - amax, 0), min(a1 - amin, n)
+        else:
+            ilo, ihi = max(amin - a1, 0), min(amax - a1, n)
+        step = 0
+        if n != 0:
+            step = db / float(n)
+        for i in range(ilo, ihi + 1):
+            pos = b1 + i * step
+            b = int(math.floor(pos))
+            frac = pos - b
+            a = a1 + sa * i
+            if xmajor:
+                xs.extend((a, a))
+                ys.extend((b, b + 1))
+            else:
+                xs.extend((b, b + 1))
+                ys.extend((a, a))
+            covs.extend((1 - frac, frac))
+    return xs, ys, covs
+
+
+def _aaline_pixels_numpy(lines, clip):
+    """numpy implementation of _aaline_pixels(), which calculates the
+    pixels of all lines at once."""
+    left, top, right, bottom = clip
+    where = numpy.where
+    segs = numpy.asarray(lines, dtype=numpy.int64).reshape(-1, 4)
+    x1, y1, x2, y2 = segs[:, 0], segs[:, 1], segs[:, 2], segs[:, 3]
+    dx, dy = x2 - x1, y2 - y1
+    xmajor = numpy.abs(dx) >= numpy.abs(dy)
+    a1, b1 = where(xmajor, x1, y1), where(xmajor, y1, x1)
+    da, db = where(xmajor, dx, dy), where(xmajor, dy, dx)
+    n = numpy.abs(da)
+    amin = where(xmajor, left, top)
+    amax = where(xmajor, right, bottom) - 1
+    ilo = numpy.maximum(where(da < 0, a1 - amax, amin - a1), 0)
+    ihi = numpy.minimum(where(da < 0, a1 - amin, amax - a1), n)
+
+    counts = numpy.maximum(ihi - ilo + 1, 0)
+    total = counts.sum()
+    seg = numpy.repeat(numpy.arange(len(segs)), counts)
+    i = ilo[seg] + numpy.arange(total) - (numpy.cumsum(counts) - counts)[seg]
+    pos = b1[seg] + i * (db[seg] / numpy.maximum(n[seg], 1).astype(float))
+    b = numpy.floor(pos)
+    frac = pos - b
+    b = b.astype(numpy.int64)
+    a = a1[seg] + where(da[seg] < 0, -i, i)
+    xmajor = xmajor[seg]
+    # Keep the pixel pairs next to each other, so that pixels, which
+    # are hit multiple times, are blended in the order of the lines.
+    xs = numpy.column_stack((where(xmajor, a, b), where(xmajor, a, b + 1)))
+    ys = numpy.column_stack((where(xmajor, b, a), where(xmajor, b + 1, a)))
+    covs = numpy.column_stack((1 - frac, frac))
+    return xs.ravel(), ys.ravel(), covs.ravel()
+
+
+def _get_channels(pformat):
+    """Gets the (mask, shift) pairs of the color channels of the pixel
+    format."""
+    channels = ((pformat.Rmask, pformat.Rshift),
+                (pformat.Gmask, pformat.Gshift),
+                (pformat.Bmask, pformat.Bshift),
+                (pformat.Amask, pformat.Ashift))
+    return [(mask, shift) for mask, shift in channels if mask != 0]
+
+
+def _blend_pixels(surface, color, xs, ys, covs):
+    """Blends the color onto the pixels of the surface, weighted by the
+    passed coverage values.
+
+    Surfaces without color masks, such as palettized ones, receive the
+    color on all pixels with a coverage of at least 0.5.
+    """
+    left, top, right, bottom = _get_clip(surface)
+    bpp = surface.format.BytesPerPixel
+    channels = _get_channels(surface.format)
+    pitch = surface.pitch
+    locked = _lock(surface)
+    try:
+        if bpp == 3:
+            pxbuf = ctypes.cast(surface.pixels, ctypes.POINTER(ctypes.c_ubyte))
+        else:
+            pxbuf = ctypes.cast(surface.pixels,
+                                ctypes.POINTER(_CTYPES[bpp]))
+            rowlen = pitch // bpp
+        for x, y, cov in zip(xs, ys, covs):
+            if cov <= 0 or x < left or x >= right or y < top or y >= bottom:
+                continue
+            if bpp == 3:
+                offset = y * pitch + x * 3
+                b0, b1, b2 = pxbuf[offset:offset + 3]
+                if _BIGENDIAN:
+                    b0, b2 = b2, b0
+                old = b0 | (b1 << 8) | (b2 << 16)
+            else:
+                offset = y * rowlen + x
+                old = pxbuf[offset]
+            if channels:
+                value = 0
+                for mask, shift in channels:
+                    cold = (old & mask) >> shift
+                    cnew = (color & mask) >> shift
+                    value |= (int(cold + (cnew - cold) * cov + 0.5) <<
+                              shift) & mask
+            elif cov >= 0.5:
+                value = color
+            else:
+                continue
+            if bpp == 3:
+                b0, b1, b2 = value & 0xFF, (value >> 8) & 0xFF, value >> 16
+                if _BIGENDIAN:
+                    b0, b2 = b2, b0
+                pxbuf[offset] = b0
+                pxbuf[offset + 1] = b1
+                pxbuf[offset + 2] = b2
+            else:
+                pxbuf[offset] = value
+    finally:
+        if locked:
+            sdlsurface.unlock_surface(surface)
+
+
+def _blend_pixels_numpy(surface, color, xs, ys, covs):
+    """numpy implementation of _blend_pixels(), which blends all pixels
+    at once."""
+    left, top, right, bottom = _get_clip(surface)
+    bpp = surface.format.BytesPerPixel
+    channels = _get_channels(surface.format)
+    pitch, height = surface.pitch, surface.size[1]
+    keep = (covs > 0) & (xs >= left) & (xs < right) & \
+        (ys >= top) & (ys < bottom)
+    if not channels:
+        keep &= covs >= 0.5
+    xs, ys, covs = xs[keep], ys[keep], covs[keep]
+    if len(xs) == 0:
+        return
+    # Pixels, which are hit multiple times, have to be blended once per
+    # hit, so each round only blends the next hit of the pixels.
+    index = ys * pitch + xs
+    order = numpy.argsort(index, kind="mergesort")
+    sindex = index[order]
+    first = numpy.concatenate(([True], sindex[1:] != sindex[:-1]))
+    positions = numpy.arange(len(order))
+    groupstart = numpy.maximum.accumulate(numpy.where(first, positions, 0))
+    hits = numpy.empty(len(order), dtype=numpy.int64)
+    hits[order] = positions - groupstart
+
+    locked = _lock(surface)
+    try:
+        pxbuf = ctypes.cast(surface.pixels,
+                            ctypes.POINTER(ctypes.c_ubyte * (height * pitch)))
+        if bpp == 3:
+            pixels = numpy.frombuffer(pxbuf.contents, numpy.uint8)
+            pixels = pixels.reshape(height, pitch)
+        else:
+            dtype = {1: numpy.uint8, 2: numpy.uint16, 4: numpy.uint32}[bpp]
+            pixels = numpy.frombuffer(pxbuf.contents, dtype)
+            pixels = pixels.reshape(height, pitch // bpp)
+        for hit in range(hits.max() + 1):
+            sel = hits == hit
+            _blend_round(pixels, bpp, color, channels, xs[sel], ys[sel],
+                         covs[sel])
+    finally:
+        if locked:
+            sdlsurface.unlock_surface(surface)
+
+
+def _blend_round(pixels, bpp, color, channels, xs, ys, covs):
+    """Blends the color onto a set of distinct pixels of the numpy pixel
+    array."""
+    if bpp == 3:
+        order = (2, 1, 0) if _BIGENDIAN else (0, 1, 2)
+        old = numpy.zeros(len(xs), dtype=numpy.int64)
+        for shift, byte in enumerate(order):
+            old |= pixels[ys, xs * 3 + byte].astype(numpy.int64) << \
+                (8 * shift)
+    else:
+        old = pixels[ys, xs].astype(numpy.int64)
+    if channels:
+        value = numpy.zeros(len(xs), dtype=numpy.int64)
+        for mask, shift in channels:
+            cold = (old & mask) >> shift
+            cnew = (color & mask) >> shift
+            blended = numpy.floor(cold + (cnew - cold) * covs + 0.5)
+            value |= (blended.astype(numpy.int64) << shift) & mask
+    else:
+        value = numpy.zeros(len(xs), dtype=numpy.int64) + color
+    if bpp == 3:
+        for shift, byte in enumerate(order):
+            pixels[ys, xs * 3 + byte] = (value >> (8 * shift)) & 0xFF
+    else:
+        pixels[ys, xs] = value
+
+
 def line(target, color, line, width=1):
     """Draws one or multiple lines on the passed target.
 
     line can be a sequence of four integers for a single line in the
     form (x1, y1, x2, y2) or a sequence of a multiple of 4 for drawing
     multiple lines at once, e.g. (x1, y1, x2, y2, x3, y3, x4, y4, ...).
+
+    Lines wider than one pixel are widened vertically, if they are more
+    horizontal than vertical, and horizontally otherwise.
     """
     if width < 1:
         raise ValueError("width must be greater than 0")
@@ -91,69 +617,94 @@ def line(target, color, line, width=1):
     # line: (x1, y1, x2, y2) OR (x1, y1, x2, y2, ...)
     if (len(line) % 4) != 0:
         raise ValueError("line does not contain a valid set of points")
-    pcount = len(line)
-    SDLRect = rect.SDL_Rect
-    fillrect = sdlsurface.fill_rect
+    clip = _get_clip(rtarget)
+    if _HASNUMPY:
+        spans = _line_spans_numpy(line, width, clip)
+    else:
+        spans = _line_spans(line, width, clip)
+    _fill_spans(rtarget, color, spans)
 
-    pitch = rtarget.pitch
-    bpp = rtarget.format.BytesPerPixel
-    clip_rect = rtarget.clip_rect
-    left, right = clip_rect.x, clip_rect.x + clip_rect.w
-    top, bottom = clip_rect.y, clip_rect.y + clip_rect.h
 
-    if bpp == 3:
-        raise UnsupportedError("24bpp are currently not supported")
-    if bpp == 2:
-        pxbuf = ctypes.cast(rtarget.pixels, ctypes.POINTER(ctypes.c_uint16))
-    elif bpp == 4:
-        pxbuf = ctypes.cast(rtarget.pixels, ctypes.POINTER(ctypes.c_uint32))
+def lines(target, color, points, closed=False, width=1):
+    """Draws connected lines on the passed target.
+
+    points is a sequence of the line points in the form (x1, y1, x2,
+    y2, x3, y3, ...). If closed is True, the last point will be
+    connected with the first one.
+    """
+    if len(points) % 2 != 0 or len(points) < 4:
+        raise ValueError("points does not contain a valid set of points")
+    segments = []
+    for idx in range(0, len(points) - 2, 2):
+        segments.extend(points[idx:idx + 4])
+    if closed:
+        segments.extend((points[-2], points[-1], points[0], points[1]))
+    line(target, color, segments, width)
+
+
+def polygon(target, color, points, filled=False, width=1):
+    """Draws a polygon on the passed target.
+
+    points is a sequence of the polygon's corners in the form (x1, y1,
+    x2, y2, x3, y3, ...). If filled is True, the polygon area will be
+    filled, otherwise only its outline with the passed width will be
+    drawn. Self-intersecting polygons are filled using the even-odd
+    rule.
+    """
+    if len(points) % 2 != 0 or len(points) < 6:
+        raise ValueError("points does not contain a valid set of points")
+    if not filled:
+        lines(target, color, points, True, width)
+        return
+    rtarget = _get_target_surface(target)
+    clip = _get_clip(rtarget)
+    if _HASNUMPY:
+        spans = _polygon_spans_numpy(points, clip)
     else:
-        pxbuf = rtarget.pixels  # byte-wise access.
-
-    for idx in range(0, pcount, 4):
-        x1, y1, x2, y2 = line[idx:idx + 4]
-        if x1 == x2:
-            # Vertical line
-            yh = abs(y2 - y1)
-            varea = SDLRect(x1 - width // 2, y1, width, yh)
-            fillrect(rtarget, varea, color)
-            continue
-        if y1 == y2:
-            # Horizontal line
-            xw = abs(x2 - x1)
-            varea = SDLRect(x1, y1 - width // 2, xw, width)
-            fillrect(rtarget, varea, color)
-            continue
-        if width != 1:
-            raise UnsupportedError
-        if width == 1:
-            # Bresenham
-            x1, y1, x2, y2 = clipline(left, top, right, bottom, x1, y1, x2, y2)
-            if x1 is None:
-                # not to be drawn
-                continue
-            dx = abs(x2 - x1)
-            dy = abs(y2 - y1)
-            err = dx - dy
-            sx, sy = 1, 1
-            if x1 > x2:
-                sx = -sx
-            if y1 > y2:
-                sy = -sy
-            mx = sx
-            my = sy * pitch / bpp
-
-            pxoff = y1 * pitch / bpp + x1
-            while True:
-                pxbuf[pxoff] = color
-                if x1 == x2 and y1 == y2:
-                    break
-                de = 2 * err
-                if de > - dy:
-                    err -= dy
-                    x1 += sx
-                    pxoff += mx
-                if de < dx:
-                    err += dx
-                    y1 += sy
-                    pxoff += my
+        spans = _polygon_spans(points, clip)
+    _fill_spans(rtarget, prepare_color(color, target), spans)
+    # The bottom edges are not part of the spans
+    lines(target, color, points, True)
+
+
+def circle(target, color, circle, filled=False, width=1):
+    """Draws one or multiple circles on the passed target.
+
+    circle can be a sequence of three integers for a single circle in
+    the form (x, y, radius) or a sequence of a multiple of 3 for drawing
+    multiple circles at once, e.g. (x1, y1, radius1, x2, y2, radius2,
+    ...). If filled is True, the circle areas will be filled, otherwise
+    only their outlines with the passed width will be drawn.
+    """
+    if width < 1:
+        raise ValueError("width must be greater than 0")
+    if (len(circle) % 3) != 0:
+        raise ValueError("circle does not contain a valid set of circles")
+    color = prepare_color(color, target)
+    rtarget = _get_target_surface(target)
+    clip = _get_clip(rtarget)
+    if _HASNUMPY:
+        spans = _circle_spans_numpy(circle, width, filled, clip)
+    else:
+        spans = _circle_spans(circle, width, filled, clip)
+    _fill_spans(rtarget, color, spans)
+
+
+def aaline(target, color, line):
+    """Draws one or multiple anti-aliased lines on the passed target.
+
+    line can be a sequence of four integers for a single line in the
+    form (x1, y1, x2, y2) or a sequence of a multiple of 4 for drawing
+    multiple lines at once, e.g. (x1, y1, x2, y2, x3, y3, x4, y4, ...).
+    """
+    color = prepare_color(color, target)
+    rtarget = _get_target_surface(target)
+    if (len(line) % 4) != 0:
+        raise ValueError("line does not contain a valid set of points")
+    clip = _get_clip(rtarget)
+    if _HASNUMPY:
+        xs, ys, covs = _aaline_pixels_numpy(line, clip)
+        _blend_pixels_numpy(rtarget, color, xs, ys, covs)
+    else:
+        xs, ys, covs = _aaline_pixels(line, clip)
+        _blend_pixels(rtarget, color, xs, ys, covs)
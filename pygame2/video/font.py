@@ -1,9 +1,26 @@
 """Font and text rendering routines."""
 import os
+import weakref
+from collections import OrderedDict
+from pygame2.compat import UnsupportedError
+from pygame2.color import convert_to_color
 import pygame2.sdl.surface as sdlsurface
-from pygame2.video.sprite import SoftwareSprite
+import pygame2.sdl.pixels as sdlpixels
+from pygame2.sdl.rect import SDL_Rect
+from pygame2.sdl.video import SDL_BLENDMODE_NONE
+import pygame2.sdl.render as render
+from pygame2.video.sprite import SoftwareSprite, RenderContext
 
-__all__ = ["BitmapFont"]
+_HASSDLTTF = True
+try:
+    import pygame2.sdlttf as sdlttf
+except (ImportError, RuntimeError):
+    _HASSDLTTF = False
+
+__all__ = ["BitmapFont", "TTFFont"]
+
+# ARGB8888 masks for the glyph atlas and rendered texts.
+_ARGBMASKS = (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)
 
 
 class BitmapFont(object):
@@ -39,13 +56,16 @@ class BitmapFont(object):
                   ",;.:!?+-()"
                   ]
 
-    def __init__(self, surface, size, mapping=None):
+    def __init__(self, surface, size, mapping=None, textcache=32):
         """Creates a new BitmapFont instance from the passed image.
 
         Each character is expected to be of the same size (a 2-value tuple
         denoting the width and height) and to be in order of the passed
-        mapping.
+        mapping. textcache denotes the maximum amount of texts rendered
+        via render_cached(), which are kept for reuse.
         """
+        if textcache < 0:
+            raise ValueError("textcache must not be negative")
         if mapping is None:
             self.mapping = list(BitmapFont.DEFAULTMAP)
         else:
@@ -57,12 +77,31 @@ class BitmapFont(object):
         #    TODO
         elif isinstance(surface, sdlsurface.SDL_Surface):
             self.surface = surface
+        else:
+            raise TypeError("unsupported surface type")
         self.size = size[0], size[1]
+        self.textcache = textcache
+        self._texts = OrderedDict()
+        self._pool = OrderedDict()
+        # The amount of unreleased render() results per sprite.
+        self._users = weakref.WeakKeyDictionary()
+        # The textures are destroyed with the renderer of their context,
+        # so the contexts are not kept alive here.
+        self._textures = weakref.WeakKeyDictionary()
         self._calculate_offsets()
 
+    def __del__(self):
+        """Releases the textures created for the font."""
+        textures = getattr(self, "_textures", None)
+        if textures is not None:
+            for texture in list(textures.values()):
+                render.destroy_texture(texture)
+        self._textures = weakref.WeakKeyDictionary()
+
     def _calculate_offsets(self):
         """Calculates the internal character offsets for each line."""
         self.offsets = {}
+        self._rects = {}
         offsets = self.offsets
         x, y = 0, 0
         w, h = self.size
@@ -70,64 +109,168 @@ class BitmapFont(object):
             x = 0
             for c in line:
                 offsets[c] = (x, y, w, h)
+                self._rects[c] = SDL_Rect(x, y, w, h)
                 x += w
             y += h
 
-    def render(self, text, bpp=None):
-        """Renders the passed text on a new Sprite and returns it."""
-        x, y = 0, 0
-        tw, th = 0, 0
+    def _text_size(self, lines):
+        """Gets the size of the passed lines of text."""
         w, h = self.size
-        # TODO
-        lines = text.split(os.linesep)
-        for line in lines:
-            tw = max(tw, sum([w for c in line]))
-            th += h
+        return max(len(line) for line in lines) * w, len(lines) * h
 
-        if bpp is None:
-            bpp = self.surface.format.BitsPerPixel
-        surface = SoftwareSprite(tw, th, bpp)
-        target = surface.surface
+    def _blit_lines(self, target, lines, x, y):
+        """Blits the passed lines of text on the target surface."""
         blit_surface = sdlsurface.blit_surface
         fontsf = self.surface
-        offsets = self.offsets
+        rects = self._rects
+        w, h = self.size
+        # The blit clips the destination area, hence its position is
+        # reset for each character.
+        dstrect = SDL_Rect()
         for line in lines:
-            for c in line:
-                blit_surface(target, (x, y), fontsf, offsets[c])
-                x += w
+            for index, c in enumerate(line):
+                srcrect = rects.get(c)
+                if srcrect is not None:
+                    dstrect.x = x + index * w
+                    dstrect.y = y
+                    blit_surface(fontsf, srcrect, target, dstrect)
             y += h
-        return surface
+
+    def _copy_lines(self, context, lines, x, y):
+        """Copies the passed lines of text on the target of the
+        RenderContext."""
+        renderer = context.renderer
+        texture = self._textures.get(context)
+        if texture is None:
+            texture = render.create_texture_from_surface(renderer,
+                                                         self.surface)
+            self._textures[context] = texture
+        render_copy = render.render_copy
+        rects = self._rects
+        w, h = self.size
+        dstrect = SDL_Rect(x, y, w, h)
+        for line in lines:
+            for index, c in enumerate(line):
+                srcrect = rects.get(c)
+                if srcrect is not None:
+                    dstrect.x = x + index * w
+                    render_copy(renderer, texture, srcrect, dstrect)
+            dstrect.y += h
+
+    def _get_sprite(self, width, height, bpp):
+        """Gets a pooled or newly created SoftwareSprite of the passed
+        size."""
+        sprite = self._pool.pop((width, height, bpp), None)
+        if sprite is not None:
+            sdlsurface.fill_rect(sprite.surface, None, 0)
+            return sprite
+        pformat = self.surface.format
+        masks = 0, 0, 0, 0
+        if bpp == pformat.BitsPerPixel:
+            masks = pformat.Rmask, pformat.Gmask, pformat.Bmask, pformat.Amask
+        surface = sdlsurface.create_rgb_surface(width, height, bpp, *masks)
+        if bpp == pformat.BitsPerPixel and pformat.palette is not None:
+            sdlsurface.set_surface_palette(surface, pformat.palette)
+        return SoftwareSprite(surface, True)
+
+    def _recycle(self, sprite):
+        """Puts a sprite, which is not used anymore, into the pool."""
+        w, h = sprite.size
+        self._pool[(w, h, sprite.surface.format.BitsPerPixel)] = sprite
+        while len(self._pool) > self.textcache:
+            self._pool.popitem(last=False)
+
+    def _render_sprite(self, text, bpp):
+        """Renders the passed text on a pooled or newly created Sprite."""
+        lines = text.split(os.linesep)
+        tw, th = self._text_size(lines)
+        sprite = self._get_sprite(tw, th, bpp)
+        self._blit_lines(sprite.surface, lines, 0, 0)
+        return sprite
+
+    def render(self, text, bpp=None):
+        """Renders the passed text on a new Sprite and returns it.
+
+        Once the Sprite is not used anymore, it can be passed to
+        release(), so that it is reused for other texts of the same
+        size.
+        """
+        if bpp is None:
+            bpp = self.surface.format.BitsPerPixel
+        sprite = self._render_sprite(text, bpp)
+        self._users[sprite] = 1
+        return sprite
+
+    def render_cached(self, text, bpp=None):
+        """Renders the passed text on a Sprite, which is shared with
+        other render_cached() calls for the same text, and returns it.
+
+        The last rendered texts are cached and the same Sprite is
+        returned for them, so it must not be modified or moved. Once a
+        text is removed from the cache and its Sprite was passed to
+        release() for each call to render_cached(), the Sprite will be
+        reused for other texts of the same size.
+        """
+        if bpp is None:
+            bpp = self.surface.format.BitsPerPixel
+        key = text, bpp
+        texts = self._texts
+        sprite = texts.pop(key, None)
+        if sprite is None:
+            sprite = self._render_sprite(text, bpp)
+        users = self._users
+        users[sprite] = users.get(sprite, 0) + 1
+        if self.textcache > 0:
+            texts[key] = sprite
+            while len(texts) > self.textcache:
+                old = texts.popitem(last=False)[1]
+                if old not in users:
+                    self._recycle(old)
+        return sprite
+
+    def release(self, sprite):
+        """Releases a Sprite returned by render() or render_cached(),
+        which is not used anymore.
+
+        The Sprite is reused for other texts, once it was released for
+        each call, that returned it, and its text was removed from the
+        cache.
+        """
+        count = self._users.get(sprite, 0)
+        if count == 0:
+            raise ValueError("sprite is not in use")
+        if count > 1:
+            self._users[sprite] = count - 1
+            return
+        del self._users[sprite]
+        if sprite not in self._texts.values():
+            self._recycle(sprite)
 
     def render_on(self, surface, text, offset=(0, 0)):
         """Renders a text on the passed sprite, starting at a specific
         offset.
 
-        The top-left start position of the text will be the passed offset and
-        4-value tuple with the changed area will be returned.
+        surface can also be a RenderContext, in which case the text will
+        be copied on its target using a texture of the font image.
+
+        The top-left start position of the text will be the passed
+        offset and a 4-value tuple with the changed area as
+        (x, y, width, height) will be returned.
         """
         x, y = offset
-        w, h = self.size
-
-        target = None
+        lines = text.split(os.linesep)
         if isinstance(surface, SoftwareSprite):
-            target = surface.surface
+            self._blit_lines(surface.surface, lines, x, y)
         #elif isinstance(surface, sprite.Sprite):
         #    TODO
         elif isinstance(surface, sdlsurface.SDL_Surface):
-            target = surface
+            self._blit_lines(surface, lines, x, y)
+        elif isinstance(surface, RenderContext):
+            self._copy_lines(surface, lines, x, y)
         else:
             raise TypeError("unsupported surface type")
-
-        lines = text.split(os.linesep)
-        blit_surface = sdlsurface.blit_surface
-        fontsf = self.surface
-        offsets = self.offsets
-        for line in lines:
-            for c in line:
-                blit_surface(target, (x, y), fontsf, offsets[c])
-                x += w
-            y += h
-        return (offset[0], offset[1], x + w, y + h)
+        tw, th = self._text_size(lines)
+        return (x, y, tw, th)
 
     def contains(self, c):
         """Checks, whether a certain character exists in the font."""
@@ -137,9 +280,267 @@ class BitmapFont(object):
         """Checks, whether all characters in the passed text can be rendered.
         """
         lines = text.split(os.linesep)
-        has_key = self.offsets.has_key
+        offsets = self.offsets
         for line in lines:
             for c in line:
-                if not has_key(c):
+                if c not in offsets:
                     return False
         return True
+
+
+class _Glyph(object):
+    """A rasterized glyph of a TTFFont."""
+    __slots__ = ["surface", "rect", "cell", "offset", "advance", "index"]
+
+    def __init__(self, surface, rect, cell, offset, advance, index):
+        self.surface = surface
+        self.rect = rect
+        self.cell = cell
+        self.offset = offset
+        self.advance = advance
+        self.index = index
+
+
+class TTFFont(object):
+    """A TrueType font, which renders texts from cached glyph images.
+
+    Each glyph is rasterized only once and kept in a glyph atlas
+    surface, from which it is blitted for all texts using it. If the
+    atlas is full, the least recently used glyph is replaced. Glyphs,
+    which do not fit into an atlas cell, are kept as separate surfaces.
+
+    Texts rendered via render() are kept in a cache of their own, so
+    that stable labels do not need to be laid out again.
+    """
+    def __init__(self, fname, size, style=0, index=0, capacity=256,
+                 textcache=32):
+        """Creates a new TTFFont from the passed font file.
+
+        capacity denotes the maximum amount of cached glyphs, textcache
+        the maximum amount of cached texts.
+        """
+        if not _HASSDLTTF:
+            raise UnsupportedError(TTFFont,
+                                   "SDL2_ttf library could not be loaded")
+        if capacity < 1:
+            raise ValueError("capacity must be greater than 0")
+        if textcache < 0:
+            raise ValueError("textcache must not be negative")
+        self.font = None
+        self.atlas = None
+        sdlttf.init()
+        try:
+            self.font = sdlttf.open_font_index(fname, size, index)
+        except:
+            sdlttf.quit()
+            raise
+        self.ptsize = size
+        self.capacity = capacity
+        self.textcache = textcache
+        self.height = sdlttf.font_height(self.font)
+        self.lineskip = sdlttf.font_line_skip(self.font)
+
+        cellw, cellh = (self.height * 3) // 2, self.height
+        cols = max(1, int(capacity ** 0.5))
+        rows = (capacity + cols - 1) // cols
+        self.atlas = sdlsurface.create_rgb_surface(cols * cellw, rows * cellh,
+                                                   32, *_ARGBMASKS)
+        self._cellsize = cellw, cellh
+        self._cells = [(x * cellw, y * cellh) for y in range(rows)
+                       for x in range(cols)][:capacity]
+        self._glyphs = OrderedDict()
+        self._texts = OrderedDict()
+        self._kernings = {}
+        self.style = style
+
+    def __del__(self):
+        """Releases the font and the cached glyphs."""
+        self.close()
+
+    @property
+    def style(self):
+        """The style of the font."""
+        return sdlttf.get_font_style(self.font)
+
+    @style.setter
+    def style(self, value):
+        """The style of the font."""
+        sdlttf.set_font_style(self.font, value)
+        self.clear()
+
+    def clear(self):
+        """Removes all cached glyphs and texts."""
+        for glyph in self._glyphs.values():
+            self._release_glyph(glyph)
+        self._glyphs.clear()
+        self._texts.clear()
+        self._kernings.clear()
+
+    def close(self):
+        """Closes the font and releases all cached glyphs and texts."""
+        if getattr(self, "font", None) is None:
+            return
+        self.clear()
+        sdlsurface.free_surface(self.atlas)
+        sdlttf.close_font(self.font)
+        sdlttf.quit()
+        self.font = None
+        self.atlas = None
+
+    def _release_glyph(self, glyph):
+        """Gives the atlas cell or separate surface of a glyph free."""
+        if glyph.cell is not None:
+            self._cells.append(glyph.cell)
+        elif glyph.surface is not None:
+            sdlsurface.free_surface(glyph.surface)
+
+    def _get_glyph(self, ch):
+        """Gets the cached glyph for the passed character, rasterizing it
+        on demand."""
+        glyphs = self._glyphs
+        glyph = glyphs.pop(ch, None)
+        if glyph is None:
+            glyph = self._render_glyph(ch)
+        glyphs[ch] = glyph
+        return glyph
+
+    def _render_glyph(self, ch):
+        """Rasterizes a glyph and stores it in the glyph atlas."""
+        font = self.font
+        minx, maxx, miny, maxy, advance = sdlttf.glyph_metrics(font, ord(ch))
+        index = sdlttf.glyph_is_provided(font, ch)
+        # A string with a single character places the glyph origin at
+        # -minx for glyphs extending to the left.
+        offset = max(0, -minx)
+        if sdlttf.size(font, ch)[0] == 0:
+            return _Glyph(None, None, None, offset, advance, index)
+
+        cellw, cellh = self._cellsize
+        glyphs = self._glyphs
+        surface = sdlttf.render_blended(font, ch, sdlpixels.SDL_Color())
+        w, h = surface.size
+        fits = w <= cellw and h <= cellh
+        while len(glyphs) >= self.capacity or (fits and not self._cells):
+            self._release_glyph(glyphs.popitem(last=False)[1])
+        if not fits:
+            return _Glyph(surface, SDL_Rect(0, 0, w, h), None, offset,
+                          advance, index)
+
+        cell = self._cells.pop()
+        sdlsurface.fill_rect(self.atlas, SDL_Rect(cell[0], cell[1], cellw,
+                                                  cellh), 0)
+        sdlsurface.set_surface_blend_mode(surface, SDL_BLENDMODE_NONE)
+        sdlsurface.blit_surface(surface, None, self.atlas,
+                                SDL_Rect(cell[0], cell[1]))
+        sdlsurface.free_surface(surface)
+        return _Glyph(self.atlas, SDL_Rect(cell[0], cell[1], w, h), cell,
+                      offset, advance, index)
+
+    def _get_kerning(self, prev, index):
+        """Gets the kerning between two glyph indices."""
+        key = prev, index
+        kerning = self._kernings.get(key)
+        if kerning is None:
+            kerning = sdlttf.get_kerning_size(self.font, prev, index)
+            self._kernings[key] = kerning
+        return kerning
+
+    def _layout_line(self, line):
+        """Lays out a single line of text.
+
+        Yields a (x, glyph) tuple with the blit position for each
+        character. Glyphs may be replaced in the atlas by the following
+        ones, so they have to be used before the next one is retrieved.
+        """
+        kerning = sdlttf.get_font_kerning(self.font)
+        x, prev, first = 0, 0, True
+        for ch in line:
+            glyph = self._get_glyph(ch)
+            if first:
+                x, first = glyph.offset, False
+            elif kerning and prev and glyph.index:
+                x += self._get_kerning(prev, glyph.index)
+            yield x - glyph.offset, glyph
+            x += glyph.advance
+            prev = glyph.index
+
+    def _line_width(self, gx, glyph):
+        """Gets the line width up to and including the passed glyph."""
+        width = gx + glyph.offset + glyph.advance
+        if glyph.rect is not None:
+            width = max(width, gx + glyph.rect.w)
+        return width
+
+    def text_size(self, text):
+        """Gets the size of the passed text as (width, height) tuple."""
+        lines = text.split(os.linesep)
+        width = 0
+        for line in lines:
+            for gx, glyph in self._layout_line(line):
+                width = max(width, self._line_width(gx, glyph))
+        return width, self.lineskip * (len(lines) - 1) + self.height
+
+    def _blit_text(self, target, text, offset, color):
+        """Blits the glyphs of a text on the passed target surface and
+        returns the size of the text."""
+        rgb = color.r, color.g, color.b
+        sdlsurface.set_surface_color_mod(self.atlas, *rgb)
+        blit_surface = sdlsurface.blit_surface
+        x, y = offset
+        lines = text.split(os.linesep)
+        width = 0
+        for line in lines:
+            for gx, glyph in self._layout_line(line):
+                width = max(width, self._line_width(gx, glyph))
+                if glyph.rect is None:
+                    continue
+                if glyph.cell is None:
+                    sdlsurface.set_surface_color_mod(glyph.surface, *rgb)
+                blit_surface(glyph.surface, glyph.rect, target,
+                             SDL_Rect(x + gx, y))
+            y += self.lineskip
+        return width, self.lineskip * (len(lines) - 1) + self.height
+
+    def render(self, text, color=(255, 255, 255)):
+        """Renders the passed text on a new SoftwareSprite and returns it.
+
+        The rendered text is kept in a cache and the same SoftwareSprite
+        will be returned for following calls with the same text and
+        color. It hence should not be modified.
+        """
+        color = convert_to_color(color)
+        key = text, color.r, color.g, color.b
+        sprite = self._texts.pop(key, None)
+        if sprite is None:
+            w, h = self.text_size(text)
+            surface = sdlsurface.create_rgb_surface(w, h, 32, *_ARGBMASKS)
+            # Use the text color with full transparency as background,
+            # so that blending the glyphs keeps their color.
+            bgcolor = sdlpixels.map_rgba(surface.format, color.r, color.g,
+                                         color.b, 0)
+            sdlsurface.fill_rect(surface, None, bgcolor)
+            self._blit_text(surface, text, (0, 0), color)
+            sprite = SoftwareSprite(surface, True)
+            while self._texts and len(self._texts) >= self.textcache:
+                self._texts.popitem(last=False)
+        if self.textcache > 0:
+            self._texts[key] = sprite
+        return sprite
+
+    def render_on(self, surface, text, offset=(0, 0), color=(255, 255, 255)):
+        """Renders a text on the passed sprite, starting at a specific
+        offset.
+
+        The top-left start position of the text will be the passed
+        offset and a 4-value tuple with the changed area as
+        (x, y, width, height) will be returned.
+        """
+        if isinstance(surface, SoftwareSprite):
+            target = surface.surface
+        elif isinstance(surface, sdlsurface.SDL_Surface):
+            target = surface
+        else:
+            raise TypeError("unsupported surface type")
+        color = convert_to_color(color)
+        w, h = self._blit_text(target, text, offset, color)
+        return (offset[0], offset[1], w, h)
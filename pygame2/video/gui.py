@@ -169,14 +169,75 @@ class UIFactory(object):
             (self.spritefactory, self.default_args)
 
 
+class _SpatialGrid(object):
+    """A uniform grid, which maps the cells covered by the areas of
+    components to the components."""
+    def __init__(self, cellsize):
+        self.cellsize = cellsize
+        self.cells = {}
+
+    def _get_keys(self, area):
+        """Gets the keys of the cells covered by the area."""
+        cellsize = self.cellsize
+        x1, y1, x2, y2 = area
+        columns = range(int(x1) // cellsize, int(x2 - 1) // cellsize + 1)
+        rows = range(int(y1) // cellsize, int(y2 - 1) // cellsize + 1)
+        return [(cx, cy) for cx in columns for cy in rows]
+
+    def clear(self):
+        """Removes all components from the grid."""
+        self.cells = {}
+
+    def add(self, component, area):
+        """Adds the component to all cells covered by the area."""
+        cells = self.cells
+        for key in self._get_keys(area):
+            cell = cells.get(key, None)
+            if cell is None:
+                cells[key] = [component]
+            else:
+                cell.append(component)
+
+    def remove(self, component, area):
+        """Removes the component from all cells covered by the area."""
+        cells = self.cells
+        for key in self._get_keys(area):
+            cell = cells[key]
+            for index, item in enumerate(cell):
+                if item is component:
+                    del cell[index]
+                    break
+            if not cell:
+                del cells[key]
+
+    def get(self, x, y):
+        """Gets the components, whose areas might contain the passed
+        position."""
+        cellsize = self.cellsize
+        return self.cells.get((int(x) // cellsize, int(y) // cellsize), ())
+
+
 class UIProcessor(System):
     """A processing system for user interface elements and events."""
-    def __init__(self):
-        """Creates a new UIProcessor."""
+    def __init__(self, cellsize=64):
+        """Creates a new UIProcessor.
+
+        The UI elements of a World are kept in a spatial index of
+        cellsize x cellsize cells, so that mouse events only need to be
+        checked against the UI elements under the mouse cursor.
+        """
         super(UIProcessor, self).__init__()
+        if cellsize <= 0:
+            raise ValueError("cellsize must be greater than 0")
         self.componenttypes = (Sprite, )
         self._nextactive = None
         self._activecomponent = None
+        self._grid = _SpatialGrid(cellsize)
+        self._gridworld = None
+        self._processedworld = None
+        self._areas = {}
+        self._hovered = []
+        self._pressed = []
         self.handlers = {
             events.SDL_MOUSEMOTION: self.mousemotion,
             events.SDL_MOUSEBUTTONDOWN: self.mousedown,
@@ -289,6 +350,79 @@ class UIProcessor(System):
         elif (component.uitype & BUTTON):
             component.state &= ~HOVERED
 
+    def _update_grid(self, world):
+        """Updates the spatial index with the UI elements, which were
+        added to or removed from the World or moved since the last
+        update."""
+        grid = self._grid
+        if world is not self._gridworld:
+            grid.clear()
+            self._areas = {}
+            self._gridworld = world
+        areas = self._areas
+        current = {}
+        pressed = []
+        for ctype in self.componenttypes:
+            for v in world.get_components(ctype):
+                key = id(v)
+                if key in current or not hasattr(v, "events") or \
+                        not hasattr(v, "uitype"):
+                    continue
+                area = tuple(v.area)
+                current[key] = (v, area)
+                last = areas.pop(key, None)
+                if last is None:
+                    grid.add(v, area)
+                elif last[1] != area:
+                    grid.remove(v, last[1])
+                    grid.add(v, area)
+                if (v.uitype & BUTTON) and (v.state & PRESSED):
+                    pressed.append(v)
+        # The remaining elements are not part of the World anymore.
+        for v, area in areas.values():
+            grid.remove(v, area)
+        self._areas = current
+        self._pressed = pressed
+        self._hovered = [v for v in self._hovered if id(v) in current]
+
+    def _dispatch_indexed(self, world, handler, event, x, y):
+        """Passes a mouse event to the UI elements of the World under the
+        passed position and to those, which were under the mouse cursor
+        on the previous mouse event, so they can reset their state.
+
+        Mouse button events are also passed to pressed buttons, so that
+        they are released, if the button is not released on them.
+        """
+        if world is not self._processedworld or \
+                world is not self._gridworld:
+            # The index is not updated by process(), so UI elements may
+            # have changed since the last event.
+            self._update_grid(world)
+        etype = event.type
+        visited = set()
+        hovered = []
+        for v in self._grid.get(x, y):
+            if etype in v.events:
+                visited.add(id(v))
+                hovered.append(v)
+                handler(v, event)
+        if etype == events.SDL_MOUSEMOTION:
+            for v in self._hovered:
+                if id(v) not in visited and etype in v.events:
+                    handler(v, event)
+        else:
+            touched = list(hovered)
+            for v in self._hovered + self._pressed:
+                if id(v) not in visited and etype in v.events:
+                    visited.add(id(v))
+                    touched.append(v)
+                    handler(v, event)
+            # Only the elements, which received the button event, can
+            # have changed their pressed state.
+            self._pressed = [v for v in touched if (v.uitype & BUTTON) and
+                             (v.state & PRESSED)]
+        self._hovered = hovered
+
     def dispatch(self, obj, event):
         """Passes an event to the given object.
 
@@ -308,14 +442,21 @@ class UIProcessor(System):
 
         handler = self.handlers.get(event.type, self.passevent)
         if isinstance(obj, World):
-            for ctype in self.componenttypes:
-                items = obj.get_components(ctype)
-                items = [(v, e) for v in items for e in (event,)
-                         if hasattr(v, "events") and hasattr(v, "uitype") \
-                            and e.type in v.events]
-                if len(items) > 0:
-                    arg1, arg2 = zip(*items)
-                    map(handler, arg1, arg2)
+            if event.type == events.SDL_MOUSEMOTION:
+                self._dispatch_indexed(obj, handler, event,
+                                       event.motion.x, event.motion.y)
+            elif event.type in (events.SDL_MOUSEBUTTONDOWN,
+                                events.SDL_MOUSEBUTTONUP):
+                self._dispatch_indexed(obj, handler, event,
+                                       event.button.x, event.button.y)
+            else:
+                for ctype in self.componenttypes:
+                    items = [v for v in obj.get_components(ctype)
+                             if hasattr(v, "events") and \
+                                 hasattr(v, "uitype") and \
+                                 event.type in v.events]
+                    for v in items:
+                        handler(v, event)
         elif isiterable(obj):
             items = [(v, e) for v in obj for e in (event,)
                      if e.type in v.events]
@@ -329,11 +470,14 @@ class UIProcessor(System):
             self._nextactive = None
 
     def process(self, world, components):
-        """The UIProcessor class does not implement the process() method
-        by default. Instead it uses dispatch() to send events around to
-        components.
+        """Updates the spatial index with the UI elements of the World,
+        which were added, removed or moved since the last update.
+
+        Events are not processed here. Instead dispatch() is used to
+        send events around to components.
         """
-        pass
+        self._update_grid(world)
+        self._processedworld = world
 
     def __repr__(self):
         return "UIProcessor()"
@@ -1,13 +1,66 @@
 """Pixel-wise access routines."""
+import sys
 import ctypes
-from pygame2.compat import UnsupportedError, experimental
+from pygame2.compat import UnsupportedError, ISPYTHON2
 from pygame2.array import MemoryView
 import pygame2.sdl.surface as sdlsurface
 from pygame2.video.sprite import SoftwareSprite
 from pygame2.video.draw import prepare_color
 
 
-__all__ = ["PixelView", "pixels2d", "pixels3d"]
+__all__ = ["PixelView", "SurfaceLock", "pixels2d", "pixels3d",
+           "pixelbuffer"]
+
+
+def _get_surface(source):
+    """Gets the SDL_Surface of the passed Sprite or SDL_Surface."""
+    if isinstance(source, SoftwareSprite):
+        return source.surface
+    elif isinstance(source, sdlsurface.SDL_Surface):
+        return source
+    raise TypeError("source must be a Sprite or SDL_Surface")
+
+
+class SurfaceLock(object):
+    """Locks the SDL_Surface of a Sprite or SDL_Surface for accessing its
+    pixels, if necessary.
+
+    The lock is held until release() is called, the with block using
+    the SurfaceLock is left or the SurfaceLock is garbage-collected.
+    """
+    def __init__(self, source):
+        """Creates a new SurfaceLock and locks the surface of the source,
+        if necessary."""
+        self.surface = _get_surface(source)
+        # keep a reference, so the Sprite's not GC'd
+        self.source = source
+        self._locked = False
+        if sdlsurface.SDL_MUSTLOCK(self.surface):
+            sdlsurface.lock_surface(self.surface)
+            self._locked = True
+
+    def __enter__(self):
+        return self.surface
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+    def release(self):
+        """Unlocks the surface, if it was locked by the SurfaceLock."""
+        if self._locked:
+            self._locked = False
+            sdlsurface.unlock_surface(self.surface)
+
+
+_BIGENDIAN = sys.byteorder == "big"
+
+_CTYPES = {1: ctypes.c_ubyte,
+           2: ctypes.c_ushort,
+           4: ctypes.c_uint
+           }
 
 
 class PixelView(MemoryView):
@@ -17,73 +70,104 @@ class PixelView(MemoryView):
     Nth row of the underlying surface. To access a specific column within
     that row, view[N][C] has to be used.
     
+    Pixels can also be accessed directly via view[N, C], which avoids
+    creating a view for the row.
+
     NOTE: The PixelView is implemented on top of the MemoryView class. As such
-    it makes heavy use of recursion to access rows and columns and can be
-    considered as slow in contrast to optimised ndim-array solutions such as
-    numpy.
+    it can be considered as slow in contrast to optimised ndim-array
+    solutions such as numpy.
     """
     def __init__(self, source):
         """Creates a new PixelView from a Sprite or SDL_Surface.
 
         If necessary, the surface will be locked for accessing its pixel data.
-        The lock will be removed once the PixelView is garbage-collected or
-        deleted.
+        The lock will be removed once the PixelView is garbage-collected,
+        deleted or the with block using it is left.
         """
-        if isinstance(source, SoftwareSprite):
-            self._surface = source.surface
-            # keep a reference, so the Sprite's not GC'd
-            self._sprite = source
-        elif isinstance(source, sdlsurface.SDL_Surface):
-            self._surface = source
-        else:
-            raise TypeError("source must be a Sprite or SDL_Surface")
-
-        if sdlsurface.SDL_MUSTLOCK(self._surface):
-            sdlsurface.lock_surface(self._surface)
+        self._lock = SurfaceLock(source)
+        self._surface = self._lock.surface
 
         pxbuf = self._surface.pixels
         itemsize = self._surface.format.BytesPerPixel
+        if itemsize < 1 or itemsize > 4:
+            raise ValueError("unsupported bpp")
         strides = (self._surface.size[1], self._surface.size[0])
         srcsize = self._surface.size[1] * self._surface.pitch
+        # Each row of the surface can contain padding bytes, which are
+        # skipped by using the pitch as row step.
+        steps = (self._surface.pitch, itemsize)
+        if itemsize != 3:
+            self._pixels = ctypes.cast(pxbuf,
+                                       ctypes.POINTER(_CTYPES[itemsize]))
         super(PixelView, self).__init__(pxbuf, itemsize, strides,
                                         getfunc=self._getitem,
                                         setfunc=self._setitem,
-                                        srcsize=srcsize)
+                                        srcsize=srcsize, steps=steps)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._lock.release()
 
     def _getitem(self, start, end):
-        if self.itemsize == 1:
-            # byte-wise access
-            return self.source[start:end]
-        # move the pointer to the correct location
-        src = ctypes.byref(self.source.contents, start)
-        casttype = ctypes.c_ubyte
-        if self.itemsize == 2:
-            casttype = ctypes.c_ushort
-        elif self.itemsize == 3:
-            # TODO
-            raise NotImplementedError("unsupported bpp")
-        elif self.itemsize == 4:
-            casttype = ctypes.c_uint
-        return ctypes.cast(src, ctypes.POINTER(casttype)).contents.value
+        if self.itemsize == 3:
+            src = self.source
+            if _BIGENDIAN:
+                return (src[start] << 16) | (src[start + 1] << 8) | \
+                    src[start + 2]
+            return src[start] | (src[start + 1] << 8) | \
+                (src[start + 2] << 16)
+        return self._pixels[start // self.itemsize]
 
     def _setitem(self, start, end, value):
-        target = None
-        if self.itemsize == 1:
-            target = ctypes.cast(self.source, ctypes.POINTER(ctypes.c_ubyte))
-        elif self.itemsize == 2:
-            target = ctypes.cast(self.source, ctypes.POINTER(ctypes.c_ushort))
-        elif self.itemsize == 3:
-            # TODO
-            raise NotImplementedError("unsupported bpp")
-        elif self.itemsize == 4:
-            target = ctypes.cast(self.source, ctypes.POINTER(ctypes.c_uint))
         value = prepare_color(value, self._surface)
-        target[start // self.itemsize] = value
+        if self.itemsize == 3:
+            target = self.source
+            if _BIGENDIAN:
+                target[start] = (value >> 16) & 0xFF
+                target[start + 1] = (value >> 8) & 0xFF
+                target[start + 2] = value & 0xFF
+            else:
+                target[start] = value & 0xFF
+                target[start + 1] = (value >> 8) & 0xFF
+                target[start + 2] = (value >> 16) & 0xFF
+        else:
+            self._pixels[start // self.itemsize] = value
+
+
+def _pixel_array(surface):
+    """Gets the pixel buffer of the surface as ctypes byte array."""
+    srcsize = surface.size[1] * surface.pitch
+    return ctypes.cast(surface.pixels,
+                       ctypes.POINTER(ctypes.c_ubyte * srcsize)).contents
+
+
+def pixelbuffer(source):
+    """Creates a 2D memoryview on the pixels of the passed source.
+
+    The memoryview uses a y/x-layout. For 8-, 16- and 32-bit surfaces,
+    each item is a pixel. For 24-bit surfaces, each item is a single
+    byte of a pixel. Each row contains the padding items of the
+    surface's pitch at its end.
+    """
+    if ISPYTHON2:
+        raise UnsupportedError(pixelbuffer,
+                               "memoryview.cast() is not supported")
+    lock = SurfaceLock(source)
+    surface = lock.surface
+    bpp = surface.format.BytesPerPixel
+    if bpp < 1 or bpp > 4:
+        raise ValueError("unsupported bpp")
+    pxbuf = _pixel_array(surface)
+    # keep the lock, until the memoryview is released
+    pxbuf._lock = lock
+    view = memoryview(pxbuf).cast("B")
+    if bpp == 3:
+        return view.cast("B", (surface.size[1], surface.pitch))
+    fmt = {1: "B", 2: "H", 4: "I"}[bpp]
+    return view.cast(fmt, (surface.size[1], surface.pitch // bpp))
 
-    def __del__(self):
-        if self._surface is not None:
-            if sdlsurface.SDL_MUSTLOCK(self._surface):
-                sdlsurface.unlock_surface(self._surface)
 
 _HASNUMPY = True
 try:
@@ -93,87 +177,76 @@ try:
         """Wrapper class around numpy.ndarray.
 
         Used to keep track of the original source object for pixels2d()
-        and pixels3d() to avoid the deletion of the source object.
+        and pixels3d() to avoid the deletion of the source object and to
+        keep the surface locked as long as it is accessed.
         """
         def __new__(cls, shape, dtype=float, buffer_=None, offset=0,
-                    strides=None, order=None, source=None, surface=None):
+                    strides=None, order=None, lock=None):
             sfarray = numpy.ndarray.__new__(cls, shape, dtype, buffer_,
                                             offset, strides, order)
-            sfarray._source = source
-            sfarray._surface = surface
+            sfarray._lock = lock
             return sfarray
 
         def __array_finalize__(self, sfarray):
             if sfarray is None:
                 return
-            self._source = getattr(sfarray, '_source', None)
-            self._surface = getattr(sfarray, '_surface', None)
+            self._lock = getattr(sfarray, '_lock', None)
+
+        def __enter__(self):
+            return self
 
-        def __del__(self):
-            if self._surface:
-                if sdlsurface.SDL_MUSTLOCK(self._surface):
-                    sdlsurface.unlock_surface(self._surface)
+        def __exit__(self, exc_type, exc_value, traceback):
+            if self._lock is not None:
+                self._lock.release()
 
 except ImportError:
     _HASNUMPY = False
 
 
-@experimental
 def pixels2d(source):
-    """Creates a 2D pixel array from the passed source."""
+    """Creates a 2D pixel array from the passed source.
+
+    The array uses a x/y-layout and directly accesses the pixels of the
+    source. 24-bit surfaces are not supported, since their pixels can't
+    be mapped to an integer type; use pixels3d() for them.
+    """
     if not _HASNUMPY:
         raise UnsupportedError(pixels2d, "numpy module could not be loaded")
-    if isinstance(source, SoftwareSprite):
-        surface = source.surface
-    elif isinstance(source, sdlsurface.SDL_Surface):
-        surface = source
-    else:
-        raise TypeError("source must be a Sprite or SDL_Surface")
-
+    surface = _get_surface(source)
     bpp = surface.format.BytesPerPixel
+    if bpp == 3:
+        raise ValueError("24-bit surfaces are not supported, use pixels3d()")
     if bpp < 1 or bpp > 4:
         raise ValueError("unsupported bpp")
     strides = (surface.pitch, bpp)
-    srcsize = surface.size[1] * surface.pitch
-    shape = surface.size[1], surface.size[0] #surface.pitch // bpp
+    shape = surface.size[1], surface.size[0]
 
     dtypes = {1: numpy.uint8,
               2: numpy.uint16,
-              3: numpy.uint32,
               4: numpy.uint32
               }
 
-    if sdlsurface.SDL_MUSTLOCK(surface):
-        sdlsurface.lock_surface(surface)
-    pxbuf = ctypes.cast(surface.pixels,
-                        ctypes.POINTER(ctypes.c_ubyte * srcsize)).contents
-    return SurfaceArray(shape, dtypes[bpp], pxbuf, 0, strides, "C", source,
-                        surface).transpose()
+    lock = SurfaceLock(source)
+    return SurfaceArray(shape, dtypes[bpp], _pixel_array(surface), 0,
+                        strides, "C", lock).transpose()
 
 
-@experimental
 def pixels3d(source):
     """Creates a 3D pixel array from the passed source.
+
+    The array uses a x/y/byte-layout and directly accesses the pixels
+    of the source. The last dimension contains the bytes of each pixel
+    in memory order.
     """
     if not _HASNUMPY:
         raise UnsupportedError(pixels3d, "numpy module could not be loaded")
-    if isinstance(source, SoftwareSprite):
-        surface = source.surface
-    elif isinstance(source, sdlsurface.SDL_Surface):
-        surface = source
-    else:
-        raise TypeError("source must be a Sprite or SDL_Surface")
-
+    surface = _get_surface(source)
     bpp = surface.format.BytesPerPixel
     if bpp < 1 or bpp > 4:
         raise ValueError("unsupported bpp")
     strides = (surface.pitch, bpp, 1)
-    srcsize = surface.size[1] * surface.pitch
     shape = surface.size[1], surface.size[0], bpp
 
-    if sdlsurface.SDL_MUSTLOCK(surface):
-        sdlsurface.lock_surface(surface)
-    pxbuf = ctypes.cast(surface.pixels,
-                        ctypes.POINTER(ctypes.c_ubyte * srcsize)).contents
-    return SurfaceArray(shape, numpy.uint8, pxbuf, 0, strides, "C", source,
-                        surface).transpose(1, 0, 2)
+    lock = SurfaceLock(source)
+    return SurfaceArray(shape, numpy.uint8, _pixel_array(surface), 0,
+                        strides, "C", lock).transpose(1, 0, 2)
@@ -1,5 +1,7 @@
 """Sprite, texture and pixel surface routines."""
 import abc
+import ctypes
+import weakref
 from pygame2.compat import *
 from pygame2.color import convert_to_color
 from pygame2.ebs import System
@@ -12,8 +14,8 @@ import pygame2.sdl.pixels as pixels
 import pygame2.sdl.render as render
 import pygame2.sdl.rwops as rwops
 
-__all__ = ["Sprite", "SoftwareSprite", "TextureSprite", "SpriteFactory",
-           "SoftwareSpriteRenderer", "SpriteRenderer",
+__all__ = ["Sprite", "SoftwareSprite", "TextureSprite", "TextureAtlas",
+           "SpriteFactory", "SoftwareSpriteRenderer", "SpriteRenderer",
            "TextureSpriteRenderer", "RenderContext", "TEXTURE", "SOFTWARE"]
 
 TEXTURE = 0
@@ -218,6 +220,12 @@ class Sprite(object):
     """A simple 2D object."""
     __metaclass__ = abc.ABCMeta
 
+    # The sort states of the renderers, which sorted the Sprite. They are
+    # marked dirty on depth changes, so that each renderer keeps its
+    # sprites sorted until the depth of one of them changes. Each Sprite
+    # gets its own WeakSet, once it is sorted by a renderer.
+    _sortstates = ()
+
     def __init__(self):
         """Creates a new Sprite."""
         super(Sprite, self).__init__()
@@ -225,6 +233,27 @@ class Sprite(object):
         self.y = 0
         self.depth = 0
 
+    @property
+    def depth(self):
+        """The depth of the Sprite.
+
+        Sprites with higher depth values will be drawn above sprites with
+        lower depth values.
+        """
+        return self._depth
+
+    @depth.setter
+    def depth(self, value):
+        """The depth of the Sprite."""
+        self._depth = value
+        self._invalidate_sort()
+
+    def _invalidate_sort(self):
+        """Marks the sort order of the renderers, which sorted the Sprite,
+        as outdated."""
+        for state in self._sortstates:
+            state.dirty = True
+
     @property
     def position(self):
         """The top-left position of the Sprite as tuple."""
@@ -280,18 +309,44 @@ class SoftwareSprite(Sprite):
 
 class TextureSprite(Sprite):
     """A simple, visible, texture-based 2D object, using a renderer."""
-    def __init__(self, texture):
-        """Creates a new TextureSprite."""
+    def __init__(self, texture, srcrect=None, free=True):
+        """Creates a new TextureSprite.
+
+        If srcrect is set, only the area of the texture denoted by the
+        SDL_Rect will be used for the TextureSprite, so that multiple
+        TextureSprite objects can share the same texture. If free is set
+        to True, the passed texture will be destroyed automatically.
+        """
         super(TextureSprite, self).__init__()
-        self.texture = texture
-        self._size = render.query_texture(texture)[2:]
+        self._texture = texture
+        self.srcrect = srcrect
+        self.free = free
+        if srcrect is not None:
+            self._size = srcrect.w, srcrect.h
+        else:
+            self._size = render.query_texture(texture)[2:]
 
     def __del__(self):
-        """Releases the bound SDL_Texture."""
-        if self.texture is not None:
-            render.destroy_texture(self.texture)
+        """Releases the bound SDL_Texture, if it is owned by the
+        TextureSprite.
+        """
+        texture = getattr(self, "texture", None)
+        if getattr(self, "free", True) and texture is not None:
+            render.destroy_texture(texture)
         self.texture = None
 
+    @property
+    def texture(self):
+        """The SDL_Texture of the TextureSprite."""
+        return self._texture
+
+    @texture.setter
+    def texture(self, value):
+        """The SDL_Texture of the TextureSprite."""
+        self._texture = value
+        # Batched renderers sort by the texture.
+        self._invalidate_sort()
+
     @property
     def size(self):
         """The size of the TextureSprite as tuple."""
@@ -303,7 +358,192 @@ class TextureSprite(Sprite):
         if access == render.SDL_TEXTUREACCESS_STREAMING:
             static = "False"
         return "TextureSprite(format=%d, static=%s, size=%s)" % \
-            (tformat, static, (w, h))
+            (tformat, static, self.size)
+
+
+class _SkylinePacker(object):
+    """Packs rectangles into a fixed area using the skyline bottom-left
+    algorithm."""
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        # Segments of the skyline as [x, y, width] lists, ordered by x.
+        self.skyline = [[0, 0, width]]
+
+    def _fit(self, index, w, h):
+        """Gets the y position for a w x h rectangle placed at the
+        skyline segment at index or -1, if it does not fit."""
+        skyline = self.skyline
+        x = skyline[index][0]
+        if x + w > self.width:
+            return -1
+        y = 0
+        remaining = w
+        while remaining > 0:
+            sx, sy, sw = skyline[index]
+            y = max(y, sy)
+            if y + h > self.height:
+                return -1
+            remaining -= sw
+            index += 1
+        return y
+
+    def pack(self, w, h):
+        """Finds a free place for a w x h rectangle and marks it as used.
+
+        Returns the top-left position of the place as tuple or None, if
+        the rectangle does not fit.
+        """
+        skyline = self.skyline
+        best = None
+        besty = bestw = 0
+        for index in range(len(skyline)):
+            y = self._fit(index, w, h)
+            if y == -1:
+                continue
+            if best is None or y + h < besty or \
+                    (y + h == besty and skyline[index][2] < bestw):
+                best = index
+                besty = y + h
+                bestw = skyline[index][2]
+        if best is None:
+            return None
+        x = skyline[best][0]
+        y = besty - h
+        skyline.insert(best, [x, besty, w])
+        # Shrink or remove the segments covered by the new one.
+        index = best + 1
+        while index < len(skyline):
+            segment = skyline[index]
+            overlap = x + w - segment[0]
+            if overlap <= 0:
+                break
+            if overlap < segment[2]:
+                segment[0] += overlap
+                segment[2] -= overlap
+                break
+            del skyline[index]
+        # Merge neighbouring segments of the same height.
+        index = 0
+        while index < len(skyline) - 1:
+            if skyline[index][1] == skyline[index + 1][1]:
+                skyline[index][2] += skyline[index + 1][2]
+                del skyline[index + 1]
+            else:
+                index += 1
+        return x, y
+
+
+class TextureAtlas(object):
+    """A set of large textures, into which images are packed."""
+    def __init__(self, renderer, size=(1024, 1024),
+                 pformat=pixels.SDL_PIXELFORMAT_RGBA8888, padding=1):
+        """Creates a new TextureAtlas.
+
+        The TextureAtlas places the pixels of the surfaces added to it
+        in textures of the passed size, creating new textures, as
+        necessary. padding denotes the space to keep free between the
+        packed surfaces to avoid bleeding of neighbouring pixels on
+        scaling.
+        """
+        if isinstance(renderer, render.SDL_Renderer):
+            sdlrenderer = renderer
+        elif isinstance(renderer, RenderContext):
+            sdlrenderer = renderer.renderer
+        else:
+            raise TypeError("renderer must be a Renderer or SDL_Renderer")
+        if size[0] <= 0 or size[1] <= 0:
+            raise ValueError("size must contain positive values")
+        if padding < 0:
+            raise ValueError("padding must not be negative")
+        self._renderer = renderer  # Used to prevent GC
+        self.sdlrenderer = sdlrenderer
+        self.size = tuple(size)
+        self.pformat = pformat
+        self.padding = padding
+        self.textures = []
+        self._packers = []
+
+    def __del__(self):
+        """Releases the textures of the TextureAtlas."""
+        for texture in getattr(self, "textures", ()):
+            render.destroy_texture(texture)
+        self.textures = []
+
+    def __repr__(self):
+        return "TextureAtlas(size=%s, textures=%d)" % \
+            (self.size, len(self.textures))
+
+    def _place(self, w, h):
+        """Finds a free place for a w x h area, creating a new texture, if
+        necessary."""
+        padding = self.padding
+        for index, packer in enumerate(self._packers):
+            pos = packer.pack(w + padding, h + padding)
+            if pos is not None:
+                return index, pos
+        # The padding is not needed at the texture borders.
+        packer = _SkylinePacker(self.size[0] + padding,
+                                self.size[1] + padding)
+        texture = render.create_texture(self.sdlrenderer, self.pformat,
+                                        render.SDL_TEXTUREACCESS_STATIC,
+                                        self.size[0], self.size[1])
+        render.set_texture_blend_mode(texture, video.SDL_BLENDMODE_BLEND)
+        self.textures.append(texture)
+        self._packers.append(packer)
+        return len(self._packers) - 1, packer.pack(w + padding, h + padding)
+
+    def add_surface(self, surface, free=False):
+        """Packs the passed SDL_Surface into the TextureAtlas and returns
+        a TextureSprite for it.
+
+        If free is set to True, the passed surface will be freed
+        automatically. If a SoftwareSprite is passed, its surface will be
+        freed and detached from it.
+        """
+        sprite = None
+        if isinstance(surface, SoftwareSprite):
+            sprite, surface = surface, surface.surface
+        if not isinstance(surface, sdlsurface.SDL_Surface):
+            raise TypeError("surface must be a SDL_Surface")
+        if free and sprite is not None:
+            # Keep the SoftwareSprite from freeing the surface again.
+            sprite.free = False
+            sprite.surface = None
+        try:
+            w, h = surface.size
+            if w > self.size[0] or h > self.size[1]:
+                raise ValueError("surface exceeds the size of the "
+                                 "TextureAtlas")
+            index, (x, y) = self._place(w, h)
+            texture = self.textures[index]
+            rect = SDL_Rect(x, y, w, h)
+            sf = sdlsurface.convert_surface_format(surface, self.pformat, 0)
+            try:
+                render.update_texture(texture, rect, sf.pixels, sf.pitch)
+            finally:
+                sdlsurface.free_surface(sf)
+        finally:
+            if free:
+                sdlsurface.free_surface(surface)
+        sprite = TextureSprite(texture, rect, False)
+        sprite.atlas = self  # Used to prevent GC
+        return sprite
+
+    def add_surfaces(self, surfaces, free=False):
+        """Packs the passed SDL_Surface objects into the TextureAtlas and
+        returns a list of TextureSprite objects in the same order.
+
+        The surfaces are packed by decreasing height, which uses the
+        space of the textures better than adding them one by one.
+        """
+        surfaces = list(surfaces)
+        sprites = [None] * len(surfaces)
+        order = sorted(range(len(surfaces)),
+                       key=lambda i: -surfaces[i].size[1])
+        for index in order:
+            sprites[index] = self.add_surface(surfaces[index], free)
+        return sprites
 
 
 class SpriteFactory(object):
@@ -316,6 +556,10 @@ class SpriteFactory(object):
         which can be SOFTWARE or TEXTURE. The additional kwargs are used
         as default arguments for creating sprites within the factory
         methods.
+
+        For TEXTURE, an atlas=TextureAtlas argument can be passed, so
+        that the sprites created from images, surfaces, objects and
+        colors are packed into the TextureAtlas.
         """
         if sprite_type == TEXTURE:
             if "renderer" not in kwargs:
@@ -323,6 +567,7 @@ class SpriteFactory(object):
         elif sprite_type != SOFTWARE:
             raise ValueError("stype must be TEXTURE or SOFTWARE")
         self._spritetype = sprite_type
+        self.atlas = kwargs.pop("atlas", None)
         self.default_args = kwargs
 
     @property
@@ -358,7 +603,9 @@ class SpriteFactory(object):
         If free is set to True, the passed surface will be freed
         automatically.
         """
-        if self.sprite_type == TEXTURE:
+        if self.sprite_type == TEXTURE and self.atlas is not None:
+            s = self.atlas.add_surface(surface, free)
+        elif self.sprite_type == TEXTURE:
             renderer = self.default_args["renderer"]
             texture = render.create_texture_from_surface(renderer.renderer,
                                                          surface)
@@ -369,6 +616,17 @@ class SpriteFactory(object):
             s = SoftwareSprite(surface, free)
         return s
 
+    def from_images(self, fnames):
+        """Creates a list of Sprite objects from the passed image files.
+
+        If the SpriteFactory uses a TextureAtlas, all images are packed
+        together into it.
+        """
+        surfaces = [load_image(fname) for fname in fnames]
+        if self.sprite_type == TEXTURE and self.atlas is not None:
+            return self.atlas.add_surfaces(surfaces, True)
+        return [self.from_surface(sf, True) for sf in surfaces]
+
     def from_object(self, obj):
         """Creates a Sprite from an arbitrary object."""
         if self.sprite_type == TEXTURE:
@@ -459,6 +717,14 @@ class SpriteFactory(object):
         return TextureSprite(texture)
 
 
+class _SortState(object):
+    """Tracks depth changes of the sprites sorted by a SpriteRenderer."""
+    __slots__ = ["dirty", "__weakref__"]
+
+    def __init__(self):
+        self.dirty = True
+
+
 class SpriteRenderer(System):
     """A rendering system for Sprite components.
 
@@ -470,7 +736,10 @@ class SpriteRenderer(System):
     def __init__(self):
         super(SpriteRenderer, self).__init__()
         self.componenttypes = (Sprite, )
-        self._sortfunc = lambda e: e.depth
+        self._sortfunc = self._defaultsortfunc = lambda e: e.depth
+        self._sorted = []
+        self._sortedset = set()
+        self._sortstate = _SortState()
 
     def render(self, sprites):
         """Renders the passed sprites.
@@ -480,9 +749,39 @@ class SpriteRenderer(System):
         """
         pass
 
+    def _sort(self, components):
+        """Sorts the passed components using the sortfunc.
+
+        If the default sortfunc is used, the sorted sprites are kept and
+        only sorted again, if the set of sprites or the depth of any of
+        these sprites changed.
+        """
+        if self._sortfunc is not self._defaultsortfunc:
+            return sorted(components, key=self._sortfunc)
+        if not hasattr(components, "__len__"):
+            components = list(components)
+        state = self._sortstate
+        if not state.dirty and len(components) == len(self._sorted) and \
+                self._sortedset.issuperset(components):
+            return self._sorted
+        self._sorted = sorted(components, key=self._sortfunc)
+        sortedset = set(self._sorted)
+        # Sprites not sorted by the renderer anymore do not need to
+        # notify it.
+        for sprite in self._sortedset - sortedset:
+            sprite._sortstates.discard(state)
+        for sprite in sortedset - self._sortedset:
+            states = sprite._sortstates
+            if states is Sprite._sortstates:
+                states = sprite._sortstates = weakref.WeakSet()
+            states.add(state)
+        self._sortedset = sortedset
+        state.dirty = False
+        return self._sorted
+
     def process(self, world, components):
         """Draws the passed SoftSprite objects on the Window's surface."""
-        self.render(sorted(components, key=self._sortfunc))
+        self.render(self._sort(components))
 
     @property
     def sortfunc(self):
@@ -507,6 +806,29 @@ class SpriteRenderer(System):
         self._sortfunc = value
 
 
+def _merge_rects(rects):
+    """Merges overlapping (x, y, w, h) rectangles into their bounding
+    rectangles, until no rectangles overlap anymore."""
+    merged = []
+    for rect in rects:
+        x1, y1, w, h = rect
+        if w <= 0 or h <= 0:
+            continue
+        x2, y2 = x1 + w, y1 + h
+        overlaps = True
+        while overlaps:
+            overlaps = False
+            for index, (mx1, my1, mx2, my2) in enumerate(merged):
+                if mx1 < x2 and x1 < mx2 and my1 < y2 and y1 < my2:
+                    x1, y1 = min(x1, mx1), min(y1, my1)
+                    x2, y2 = max(x2, mx2), max(y2, my2)
+                    del merged[index]
+                    overlaps = True
+                    break
+        merged.append((x1, y1, x2, y2))
+    return [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in merged]
+
+
 class SoftwareSpriteRenderer(SpriteRenderer):
     """A rendering system for SoftwareSprite components.
 
@@ -515,8 +837,16 @@ class SoftwareSpriteRenderer(SpriteRenderer):
     drawing context, so that GL operations, such as texture handling or
     using SDL renderers is not possible.
     """
-    def __init__(self, window):
-        """Creates a new SoftSpriteRenderer for a specific Window."""
+    def __init__(self, window, dirtyrects=False, background=None):
+        """Creates a new SoftSpriteRenderer for a specific Window.
+
+        If dirtyrects is True, only the areas of the Window's surface,
+        that changed since the last call to render(), are redrawn and
+        updated on the screen. The areas previously occupied by moved or
+        removed sprites are restored from background, which can be a
+        SoftwareSprite or SDL_Surface with the same size as the Window.
+        If background is None, those areas will be filled black.
+        """
         super(SoftwareSpriteRenderer, self).__init__()
         if isinstance(window, Window):
             self.window = window.window
@@ -524,8 +854,94 @@ class SoftwareSpriteRenderer(SpriteRenderer):
             self.window = window
         else:
             raise TypeError("unsupported window type")
+        if isinstance(background, SoftwareSprite):
+            background = background.surface
+        elif background is not None and \
+                not isinstance(background, sdlsurface.SDL_Surface):
+            raise TypeError("background must be a SoftwareSprite or "
+                            "SDL_Surface")
         self.surface = video.get_window_surface(self.window)
         self.componenttypes = (SoftwareSprite, )
+        self.background = background
+        self._dirtyrects = dirtyrects
+        self._areas = {}
+        # The first frame draws the whole surface, including the
+        # background.
+        w, h = self.surface.size
+        self._invalid = [(0, 0, w, h)]
+
+    @property
+    def dirtyrects(self):
+        """Indicates, whether only changed areas are redrawn."""
+        return self._dirtyrects
+
+    def invalidate(self, sprite=None):
+        """Marks the area of the sprite to be redrawn on the next call to
+        render(), e.g. because its pixels changed.
+
+        If sprite is None, the whole surface will be redrawn.
+        """
+        if sprite is None:
+            w, h = self.surface.size
+            self._invalid.append((0, 0, w, h))
+        elif sprite in self._areas:
+            self._invalid.append(self._areas[sprite])
+
+    def _render_dirty(self, sprites, x, y):
+        """Redraws and updates only the areas of the surface, which
+        changed since the last call."""
+        prevareas = self._areas
+        areas = {}
+        dirty = []
+        for sp in sprites:
+            w, h = sp.size
+            area = (x + sp.x, y + sp.y, w, h)
+            areas[sp] = area
+            prev = prevareas.pop(sp, None)
+            if prev != area:
+                dirty.append(area)
+                if prev is not None:
+                    dirty.append(prev)
+        # Sprites not being rendered anymore leave their old areas.
+        dirty.extend(prevareas.values())
+        dirty.extend(self._invalid)
+        self._invalid = []
+        self._areas = areas
+
+        sw, sh = self.surface.size
+        rects = []
+        for rx, ry, rw, rh in _merge_rects(dirty):
+            x1, y1 = max(rx, 0), max(ry, 0)
+            x2, y2 = min(rx + rw, sw), min(ry + rh, sh)
+            if x1 < x2 and y1 < y2:
+                rects.append(SDL_Rect(x1, y1, x2 - x1, y2 - y1))
+        if not rects:
+            return
+
+        surface = self.surface
+        background = self.background
+        blit_surface = sdlsurface.blit_surface
+        r = SDL_Rect(0, 0, 0, 0)
+        try:
+            for rect in rects:
+                sdlsurface.set_clip_rect(surface, rect)
+                if background is None:
+                    sdlsurface.fill_rect(surface, rect, 0)
+                else:
+                    r.x, r.y = rect.x, rect.y
+                    blit_surface(background, SDL_Rect(rect.x, rect.y,
+                                                      rect.w, rect.h),
+                                 surface, r)
+                x1, y1 = rect.x, rect.y
+                x2, y2 = x1 + rect.w, y1 + rect.h
+                for sp in sprites:
+                    ax, ay, aw, ah = areas[sp]
+                    if ax < x2 and x1 < ax + aw and ay < y2 and y1 < ay + ah:
+                        r.x, r.y = ax, ay
+                        blit_surface(sp.surface, None, surface, r)
+        finally:
+            sdlsurface.set_clip_rect(surface, SDL_Rect(0, 0, sw, sh))
+        video.update_window_surface_rects(self.window, rects)
 
     def render(self, sprites, x=None, y=None):
         """Draws the passed sprites (or sprite) on the Window's surface.
@@ -537,7 +953,15 @@ class SoftwareSpriteRenderer(SpriteRenderer):
         location values that will be added to each individual sprite's
         position. If sprites is a single SoftwareSprite, x and y denote the
         absolute position of the SoftwareSprite, if set.
+
+        If the dirty rectangle mode is enabled and sprites is an
+        iterable, sprites must contain all sprites to be displayed.
         """
+        if self._dirtyrects and isiterable(sprites):
+            if not hasattr(sprites, "__len__"):
+                sprites = list(sprites)
+            self._render_dirty(sprites, x or 0, y or 0)
+            return
         r = SDL_Rect(0, 0, 0, 0)
         if isiterable(sprites):
             blit_surface = sdlsurface.blit_surface
@@ -561,12 +985,18 @@ class TextureSpriteRenderer(SpriteRenderer):
     The TextureSpriteRenderer class uses a SDL_Renderer as drawing
     device to display TextureSprite objects.
     """
-    def __init__(self, target):
+    def __init__(self, target, batched=False):
         """Creates a new TextureSpriteRenderer.
 
         target can be a Window, SDL_Window, RenderContext or SDL_Renderer.
         If it is a Window or SDL_Window instance, a RenderContext will be
         created to acquire the SDL_Renderer.
+
+        If batched is True, sprites of the same depth are grouped by
+        their texture on processing. On rendering, their destination
+        areas are prepared at once in a single, reused buffer and copied
+        via render_copies(), which reuses the texture reference for
+        consecutive sprites of the same texture.
         """
         super(TextureSpriteRenderer, self).__init__()
         if isinstance(target, (Window, video.SDL_Window)):
@@ -582,6 +1012,34 @@ class TextureSpriteRenderer(SpriteRenderer):
             raise TypeError("unsupported object type")
         self.sdlrenderer = sdlrenderer
         self.componenttypes = (TextureSprite, )
+        self._batched = batched
+        self._rects = None
+        self._rectvalues = None
+        if batched:
+            self._sortfunc = self._defaultsortfunc = \
+                lambda e: (e.depth, id(e.texture))
+
+    @property
+    def batched(self):
+        """Indicates, whether the batched rendering mode is used."""
+        return self._batched
+
+    def _render_batch(self, sprites, x, y):
+        """Draws the passed sprites using a single destination area
+        buffer."""
+        count = len(sprites)
+        if self._rects is None or len(self._rects) < count:
+            self._rectvalues = (ctypes.c_int * (count * 4))()
+            self._rects = (SDL_Rect * count).from_buffer(self._rectvalues)
+        values = []
+        extend = values.extend
+        for sp in sprites:
+            w, h = sp.size
+            extend((x + sp.x, y + sp.y, w, h))
+        self._rectvalues[:count * 4] = values
+        render.render_copies(self.sdlrenderer,
+                             [sp.texture for sp in sprites],
+                             [sp.srcrect for sp in sprites], self._rects)
 
     def render(self, sprites, x=None, y=None):
         """Draws the passed sprites (or sprite).
@@ -595,7 +1053,11 @@ class TextureSpriteRenderer(SpriteRenderer):
         denote the absolute position of the TextureSprite, if set.
         """
         r = SDL_Rect(0, 0, 0, 0)
-        if isiterable(sprites):
+        if self._batched and isiterable(sprites):
+            if not hasattr(sprites, "__len__"):
+                sprites = list(sprites)
+            self._render_batch(sprites, x or 0, y or 0)
+        elif isiterable(sprites):
             rcopy = render.render_copy
             renderer = self.sdlrenderer
             x = x or 0
@@ -604,11 +1066,12 @@ class TextureSpriteRenderer(SpriteRenderer):
                 r.x = x + sp.x
                 r.y = y + sp.y
                 r.w, r.h = sp.size
-                rcopy(renderer, sp.texture, None, r)
+                rcopy(renderer, sp.texture, sp.srcrect, r)
         else:
             if x is None or y is None:
                 r.x = sprites.x
                 r.y = sprites.y
                 r.w, r.h = sprites.size
-            render.render_copy(self.sdlrenderer, sprites.texture, None, r)
+            render.render_copy(self.sdlrenderer, sprites.texture,
+                               sprites.srcrect, r)
         render.render_present(self.sdlrenderer)